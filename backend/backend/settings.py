@@ -56,6 +56,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'workshopviz.middleware.ServerTimingMiddleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -147,6 +148,12 @@ DB_ORG = os.getenv('DB_ORG')
 # CONFIG PATH
 MACHINE_CONFIG_PATH = os.getenv('MACHINE_CONFIG_PATH')
 
+# Number of Influx queries a worker process runs concurrently (per-graph fan-out)
+QUERY_WORKERS = int(os.getenv('QUERY_WORKERS', '8'))
+
+# Seconds the component builder's machine catalog is reused before it is rebuilt (config changes rebuild it at once)
+MACHINE_CATALOG_TTL = float(os.getenv('MACHINE_CATALOG_TTL', '60'))
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -174,4 +181,13 @@ MYSQL_DB_NAME = os.getenv('MYSQL_DB_NAME', 'atmas')
 MYSQL_USER = os.getenv('MYSQL_USER', 'root')
 MYSQL_PASSWORD = os.getenv('MYSQL_PASSWORD', '')
 MYSQL_HOST = os.getenv('MYSQL_HOST', 'localhost')
-MYSQL_PORT = os.getenv('MYSQL_PORT', '3306')
\ No newline at end of file
+MYSQL_PORT = os.getenv('MYSQL_PORT', '3306')
+
+# MySQL connection pool shared by every MySQLService in the process
+MYSQL_POOL_SIZE = int(os.getenv('MYSQL_POOL_SIZE', '5'))
+# Seconds to wait for a free connection before giving up
+MYSQL_POOL_TIMEOUT = float(os.getenv('MYSQL_POOL_TIMEOUT', '10'))
+# Connections idle for longer than this (seconds) are pinged before they are handed out, 0 pings on every checkout
+MYSQL_POOL_PING_AFTER = float(os.getenv('MYSQL_POOL_PING_AFTER', '0'))
+# Connections older than this (seconds) are replaced, below the server's wait_timeout
+MYSQL_POOL_RECYCLE = float(os.getenv('MYSQL_POOL_RECYCLE', '3600'))
\ No newline at end of file
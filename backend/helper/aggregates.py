@@ -0,0 +1,72 @@
+##################################################
+## File Name: aggregates.py
+## File Type: Python Module
+## Package Dependancies: pandas, numpy
+## Description: Local re-aggregation of per-window statistics, so switching aggregates does not re-query InfluxDB (multi_aggregate requests)
+## Usage: reaggregate(statsFrame, "max", "20s", "Axis")
+##################################################
+
+
+import os
+import numpy as np
+import pandas as pd
+
+# Aggregates computed locally from one statistics query
+LOCAL_AGGREGATES = ("mean", "max", "min", "count", "last")
+
+# Statistics fetched per window, each tagged with _stat. mean/min/max/last are scaled, count is not
+WINDOW_STATS = ("mean", "count", "min", "max", "last")
+
+# Fetch the statistics this many times finer than the displayed window (1 = the displayed window itself, exact for every aggregate)
+MULTI_AGGREGATE_REFINE = max(int(os.getenv("MULTI_AGGREGATE_REFINE", 1)), 1)
+
+
+def reaggregate(stats, aggregation, windowSeconds, pivotKey=None):
+	"""
+	Computes one aggregate per display window from per (fine) window statistics.
+
+	Parameters:
+		stats (pd.DataFrame): Long frame with 'time', '_stat', 'value' (and the pivot key) columns,
+			one row per fine window, series and statistic
+		aggregation (str): One of LOCAL_AGGREGATES
+		windowSeconds (float): The display window. Fine windows are grouped on the same window stop
+			timestamps aggregateWindow would have produced
+		pivotKey (str): Tag column identifying the series, None for un-pivoted data types
+
+	Returns:
+		pd.DataFrame: Long frame with 'time', pivotKey and 'value', ready for _pivotData, or None when empty
+	"""
+	if aggregation not in LOCAL_AGGREGATES:
+		raise ValueError(f"Unsupported aggregation '{aggregation}', expected one of: {', '.join(LOCAL_AGGREGATES)}")
+	if stats is None or stats.empty:
+		return None
+
+	keys = [pivotKey] if pivotKey else []
+	wide = stats.pivot_table(index=["time", *keys], columns="_stat", values="value", aggfunc="first").reset_index()
+	for stat in WINDOW_STATS:
+		if stat not in wide.columns:
+			wide[stat] = np.nan
+
+	# aggregateWindow stamps each window with its stop time, so fine windows map onto the display window by ceiling
+	windowNs = int(round(windowSeconds * 1e9))
+	timesNs = pd.DatetimeIndex(wide["time"]).asi8
+	wide["window"] = pd.to_datetime(-(-timesNs // windowNs) * windowNs, utc=True)
+	# Weighted by the number of points of each fine window
+	wide["total"] = wide["mean"] * wide["count"]
+	groups = wide.sort_values("time").groupby(["window", *keys], sort=True)
+
+	if aggregation == "mean":
+		values = groups["total"].sum(min_count=1) / groups["count"].sum(min_count=1)
+	elif aggregation == "count":
+		values = groups["count"].sum(min_count=1)
+	elif aggregation == "max":
+		values = groups["max"].max()
+	elif aggregation == "min":
+		values = groups["min"].min()
+	else:
+		values = groups["last"].last()
+
+	result = values.rename("value").reset_index().rename(columns={"window": "time"}).dropna(subset=["value"])
+	if result.empty:
+		return None
+	return result[["time", *keys, "value"]]
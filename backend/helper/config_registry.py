@@ -0,0 +1,325 @@
+##################################################
+## File Name: config_registry.py
+## File Type: Python Module
+## Package Dependancies: None (watchdog, when installed, for file change events)
+## Description: In-memory registry of the machine/dropdown JSON configs, parsed and validated once, reloaded when a file changes
+## Usage: getConfigRegistry(MACHINE_CONFIG_PATH).machine("Hurco").dataType(1)
+##################################################
+
+
+import os
+import re
+import json
+import threading
+from dataclasses import dataclass, field
+from time import monotonic
+
+try:
+	from watchdog.observers import Observer
+	from watchdog.events import FileSystemEventHandler
+except ImportError:
+	# Optional, the registry then only checks file modification times
+	Observer = None
+	FileSystemEventHandler = object
+
+# Seconds between two checks of the config folder for new, changed or removed files
+CONFIG_RELOAD_INTERVAL = float(os.getenv("CONFIG_RELOAD_INTERVAL", 2))
+
+_INTERVAL_PATTERN = re.compile(r"^[0-9]*\.?[0-9]+(ms|f|s|m|h|d|w)$")
+_SCALE_PATTERN = re.compile(r"^\s*[*/+-]\s*[0-9]*\.?[0-9]+(?:[eE][+-]?[0-9]+)?\s*$")
+
+
+_reloadListeners = []
+
+
+def onConfigReload(callback):
+	"""Calls callback(registry) whenever a registry reloads, so anything derived from the configs is dropped with them"""
+	_reloadListeners.append(callback)
+
+
+class ConfigError(ValueError):
+	"""A machine config that cannot be used, with the file and data type it comes from"""
+
+
+@dataclass(frozen=True)
+class DataTypeConfig:
+	"""
+	One data type of a machine config (eg. Hurco -> Data -> Temperature).
+	raw is the JSON object itself, still used by the query builders, and must be treated as read only.
+	"""
+	name: str
+	index: int  # 1-based position, the graph id used by the frontend
+	bucket: str
+	measurement: str
+	predicates: dict
+	pivot: str = None
+	units: str = ""
+	scale: str = None
+	sampleInterval: str = None
+	summarised: bool = False
+	aggregation: str = None
+	raw: dict = field(default_factory=dict, repr=False, compare=False)
+
+	@property
+	def hasPivot(self):
+		return self.pivot is not None
+
+
+@dataclass(frozen=True)
+class MachineConfig:
+	"""A parsed machine (or dropdown) config file"""
+	name: str
+	path: str
+	mtime: float
+	dataTypes: tuple
+	raw: dict = field(default_factory=dict, repr=False, compare=False)
+
+	@property
+	def isDropdown(self):
+		return "Dropdown" in self.name
+
+	@property
+	def data(self):
+		"""{data type name: raw config}, the shape runJSONQuery takes"""
+		return self.raw["Data"]
+
+	def dataType(self, graphId):
+		"""The data type with the given 1-based graph id, None when out of range or not a number"""
+		try:
+			index = int(graphId) - 1
+		except (TypeError, ValueError):
+			return None
+		return self.dataTypes[index] if 0 <= index < len(self.dataTypes) else None
+
+	def dataTypeByName(self, name):
+		return next((dataType for dataType in self.dataTypes if dataType.name == name), None)
+
+
+def _validateDataType(fileName, name, index, config):
+	def fail(message):
+		raise ConfigError(f"{fileName} -> {name}: {message}")
+
+	if not isinstance(config, dict):
+		fail("must be an object")
+	for key in ("Bucket", "Measurement"):
+		if not isinstance(config.get(key), str) or not config.get(key):
+			fail(f"{key} must be a non-empty string")
+
+	predicates = config.get("Predicates", {})
+	if not isinstance(predicates, dict):
+		fail("Predicates must be an object")
+	for key, value in predicates.items():
+		values = value if isinstance(value, list) else [value]
+		if not values or not all(isinstance(item, str) and item for item in values):
+			fail(f"Predicate {key} must be a non-empty string or list of strings")
+
+	pivot = config.get("Pivot")
+	if pivot is not None and (not isinstance(pivot, str) or not pivot):
+		fail("Pivot must be a non-empty string")
+	sampleInterval = config.get("Sample_Interval")
+	if sampleInterval is not None and not (isinstance(sampleInterval, str) and _INTERVAL_PATTERN.match(sampleInterval)):
+		fail(f"Sample_Interval '{sampleInterval}' is not an interval like '5s' or '0.1s'")
+	scale = config.get("Scale")
+	if scale is not None and not (isinstance(scale, str) and _SCALE_PATTERN.match(scale)):
+		fail(f"Scale '{scale}' must be an operator and a number, eg. '/10000.0'")
+
+	return DataTypeConfig(
+		name=name,
+		index=index,
+		bucket=config["Bucket"],
+		measurement=config["Measurement"],
+		predicates=predicates,
+		pivot=pivot,
+		units=config.get("Units", ""),
+		scale=scale,
+		sampleInterval=sampleInterval,
+		summarised=bool(config.get("Summarised", False)),
+		aggregation=config.get("Aggregation"),
+		raw=config,
+	)
+
+
+def parseMachineConfig(path):
+	"""
+	Reads and validates a machine config file.
+
+	Returns:
+		MachineConfig
+
+	Raises:
+		ConfigError: When the file is not valid JSON or a data type is invalid
+	"""
+	fileName = os.path.basename(path)
+	mtime = os.stat(path).st_mtime
+	try:
+		with open(path, "r", encoding="utf-8") as f:
+			raw = json.load(f)
+	except json.JSONDecodeError as e:
+		raise ConfigError(f"{fileName}: invalid JSON ({e})")
+	if not isinstance(raw, dict) or not isinstance(raw.get("Data"), dict):
+		raise ConfigError(f"{fileName}: a 'Data' object is required")
+
+	dataTypes = tuple(_validateDataType(fileName, name, index, config) for index, (name, config) in enumerate(raw["Data"].items(), start=1))
+	return MachineConfig(name=os.path.splitext(fileName)[0], path=path, mtime=mtime, dataTypes=dataTypes, raw=raw)
+
+
+class _ChangeHandler(FileSystemEventHandler):
+	def __init__(self, registry):
+		self.registry = registry
+
+	def on_any_event(self, event):
+		self.registry.invalidate()
+
+
+class ConfigRegistry:
+	"""
+	Every config of a folder, parsed once and shared by all requests.
+
+	The folder is checked at most every CONFIG_RELOAD_INTERVAL seconds (right away after a watchdog
+	event): files whose modification time changed are parsed again, new ones added and deleted ones
+	dropped. A file that fails validation keeps its last valid version. version changes on every
+	reload, so anything derived from the configs can be invalidated with them.
+	"""
+
+	def __init__(self, configPath, reloadInterval=CONFIG_RELOAD_INTERVAL):
+		self.configPath = configPath
+		self.reloadInterval = reloadInterval
+		self.version = 0
+		self.errors = {}
+		self._machines = {}
+		self._lock = threading.Lock()
+		self._checkedAt = None
+		self._observer = None
+		self.loads = 0
+		if Observer is not None and configPath and os.path.isdir(configPath):
+			try:
+				self._observer = Observer()
+				self._observer.schedule(_ChangeHandler(self), configPath, recursive=False)
+				self._observer.daemon = True
+				self._observer.start()
+			except OSError as e:
+				print(f"Config folder not watched ({e}), checking modification times instead")
+				self._observer = None
+
+	def invalidate(self):
+		"""Checks the folder on the next access"""
+		self._checkedAt = None
+
+	def _refresh(self):
+		now = monotonic()
+		if self._checkedAt is not None and now - self._checkedAt < self.reloadInterval:
+			return
+		with self._lock:
+			if self._checkedAt is not None and now - self._checkedAt < self.reloadInterval:
+				return
+			found = {}
+			if self.configPath and os.path.isdir(self.configPath):
+				with os.scandir(self.configPath) as entries:
+					for entry in entries:
+						if entry.is_file() and entry.name.endswith(".json"):
+							found[os.path.splitext(entry.name)[0]] = (entry.path, entry.stat().st_mtime)
+
+			machines = dict(self._machines)
+			changed = False
+			for name in set(machines) - set(found):
+				del machines[name]
+				self.errors.pop(name, None)
+				changed = True
+			for name, (path, mtime) in found.items():
+				current = machines.get(name)
+				if current is not None and current.mtime == mtime:
+					continue
+				if current is None and self.errors.get(name, (None,))[0] == mtime:
+					continue
+				try:
+					machines[name] = parseMachineConfig(path)
+					self.errors.pop(name, None)
+					self.loads += 1
+					changed = True
+				except (ConfigError, OSError) as e:
+					# Keep serving the last valid version of the file
+					self.errors[name] = (mtime, str(e))
+					print(f"Config not loaded: {e}")
+
+			if changed:
+				self._machines = machines
+				self.version += 1
+			self._checkedAt = monotonic()
+
+		if changed:
+			for callback in _reloadListeners:
+				callback(self)
+
+	def currentVersion(self):
+		"""version, after checking the folder for changes"""
+		self._refresh()
+		return self.version
+
+	def machine(self, name):
+		"""The config of a machine or dropdown, None when there is no (valid) file for it"""
+		self._refresh()
+		return self._machines.get(name)
+
+	def machineByPath(self, path):
+		"""The config of a file of this folder, by its path"""
+		return self.machine(os.path.splitext(os.path.basename(path))[0])
+
+	def machines(self):
+		"""Every valid config, by name"""
+		self._refresh()
+		return dict(self._machines)
+
+	def machineNames(self):
+		"""Configs listed as machines: file names without a '-' (legacy copies such as Hurco-0)"""
+		return sorted(name for name in self.machines() if "-" not in name)
+
+	def dropdownNames(self):
+		return sorted(name for name, config in self.machines().items() if config.isDropdown)
+
+	def stats(self):
+		self._refresh()
+		return {
+			"path": self.configPath,
+			"version": self.version,
+			"configs": len(self._machines),
+			"loads": self.loads,
+			"errors": {name: message for name, (_, message) in self.errors.items()},
+			"watched": self._observer is not None,
+		}
+
+
+_registries = {}
+_registriesLock = threading.Lock()
+
+
+def getConfigRegistry(configPath=None):
+	"""
+	The shared registry of a config folder (MACHINE_CONFIG_PATH by default).
+
+	Parameters:
+		configPath (str): The config folder
+
+	Returns:
+		ConfigRegistry
+	"""
+	configPath = os.path.abspath(configPath or os.getenv("MACHINE_CONFIG_PATH") or ".")
+	registry = _registries.get(configPath)
+	if registry is None:
+		with _registriesLock:
+			registry = _registries.get(configPath)
+			if registry is None:
+				registry = _registries[configPath] = ConfigRegistry(configPath)
+	return registry
+
+
+def loadMachineConfig(filePath):
+	"""
+	The parsed config of a machine config file, through the registry of its folder.
+
+	Raises:
+		FileNotFoundError: When there is no valid config at that path
+	"""
+	config = getConfigRegistry(os.path.dirname(os.path.abspath(filePath))).machineByPath(filePath)
+	if config is None:
+		raise FileNotFoundError(f"No valid config at path: {filePath}")
+	return config
@@ -14,74 +14,265 @@
 
 
 from datetime import datetime, timedelta, date
+import io
+import math
 import os
+import re
 import pprint
-from influxdb_client import InfluxDBClient
 import json
+import threading
+import numpy as np
 import pandas as pd
 from time import perf_counter
-from time import sleep
+from functools import lru_cache
+from contextlib import contextmanager
 import random
 import pprint
 import pytz
-
-INFLUX_TOKEN = "pRoemIh7JfC7cn1HG2VyZcx1BSIguLN-gqhQyKl8775tpvDV4o9NNf1FuLMDKKvKaVEj1wDKiPouKsbvSS6s5Q=="
-DB_LINK = "http://10.101.23.23:8086"
-DB_ORG = "ECMPG"
+from influxdb_client.domain.dialect import Dialect
+from helper.influx_pool import getInfluxClient
+from helper.influx_standin import createStandinClient
+from helper.config_registry import loadMachineConfig
+from helper.query_plan import getQueryPlan, queryPlanStats
+from helper.query_cache import queryCache, queryCacheKey, canonicalQuery, QUERY_CACHE_MAX_TTL
+from helper.single_flight import querySingleFlight, SINGLE_FLIGHT
+from helper.downsample import lttbFrame, LTTB_OVERSAMPLE
+from helper.aggregates import reaggregate, LOCAL_AGGREGATES, WINDOW_STATS, MULTI_AGGREGATE_REFINE
+
+# Same variables as backend/settings.py, so both query paths share one pooled client per server
+INFLUX_TOKEN = os.getenv("INFLUX_TOKEN")
+DB_LINK = os.getenv("DB_LINK")
+DB_ORG = os.getenv("DB_ORG")
 
 INTERVAL_POINTS = [1,2,5,10,20,30,45,60]
 FULL_SCREEN_POINTS = 1500
 MINIMISED_POINTS = 500
 
-def _connect_influxDB(timeout=30_000):
-	########## InfluxDB Initialisation ##########
+# Aggregation windows calculateAggregation2 can choose from, in seconds, sub-second through days
+RESOLUTION_LADDER = [
+	0.01, 0.02, 0.05, 0.1, 0.2, 0.5,
+	1, 2, 5, 10, 15, 20, 30, 45,
+	60, 2*60, 5*60, 10*60, 15*60, 20*60, 30*60, 45*60,
+	3600, 2*3600, 3*3600, 6*3600, 12*3600,
+	86400, 2*86400, 7*86400, 14*86400, 30*86400,
+]
+
+# Point budget from the client's plot width: points per pixel, clamped to a sane range
+POINTS_PER_PIXEL = float(os.getenv("POINTS_PER_PIXEL", 1))
+MIN_POINTS = int(os.getenv("MIN_POINTS", 50))
+MAX_POINTS = int(os.getenv("MAX_POINTS", 5000))
+
+# Query cost guardrail: estimated rows read from InfluxDB per generate_data request and per dashboard render
+QUERY_MAX_ROWS = int(os.getenv("QUERY_MAX_ROWS", 2_000_000))
+DASHBOARD_MAX_ROWS = int(os.getenv("DASHBOARD_MAX_ROWS", 10_000_000))
+COST_BYTES_PER_ROW = int(os.getenv("COST_BYTES_PER_ROW", 80))
+COST_REGEX_FANOUT = int(os.getenv("COST_REGEX_FANOUT", 4))
+# Used to estimate a data type without a Sample_Interval
+DEFAULT_SAMPLE_INTERVAL = os.getenv("DEFAULT_SAMPLE_INTERVAL", "1s")
+
+class QueryBudgetError(ValueError):
+	"""Raised when a query would read more rows than the configured budget, even at the coarsest window"""
+
+# "envelope" aggregation: min and max per window from one Flux script, returned as <series>_min/<series>_max
+ENVELOPE = "envelope"
+ENVELOPE_BANDS = ("min", "max")
+
+# Plain CSV (no annotation rows) so the response can go straight into pandas.read_csv
+CSV_DIALECT = Dialect(header=True, delimiter=",", annotations=[], date_time_format="RFC3339")
+
+# Receives the per-stage timings of the query pipeline, see setPipelineObserver
+_pipelineObserver = None
+
+def setPipelineObserver(observer):
+	"""
+	Registers the object recording pipeline metrics (eg. workshopviz.metrics).
+
+	Parameters:
+		observer: Has stage(name, seconds, labels) and rows(count, labels) methods, labels being
+			{"machine": ..., "data_type": ...}. None stops recording
+	"""
+	global _pipelineObserver
+	_pipelineObserver = observer
+
+@contextmanager
+def pipelineStage(stage, machine="", dataType=""):
+	"""Times the enclosed block as one pipeline stage (eg. 'flux_build') for the registered observer"""
+	if _pipelineObserver is None:
+		yield
+		return
+	start = perf_counter()
+	try:
+		yield
+	finally:
+		_pipelineObserver.stage(stage, perf_counter() - start, {"machine": machine, "data_type": dataType})
+
+def _reportRows(data, machine="", dataType=""):
+	"""Reports how many rows a query returned"""
+	if _pipelineObserver is not None:
+		_pipelineObserver.rows(0 if data is None else len(data), {"machine": machine, "data_type": dataType})
+
+# Local stand-in for InfluxDB: synthetic, record or replay (see helper/influx_standin.py), unset for the real database
+INFLUX_STANDIN = os.getenv("INFLUX_STANDIN", "")
+INFLUX_STANDIN_DIR = os.getenv("INFLUX_STANDIN_DIR", "influx-recordings")
+
+# Client used instead of the InfluxDB pool (eg. a local stand-in for benchmarks), see useInfluxClient
+_influxClientOverride = None
+# INFLUX_STANDIN is resolved once per process, an unknown mode then stays on the pool
+_standinResolved = False
+_standinLock = threading.Lock()
+
+def useInfluxClient(client):
+	"""
+	Routes every query to the given client instead of the pooled InfluxDB connection.
 
-	client = None
-	health = None
-	attempts = 0
-	while(True):
-		client = InfluxDBClient(url=DB_LINK, token=INFLUX_TOKEN, org=DB_ORG, timeout=timeout)
-		health = client.health()
+	Parameters:
+		client: Has the query(query, org) and queryRaw(query, org, dialect) methods of PooledInfluxClient,
+			eg. helper.influx_standin.SyntheticInfluxClient. None goes back to InfluxDB
+	"""
+	global _influxClientOverride
+	_influxClientOverride = client
+
+def _connect_influxDB():
+	"""Returns the shared, pooled InfluxDB client for this process (or the stand-in selected with INFLUX_STANDIN)"""
+	global _standinResolved
+	if not _standinResolved:
+		with _standinLock:
+			if not _standinResolved:
+				if _influxClientOverride is None and INFLUX_STANDIN:
+					useInfluxClient(createStandinClient(INFLUX_STANDIN, os.getenv("MACHINE_CONFIG_PATH"), INFLUX_STANDIN_DIR,
+						lambda: getInfluxClient(DB_LINK, INFLUX_TOKEN, DB_ORG)))
+				_standinResolved = True
+	if _influxClientOverride is not None:
+		return _influxClientOverride
+	return getInfluxClient(DB_LINK, INFLUX_TOKEN, DB_ORG)
+
+def pointBudget(maximised=False, plotWidth=None):
+	"""
+	Number of points a chart should receive.
+
+	Parameters:
+		maximised (bool): Whether the visualisation is shown full screen
+		plotWidth (int): Width of the plot area in pixels, as sent by the client (optional)
+
+	Returns:
+		int: plotWidth * POINTS_PER_PIXEL clamped to MIN_POINTS..MAX_POINTS,
+			or FULL_SCREEN_POINTS/MINIMISED_POINTS when the width is unknown
+	"""
+	try:
+		plotWidth = float(plotWidth) if plotWidth is not None else None
+	except (TypeError, ValueError):
+		plotWidth = None
+	if plotWidth and plotWidth > 0:
+		return int(min(max(plotWidth * POINTS_PER_PIXEL, MIN_POINTS), MAX_POINTS))
+	return FULL_SCREEN_POINTS if maximised else MINIMISED_POINTS
+
+def formatInterval(seconds):
+	"""Formats a number of seconds as a Flux duration using the largest whole unit (eg. 0.1 -> '100ms', 7200 -> '2h')"""
+	for unit, unitSeconds in (("d", 86400), ("h", 3600), ("m", 60), ("s", 1)):
+		if seconds >= unitSeconds and float(seconds / unitSeconds).is_integer():
+			return f"{int(seconds / unitSeconds)}{unit}"
+	return f"{int(round(seconds * 1000))}ms"
+
+def _sampleIntervalSeconds(sampleInterval):
+	"""Sample_Interval in seconds, DEFAULT_SAMPLE_INTERVAL when it is missing or cannot be parsed"""
+	samplingInterval = _intervalToSeconds(sampleInterval)
+	if not samplingInterval:
+		print(f"Missing or invalid Sample_Interval '{sampleInterval}', assuming {DEFAULT_SAMPLE_INTERVAL}")
+		samplingInterval = _intervalToSeconds(DEFAULT_SAMPLE_INTERVAL) or 1
+	return samplingInterval
+
+def estimateSeriesCount(configJSON, jsonQuery):
+	"""
+	Estimates how many series (tables) a data type query reads: the predicate fan-out
+	(values per predicate, COST_REGEX_FANOUT per regex) times the pivot cardinality
+	(the selected series, or COST_REGEX_FANOUT when every series is queried).
+	"""
+	fanOut = 1
+	for value in (configJSON.get("Predicates") or {}).values():
+		values = value if isinstance(value, list) else [value]
+		fanOut *= sum(COST_REGEX_FANOUT if (len(v) > 1 and v[0] == "/" and v[-1] == "/") else 1 for v in values) or 1
+	if configJSON.get("Pivot"):
+		fanOut *= len(jsonQuery.get("series") or []) or COST_REGEX_FANOUT
+	return max(fanOut, 1)
+
+def estimateQueryCost(configJSON, jsonQuery, startDateTime, endDateTime, windowPeriod, type, maximised):
+	"""
+	Estimates the rows and bytes a data type query reads from InfluxDB.
+
+	Parameters:
+		configJSON (dict): The data type config
+		jsonQuery (dict): The data type request (series, aggregation)
+		startDateTime (datetime): Start of the range
+		endDateTime (datetime): End of the range
+		windowPeriod (str): The aggregateWindow period, None for raw data
+		type (str): "Stat" or "Graph"
+		maximised (bool): Whether the visualisation is shown full screen
+
+	Returns:
+		dict: {"series", "rowsPerSeries", "branches", "rows", "bytes", "minRows"}. minRows is the
+			cost at the coarsest possible window (one row per series and branch)
+	"""
+	series = estimateSeriesCount(configJSON, jsonQuery)
+	if type == "Stat" and maximised == False:
+		rowsPerSeries, branches, aggregatedBranches = 1, 1, 1
+	else:
+		duration = max((endDateTime - startDateTime).total_seconds(), 0)
+		step = _intervalToSeconds(windowPeriod) or _sampleIntervalSeconds(configJSON.get("Sample_Interval"))
+		rowsPerSeries = max(int(math.ceil(duration / step)), 1)
+		branches = _branchCount(configJSON, jsonQuery, type, maximised, windowPeriod)
+		aggregatedBranches = _branchCount(configJSON, jsonQuery, type, maximised, windowPeriod or "1s")
+	rows = series * rowsPerSeries * branches
+	return {
+		"series": series,
+		"rowsPerSeries": rowsPerSeries,
+		"branches": branches,
+		"rows": rows,
+		"bytes": rows * COST_BYTES_PER_ROW,
+		"minRows": series * aggregatedBranches,
+	}
+
+def _branchCount(configJSON, jsonQuery, type, maximised, windowPeriod):
+	"""
+	Rows the built query returns per series and window: one per branch for statistics and envelope
+	queries (each branch reads the source), statistics being fetched MULTI_AGGREGATE_REFINE times finer
+	"""
+	if isEnvelopeQuery(jsonQuery, type, maximised):
+		return len(ENVELOPE_BANDS)
+	if isLocalAggregateQuery(configJSON, jsonQuery, type, maximised, windowPeriod):
+		return len(WINDOW_STATS) * MULTI_AGGREGATE_REFINE
+	return 1
 
-		if(health.status == "pass"):
-			return client.query_api()
-		attempts+=1
-		sleep(5)
-		
 def calculateAggregation2(startDateTime, endDatetime, sampleInterval, maxPoints):
+	"""
+	Picks the aggregateWindow period keeping a range under maxPoints points.
+
+	Parameters:
+		startDateTime (datetime): Start of the range
+		endDatetime (datetime): End of the range
+		sampleInterval (str): The data type's Sample_Interval (eg. '100ms', '0.1s', '15s', '5m', '1h', '1d')
+		maxPoints (int): The point budget
+
+	Returns:
+		str: The smallest window from RESOLUTION_LADDER (eg. '20s', '6h') that fits the budget,
+			or None when the raw data already fits
+	"""
 	duration = (endDatetime-startDateTime).total_seconds()
-	try:
-		samplingInterval = float(sampleInterval[:-1])
-		
-		unitQuantifier = sampleInterval[-1]
-		print(f"Units:  {unitQuantifier}")
-	except Exception as e:
-		raise ValueError(f"Error parsing range '{sampleInterval}': {e}")
-	
-	match unitQuantifier:
-		case "f":
-			samplingInterval =samplingInterval /1000 #Convert milliseconds to seconds
-		case "m":
-			samplingInterval =samplingInterval*60 #Convert minutes to seconds
+	samplingInterval = _sampleIntervalSeconds(sampleInterval)
+	print(f"Sample Interval:  {sampleInterval}")
+
 	estimatedPoints = duration/samplingInterval
 	print(f"Estimated Points: {estimatedPoints}")
 
 	if(estimatedPoints < maxPoints):
-		return False
+		return None
 	
-	decimationFactor = estimatedPoints/maxPoints
-	rough_interval = decimationFactor*samplingInterval
-	intervalUnits ="s"
-	if(rough_interval >60):
-		rough_interval /= 60
-		intervalUnits = "m"
-	chosen_interval = 1
-	for interval in INTERVAL_POINTS:
-		if(rough_interval < interval):
-			chosen_interval = interval
-			break
-	print(f"Rough Interval: {rough_interval} seconds\nChosen Interval: {chosen_interval} seconds")
-	return f"{chosen_interval}{intervalUnits}"
+	rough_interval = duration/maxPoints
+	chosen_interval = next((interval for interval in RESOLUTION_LADDER if interval >= rough_interval and interval >= samplingInterval), None)
+	if chosen_interval is None:
+		# Beyond the ladder, whole days
+		chosen_interval = math.ceil(rough_interval / 86400) * 86400
+	print(f"Rough Interval: {rough_interval} seconds\nChosen Interval: {formatInterval(chosen_interval)}")
+	return formatInterval(chosen_interval)
 
 def calculateAggregation(range,maxPoints, endDatetime):
 	"""
@@ -188,7 +379,7 @@ def _buildQuery(queryDict,range,type,minimised,requestedRange):
 				raise ValueError(f"Unable to parse dates with formats: {formats}")
 			
 			# **FIX: Assume input times are in BST/GMT and convert to UTC**
-			local_tz = pytz.timezone('Europe/London')
+			local_tz = _getTimezone('Europe/London')
 			
 			# Localize the naive datetime to BST/GMT depending on the current timezone
 			startDateTime = local_tz.localize(startDateTime)
@@ -259,7 +450,7 @@ def _formatTime(startDate,endDate):
 			raise ValueError(f"Unable to parse dates with formats: {formats}")
 		
 		# **FIX: Assume input times are in BST/GMT and convert to UTC**
-		local_tz = pytz.timezone('Europe/London')
+		local_tz = _getTimezone('Europe/London')
 		
 		# Localize the naive datetime to BST/GMT depending on the current timezone
 		startDateTime = local_tz.localize(startDateTime)
@@ -274,85 +465,65 @@ def _formatTime(startDate,endDate):
 
 		return startDateTime_utc,endDateTime_utc
 
-def _buildQueryFromConfig(configJSON,jsonQuery,startDate,endDate,type,maximised):
+def alignTimeWindow(startDateTime, endDateTime, stepSeconds):
 	"""
-	Builds an InfluxDB Flux query based on the input parameters and modifies it
-	depending on the visualisaton type and minimisation flag.
+	Snaps a time range outwards onto multiples of stepSeconds (start rounded down, stop rounded up),
+	so every request made within the same step produces exactly the same range.
 
 	Parameters:
-		flux (str): The base Flux query template with placeholders.
-		range (str): The time range string (e.g., '1h', '7d') to replace in the query.
-		type (str): The type of query, either "Stat" or "Graph".
-		minimised (bool): Whether the query should be optimised for minimal display (e.g., in small UI components).
+		startDateTime (datetime): Timezone aware start of the range.
+		endDateTime (datetime): Timezone aware end of the range.
+		stepSeconds (float): The boundary to snap to, anything below one second snaps to whole seconds.
 
 	Returns:
-		str: The constructed Flux query with appropriate replacements and adjustments.
+		tuple: (alignedStart, alignedStop) as UTC datetimes.
 	"""
+	step = max(int(math.ceil(stepSeconds or 1)), 1)
+	startEpoch = math.floor(startDateTime.timestamp() / step) * step
+	stopEpoch = math.ceil(endDateTime.timestamp() / step) * step
+	return datetime.fromtimestamp(startEpoch, pytz.UTC), datetime.fromtimestamp(stopEpoch, pytz.UTC)
+
+def _parseCursor(cursor):
+	"""Parses a client supplied cursor (ISO 8601, UTC when no offset is given), None if invalid"""
+	if not cursor or not isinstance(cursor, str):
+		return None
+	try:
+		cursorDateTime = datetime.fromisoformat(cursor.replace("Z", "+00:00"))
+	except ValueError:
+		print(f"Ignoring invalid cursor: {cursor}")
+		return None
+	if cursorDateTime.tzinfo is None:
+		cursorDateTime = pytz.UTC.localize(cursorDateTime)
+	return cursorDateTime.astimezone(pytz.UTC)
 
-	templateQuery = 'from(bucket: "[BUCKET_NAME]")\
-  |> range(start: v.timeRangeStart, stop: v.timeRangeStop)\
-  |> filter(fn: (r) => r["_measurement"] == "[MEASUREMENT]")\
-  [FILTERS]'
-	
-	templateFilter = '  |> filter(fn: (r) => [FILTERS])'
-	templateMultiFilter = 'r["[FILTER_KEY]"] =="[FILTER_VALUE]"'
-	templateRegexFilter = 'r["[FILTER_KEY]"] =~ [FILTER_VALUE]'
-	templateScaling = '|> map(fn: (r) => ({r with _value: float(v: r._value) [SCALING]}))'
-	templateAggregation = '  |> aggregateWindow(every: v.windowPeriod, fn: [AGGREGATE_FUNCTION], createEmpty: false)'
-
-	query = templateQuery
-	query = query.replace("[BUCKET_NAME]", configJSON.get("Bucket"))
-	query = query.replace("[MEASUREMENT]", configJSON.get("Measurement"))
-
-	filtersList = []
-
-	if(configJSON.get("Summarised")):
-		filterString = templateMultiFilter.replace("[FILTER_KEY]","_field").replace("[FILTER_VALUE]", jsonQuery["aggregation"].capitalize())
-		# print("Filtering String for Summarised: ", filterString)
-		filtersList.append(templateFilter.replace("[FILTERS]",filterString))
-		
-
-	if("Predicates" in configJSON):
-		print("Query Predicates Found")
-		for key,value in configJSON.get("Predicates").items():
-			if(isinstance(value,list)):
-				filterStringList = []
-				for listValue in value:
-					if listValue[0] == "/" and listValue[-1] == "/":
-						filterString = templateRegexFilter
-						filterString = filterString.replace("[FILTER_KEY]", key).replace("[FILTER_VALUE]", listValue)
-						
-					else:
-						filterString = templateMultiFilter
-						filterString = filterString.replace("[FILTER_KEY]", key).replace("[FILTER_VALUE]", listValue)
-					filterStringList.append(filterString)
-				completeFilterString = templateFilter
-				completeFilterString = completeFilterString.replace("[FILTERS]"," or ".join(filterStringList))
-				filtersList.append(completeFilterString)
-			else:
-				if value[0] == "/" and value[-1] == "/":
-					filterString = templateRegexFilter
-					filterString = filterString.replace("[FILTER_KEY]", key).replace("[FILTER_VALUE]", value)
-					
-				else:
-					filterString = templateMultiFilter
-					filterString = filterString.replace("[FILTER_KEY]", key).replace("[FILTER_VALUE]", value)
-				completeFilterString = templateFilter
-				completeFilterString = completeFilterString.replace("[FILTERS]",filterString)
-				filtersList.append(completeFilterString)
-
-	if("series" in jsonQuery):
-		seriesStringList = []
-		for series in jsonQuery["series"]:
-			seriesStringList.append(templateMultiFilter.replace("[FILTER_KEY]", configJSON["Pivot"]).replace("[FILTER_VALUE]", series))
-		
-
-		seriesString = templateFilter.replace("[FILTERS]", " or ".join(seriesStringList))
-		filtersList.append(seriesString)
+def resolveQueryWindow(configJSON,startDate,endDate,type,maximised,since=None,downsample=None,plotWidth=None,jsonQuery=None):
+	"""
+	Works out the effective time range and aggregation window for a data type query.
+	The window period is chosen from the requested duration, then the range is aligned
+	to it (or to the Sample_Interval for raw/stat data) so polling requests repeat exactly.
 
+	Parameters:
+		configJSON (dict): The data type config (eg. Hurco -> Data -> Temperature).
+		startDate (str): The requested start (local time string).
+		endDate (str): The requested end (local time string).
+		type (str): The type of query, either "Stat" or "Graph".
+		maximised (bool): Whether the visualisation is shown full screen.
+		since (str): Optional cursor (the "cursor" of a previous response). Only the windows from
+			the last, possibly partial, window before the cursor onwards are queried.
+		downsample (str): "lttb" fetches LTTB_OVERSAMPLE times the point budget, reduced after the query by LTTB.
+		plotWidth (int): Plot width in pixels sent by the client, sets the point budget (see pointBudget).
+		jsonQuery (dict): The data type request, used for the cost estimate (series, aggregation and
+			"max_rows", the row budget of this query, QUERY_MAX_ROWS by default).
 
-	query = query.replace("[FILTERS]", "\n".join(filtersList))
+	Returns:
+		dict: {"start": datetime, "stop": datetime, "every": str or None, "delta": bool, "points": int or None, "cost": dict}
+			points is the number of points the chart should end up with (None for Stat),
+			cost the estimate of the full range (see estimateQueryCost)
 
+	Raises:
+		QueryBudgetError: When the query is over its row budget even at the coarsest window
+	"""
+	jsonQuery = jsonQuery or {}
 	try:
 		startDateTime_utc,endDateTime_utc = _formatTime(startDate,endDate)		
 	
@@ -362,38 +533,139 @@ def _buildQueryFromConfig(configJSON,jsonQuery,startDate,endDate,type,maximised)
 		endDateTime_utc = datetime.now().astimezone(pytz.UTC)
 		startDateTime_utc = endDateTime_utc - timedelta(hours=1)
 
-	query = query.replace("v.timeRangeStart", startDateTime_utc.isoformat())
-	query = query.replace("v.timeRangeStop", endDateTime_utc.isoformat())
-	#print("Reached this point")
-	#print(type, maximised)
-	maxPointsToFetch  = FULL_SCREEN_POINTS
-	if(type== "Stat" and maximised == False):
-		print("Stat query is minimised, get last value")
-		query = query + "|> last()"
-	else:
-		if(maximised == False):
+	windowPeriod = None
+	maxPoints = None
+	if not (type== "Stat" and maximised == False):
+		if(maximised == False and not plotWidth):
 			print("Graph query is minimised, use bigger interval")
-			maxPointsToFetch = MINIMISED_POINTS
+		maxPoints = pointBudget(maximised, plotWidth)
+		maxPointsToFetch = maxPoints * LTTB_OVERSAMPLE if downsample == "lttb" else maxPoints
 		getAggregationValue = calculateAggregation2(startDateTime_utc,endDateTime_utc,configJSON.get("Sample_Interval"),maxPointsToFetch)
 		if(getAggregationValue):
-			# query += templateAggregation.replace("v.windowPeriod", getAggregationValue)
+			windowPeriod = getAggregationValue
+
+	# Guardrail: coarsen the window until the estimated rows fit the budget, or reject the query
+	maxRows = jsonQuery.get("max_rows") or QUERY_MAX_ROWS
+	cost = estimateQueryCost(configJSON, jsonQuery, startDateTime_utc, endDateTime_utc, windowPeriod, type, maximised)
+	if cost["rows"] > maxRows:
+		if cost["minRows"] > maxRows or (type == "Stat" and maximised == False):
+			raise QueryBudgetError(f"Query would read about {cost['rows']} rows from InfluxDB, over the budget of {maxRows}. Select fewer series or a shorter range.")
+		perSeriesRows = max(int(maxRows // cost["minRows"]), 1)
+		print(f"Estimated {cost['rows']} rows is over the budget of {maxRows}, coarsening to {perSeriesRows} rows per series")
+		windowPeriod = calculateAggregation2(startDateTime_utc,endDateTime_utc,configJSON.get("Sample_Interval"),perSeriesRows) or windowPeriod
+		cost = estimateQueryCost(configJSON, jsonQuery, startDateTime_utc, endDateTime_utc, windowPeriod, type, maximised)
+
+	step = _intervalToSeconds(windowPeriod) or _intervalToSeconds(configJSON.get("Sample_Interval"))
+	alignedStart, alignedStop = alignTimeWindow(startDateTime_utc, endDateTime_utc, step)
+
+	cursor = _parseCursor(since)
+	if cursor is not None:
+		# Keep the window period of the full range so the delta lines up with what the client holds
+		stepDelta = timedelta(seconds=max(int(math.ceil(step or 1)), 1))
+		deltaStart, _ = alignTimeWindow(min(cursor, alignedStop) - stepDelta, alignedStop, step)
+		if deltaStart > alignedStart:
+			return {"start": deltaStart, "stop": alignedStop, "every": windowPeriod, "delta": True, "points": maxPoints, "cost": cost}
+
+	return {"start": alignedStart, "stop": alignedStop, "every": windowPeriod, "delta": False, "points": maxPoints, "cost": cost}
 
+def _buildQueryFromConfig(configJSON,jsonQuery,startDate,endDate,type,maximised):
+	"""
+	Builds an InfluxDB Flux query based on the input parameters and modifies it
+	depending on the visualisaton type and minimisation flag.
 
-			# Get aggregation function from query, config, or default to 'mean'
-			aggregationFunc = jsonQuery.get("aggregation", configJSON.get("Aggregation", "mean"))
-			aggregationQuery = templateAggregation.replace("v.windowPeriod", getAggregationValue).replace("[AGGREGATE_FUNCTION]", aggregationFunc)
-			query += aggregationQuery
+	Parameters:
+		flux (str): The base Flux query template with placeholders.
+		range (str): The time range string (e.g., '1h', '7d') to replace in the query.
+		type (str): The type of query, either "Stat" or "Graph".
+		minimised (bool): Whether the query should be optimised for minimal display (e.g., in small UI components).
 
-		
-	if("Scale" in configJSON):
-		scaling = configJSON.get("Scale")
-		query += "\n" + templateScaling.replace("[SCALING]", scaling)
-		
+	Returns:
+		str: The constructed Flux query with appropriate replacements and adjustments.
+	"""
+	query, _ = _buildQueryAndWindow(configJSON,jsonQuery,startDate,endDate,type,maximised)
 	return query
 
+def _buildQueryAndWindow(configJSON,jsonQuery,startDate,endDate,type,maximised):
+	"""
+	Same as _buildQueryFromConfig, but also returns the resolved window (see resolveQueryWindow).
+
+	Returns:
+		tuple: (query, window) where window["every"] is the aggregateWindow period (e.g. '20s'), or None when the data is not aggregated.
+	"""
+
+	# A single value per point for Stat, so an envelope falls back to the max
+	envelope = isEnvelopeQuery(jsonQuery, type, maximised)
+	if jsonQuery.get("aggregation") == ENVELOPE and not envelope:
+		jsonQuery = dict(jsonQuery, aggregation="max")
+
+	# Everything taken from the config is compiled once per data type, only the request is bound here
+	plan = getQueryPlan(configJSON)
+
+	if jsonQuery.get("window"):
+		# Already resolved by the caller (eg. while sharing a row budget between graphs)
+		window = dict(jsonQuery["window"])
+	else:
+		window = resolveQueryWindow(configJSON,startDate,endDate,type,maximised,jsonQuery.get("since"),jsonQuery.get("downsample"),jsonQuery.get("width"),jsonQuery)
+	windowPeriod = window["every"]
+
+	query = plan.source(window["start"].isoformat(), window["stop"].isoformat(),
+		aggregation=jsonQuery["aggregation"] if plan.summarised and not envelope else None,
+		series=jsonQuery["series"] if "series" in jsonQuery else None)
+	#print(type, maximised)
+	if(type== "Stat" and maximised == False):
+		print("Stat query is minimised, get last value")
+		query = plan.last(query)
+	elif(envelope):
+		# Both bands in one script, each band tagged with _envelope
+		query = plan.envelope(query, windowPeriod, ENVELOPE_BANDS)
+	elif(isLocalAggregateQuery(configJSON, jsonQuery, type, maximised, windowPeriod)):
+		# Every statistic the aggregates are re-computed from, in one script (Flux runs each branch on its own). The query
+		# does not depend on the selected aggregate, so switching aggregates (or components only differing by it) reuse the cached result
+		window["stats"] = formatInterval(_intervalToSeconds(windowPeriod) / MULTI_AGGREGATE_REFINE)
+		query = plan.windowStats(query, window["stats"], WINDOW_STATS)
+	elif(windowPeriod):
+		# Get aggregation function from query, config, or default to 'mean'
+		aggregationFunc = jsonQuery.get("aggregation", plan.defaultAggregation)
+		query = plan.aggregate(query, windowPeriod, aggregationFunc)
+
+	query = plan.scale(query, stats=bool(window.get("stats")))
+		
+	return query, window
+
+def _intervalToSeconds(interval):
+	"""
+	Converts an interval string (eg. '0.1s', '15s', '5m', '1h', '1d') to seconds.
+	Returns None when the interval is missing or cannot be parsed.
+	"""
+	if not interval or not isinstance(interval, str):
+		return None
+	units = {"ms": 0.001, "f": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+	for unit in sorted(units, key=len, reverse=True):
+		if interval.endswith(unit):
+			try:
+				return float(interval[:-len(unit)]) * units[unit]
+			except ValueError:
+				return None
+	return None
+
+def _cacheTTL(configJSON, windowPeriod):
+	"""
+	How long a query result stays valid: one aggregation window, or one sample interval for raw data,
+	capped at QUERY_CACHE_MAX_TTL so live views still refresh.
+	"""
+	candidates = [_intervalToSeconds(configJSON.get("Sample_Interval")), _intervalToSeconds(windowPeriod)]
+	candidates = [c for c in candidates if c]
+	if not candidates:
+		return 0
+	return min(max(candidates), QUERY_CACHE_MAX_TTL)
+
+def getQueryCacheStats():
+	"""Hit/miss/eviction counters of the shared query result cache, how many queries were coalesced, and the compiled query plans"""
+	return dict(queryCache.stats(), singleFlight=querySingleFlight.stats(), queryPlans=queryPlanStats())
+
 def _runQuery(query):
 	"""
-	Connects to the InfluxDB and runs an InfluxDB Flux query 
+	Runs an InfluxDB Flux query on the shared connection pool
 	
 	Parameters:
 		query (str): The Flux query to be executed
@@ -401,10 +673,95 @@ def _runQuery(query):
 	Returns:
 		FluxRecord (List): The returned data from the query
 	"""
-	read_api = _connect_influxDB()
-	getRecords =  read_api.query(org="ECMPG",query=query)
+	getRecords = _coalesced("tables|" + canonicalQuery(query), lambda: _connect_influxDB().query(query, org=DB_ORG))
 	return getRecords
 
+def _coalesced(key, function, decode=None):
+	"""
+	Identical queries already in flight (eg. several screens refreshing together) share one execution.
+	With decode, function returns the raw response and decode parses it (shared across processes when configured).
+	"""
+	if not SINGLE_FLIGHT:
+		return function() if decode is None else decode(function())
+	return querySingleFlight.do(key, function, decode)
+
+def _runQueryFrame(query, tagColumns=()):
+	"""
+	Runs an InfluxDB Flux query and reads the CSV response column by column,
+	without building a FluxRecord per row.
+
+	Parameters:
+		query (str): The Flux query to be executed
+		tagColumns (list): Tag columns to keep alongside time and value (eg. the Pivot key)
+
+	Returns:
+		pd.DataFrame: Long format frame with 'time', 'value' and the tag columns, or None when no rows came back
+	"""
+	key = "frame|" + ",".join(tagColumns) + "|" + canonicalQuery(query)
+	return _coalesced(key, lambda: _connect_influxDB().queryRaw(query, org=DB_ORG, dialect=CSV_DIALECT), lambda raw: _csvToFrame(raw, tagColumns))
+
+def _csvToFrame(raw, tagColumns=()):
+	"""
+	Parses a (non-annotated) Flux CSV response into a long DataFrame.
+	Tables with a different schema come back as separate blocks split by a blank line,
+	each block is parsed on its own so columns can never shift between tables.
+	"""
+	text = raw.decode("utf-8") if isinstance(raw, (bytes, bytearray)) else raw
+	wanted = {"_time", "_value", *tagColumns}
+	frames = []
+	for block in re.split(r"\r?\n[ \t]*\r?\n", text.strip()):
+		if not block.strip():
+			continue
+		header = block.split("\n", 1)[0].strip().split(",")
+		if "error" in header and "_value" not in header:
+			raise RuntimeError(f"InfluxDB query error: {block}")
+		frames.append(pd.read_csv(io.StringIO(block), usecols=lambda column: column in wanted, dtype={tag: str for tag in tagColumns}))
+	frames = [frame for frame in frames if not frame.empty]
+	if not frames:
+		return None
+
+	df = pd.concat(frames, ignore_index=True).rename(columns={"_time": "time", "_value": "value"})
+	df["time"] = pd.to_datetime(df["time"], utc=True, format="ISO8601")
+	for tag in tagColumns:
+		if tag not in df.columns:
+			df[tag] = None
+	return df[["time", *tagColumns, "value"]]
+
+def _tablesToFrame(data, pivotKey):
+	"""Converts a FluxRecord table list into the same long frame as _csvToFrame (one list per column, no dict per row)"""
+	records = [record for table in data for record in table.records]
+	if not records:
+		return None
+	columns = {"time": pd.to_datetime([record.get_time() for record in records], utc=True)}
+	if pivotKey:
+		columns[pivotKey] = [record.values.get(pivotKey) for record in records]
+	columns["value"] = [record.get_value() for record in records]
+	return pd.DataFrame(columns)
+
+def isEnvelopeQuery(jsonQuery, type, maximised=False):
+	"""Whether a data type query is run as a min/max envelope (never for minimised Stat, which only takes the last value)"""
+	return jsonQuery.get("aggregation") == ENVELOPE and not (type == "Stat" and maximised == False)
+
+def isLocalAggregateQuery(configJSON, jsonQuery, type, maximised, windowPeriod):
+	"""
+	Whether a data type query fetches per window statistics and computes the selected aggregate locally.
+	Only when the request asks for it ("multi_aggregate", eg. the builder where the user switches aggregates),
+	as the statistics are len(WINDOW_STATS) times the rows of one aggregate. Not for raw (un-aggregated) data,
+	minimised Stat, envelopes, or Summarised data types, where the aggregate selects a stored field.
+	"""
+	aggregation = jsonQuery.get("aggregation", configJSON.get("Aggregation", "mean"))
+	return bool(jsonQuery.get("multi_aggregate")) and bool(windowPeriod) and aggregation in LOCAL_AGGREGATES and not configJSON.get("Summarised") \
+		and not (type == "Stat" and maximised == False) and not isEnvelopeQuery(jsonQuery, type, maximised)
+
+def envelopeSeries(seriesName):
+	"""The band series names an envelope query returns for a series (eg. X -> X_min, X_max)"""
+	return [f"{seriesName}_{band}" for band in ENVELOPE_BANDS]
+
+def _envelopeBands(data, pivotKey):
+	"""Long envelope frame -> long frame keyed by band series name ('X_min', or 'value_min' without a pivot)"""
+	seriesNames = data[pivotKey].astype(str) if pivotKey else pd.Series("value", index=data.index)
+	return pd.DataFrame({"time": data["time"], "_band": seriesNames + "_" + data["_envelope"].astype(str), "value": data["value"]})
+
 def _parseJSONQuery(jsonQuery):
 	"""
 	Parses a JSON-formatted query object and extracts relevant fields for query generation.
@@ -440,7 +797,7 @@ def _pivotData(data, pivotKey):
 	Pivots the data based on the specified pivot key.
 	
 	Parameters:
-		data (List of FluxRecord): The data to pivot.
+		data (pd.DataFrame or List of FluxRecord): Long format frame from _runQueryFrame, or a FluxRecord table list.
 		pivotKey (str): The key to pivot the data on.
 	
 	Returns:
@@ -448,30 +805,31 @@ def _pivotData(data, pivotKey):
 	"""
 	
 	print("Pivoting Data...")
-	
-	if not data or not data[0].records:
+
+	df = data if isinstance(data, pd.DataFrame) else _tablesToFrame(data or [], pivotKey)
+	if df is None or df.empty:
 		raise ValueError("No data available to pivot")
-	
-	# Create a list of records for DataFrame creation
-	records_list = []
-	
-	for table in data:
-		for record in table.records:
-			records_list.append({
-					"time": record.get_time(),
-					pivotKey: record.values.get(pivotKey),
-					"value": record.get_value()
-					})
 
-	df = pd.DataFrame(records_list)
 	if not pivotKey:
 		return df[["time","value"]] # If no pivot key is specified, return the raw data without pivoting
-	
-	# Pivot: rows are time, columns are axis, values are measurement values
-	pivot_df = df.pivot_table(index="time", columns=pivotKey, values="value", aggfunc='first')
 
-	# Optional: sort by time
-	pivot_df.sort_index(inplace=True)
+	# Same result as pivot_table(index="time", columns=pivotKey, values="value", aggfunc='first'):
+	# rows are time, columns are axis, values are measurement values, first value wins on duplicates
+	df = df.dropna(subset=["value", pivotKey])
+	df = df[~df.duplicated(subset=["time", pivotKey], keep="first")]
+	if df.empty:
+		raise ValueError("No data available to pivot")
+
+	timeCodes, times = pd.factorize(df["time"], sort=True)
+	keyCodes, keys = pd.factorize(df[pivotKey], sort=True)
+	values = df["value"].to_numpy()
+	if np.issubdtype(values.dtype, np.number):
+		grid = np.full((len(times), len(keys)), np.nan)
+	else:
+		grid = np.full((len(times), len(keys)), None, dtype=object)
+	grid[timeCodes, keyCodes] = values
+
+	pivot_df = pd.DataFrame(grid, index=pd.Index(times, name="time"), columns=pd.Index(keys, name=pivotKey))
 	
 	return pivot_df
 
@@ -522,18 +880,45 @@ def runJSONQuery(config, query):
 	#print("Config Data:", query)
 	
 	pivotedData = []
-	#machine = query["machine_name"]
+	machine = query.get("machine_name") or ""
 	for type in query["data_types"]:
 		#pprint.pprint(type, indent=2, width=120)
 		typename = type["name"]
-		influxQuery = _buildQueryFromConfig(config[typename],type,query["date_from"],query["date_to"],query["type"],query.get("maximised",False)) #configJSON,jsonQuery,startDate,endDate,type,minimised=False
+		with pipelineStage("flux_build", machine, typename):
+			influxQuery, window = _buildQueryAndWindow(config[typename],type,query["date_from"],query["date_to"],query["type"],query.get("maximised",False)) #configJSON,jsonQuery,startDate,endDate,type,minimised=False
+		windowPeriod = window["every"]
 		#print("Influx Query:", influxQuery)
-		data = _runQuery(influxQuery)
-		if not data:
+		cacheKey = queryCacheKey(influxQuery, windowPeriod)
+		found, data = queryCache.get(cacheKey)
+		pivotKey = config[typename].get("Pivot",False)
+		if not found:
+			envelope = isEnvelopeQuery(type, query["type"], query.get("maximised",False))
+			if window.get("stats"):
+				# Cached as statistics, the selected aggregate is computed below
+				tagColumns = ([pivotKey] if pivotKey else []) + ["_stat"]
+			elif envelope:
+				tagColumns = ([pivotKey] if pivotKey else []) + ["_envelope"]
+			else:
+				tagColumns = [pivotKey] if pivotKey else []
+			with pipelineStage("influx_round_trip", machine, typename):
+				data = _runQueryFrame(influxQuery, tagColumns)
+			_reportRows(data, machine, typename)
+			if data is not None and not window.get("stats"):
+				with pipelineStage("pivot", machine, typename):
+					data = _pivotData(_envelopeBands(data, pivotKey), "_band") if envelope else _pivotData(data, pivotKey)
+			queryCache.put(cacheKey, data, _cacheTTL(config[typename], windowPeriod))
+		if data is not None and window.get("stats"):
+			aggregation = type.get("aggregation", config[typename].get("Aggregation", "mean"))
+			with pipelineStage("pivot", machine, typename):
+				data = reaggregate(data, aggregation, _intervalToSeconds(windowPeriod), pivotKey or None)
+				data = _pivotData(data, pivotKey) if data is not None else None
+		if data is None:
 			print("No data returned from query")
 			pivotedData.append(None)
 			continue
-		data = _pivotData(data, config[typename].get("Pivot",False))
+		if type.get("downsample") == "lttb" and window["points"]:
+			# The query fetched LTTB_OVERSAMPLE times the budget, keep the visually significant rows of all series
+			data = lttbFrame(data, window["points"])
 		#checkLimit = Queries[i].get("Limit")
 		#if(checkLimit is not None):
 			#data = _reduceData(data,checkLimit,Queries[i].get("LimitType"))
@@ -598,23 +983,8 @@ def getInfluxData(filePath, custom_date_from=None, custom_date_to=None, timezone
 			if data:
 				for df in data:
 					if df is not None:
-						# Reset index to include time as a column before converting to dictionary
-						df_with_time = df.reset_index()
-						#convert Dataframe to dictionary format
-						df_dict = df_with_time.to_dict(orient='records')
-
-						# Format timestamps in the data to 'HH:MM' format in GMT/BST timezone
-						formatted_records = []
-						for record in df_dict:
-							formatted_record = {}
-							for key, value in record.items():
-								if key.lower() in ['time', 'timestamp', '_time'] and isinstance(value, (str, pd.Timestamp)):  # checks if key is time and if its in desired format
-									formatted_record[key] = format_timestamp(value, timezone)
-								else:
-									formatted_record[key] = value
-							formatted_records.append(formatted_record)
-
-						serializable_data.append(formatted_records)
+						# Time formatted to 'HH:MM' in GMT/BST timezone, one column at a time
+						serializable_data.append(_toFormattedRecords(df, timezone))
 					else:
 						serializable_data.append(None)
 
@@ -647,11 +1017,59 @@ def getInfluxData(filePath, custom_date_from=None, custom_date_to=None, timezone
 	#print(results)
 	return results
 
+TIME_COLUMNS = ('time', 'timestamp', '_time')
+
+@lru_cache(maxsize=None)
+def _getTimezone(timezone):
+	"""pytz.timezone() does a lookup per call, resolve each name once"""
+	return pytz.timezone(timezone)
+
+def formatTimes(times, timezone='Europe/London', timeFormat='%H:%M'):
+	"""
+	Formats a whole column of timestamps in one go (the vectorised version of format_timestamp).
+
+	Parameters:
+		times (pd.Series/pd.Index/list): Timestamps, naive values are treated as UTC
+		timezone (str): Target timezone (GMT/BST handled automatically for Europe/London)
+		timeFormat (str): strftime format
+
+	Returns:
+		np.ndarray: The formatted strings, values that are not timestamps are returned as str()
+	"""
+	with pipelineStage("format_timestamps"):
+		return _formatTimes(times, timezone, timeFormat)
+
+def _formatTimes(times, timezone, timeFormat):
+	values = pd.Series(times)
+	if pd.api.types.is_datetime64_any_dtype(values):
+		parsed = values
+	else:
+		parsed = pd.to_datetime(values, utc=True, errors="coerce", format="ISO8601")
+	if parsed.dt.tz is None:
+		parsed = parsed.dt.tz_localize("UTC")
+	formatted = parsed.dt.tz_convert(_getTimezone(timezone)).dt.strftime(timeFormat).to_numpy(dtype=object)
+
+	unparsed = parsed.isna().to_numpy()
+	if unparsed.any():
+		formatted[unparsed] = [value if pd.isna(value) else str(value) for value in values.to_numpy(dtype=object)[unparsed]]
+	return formatted
+
+def _toFormattedRecords(df, timezone='Europe/London'):
+	"""
+	Converts a result DataFrame to a list of row dictionaries with its time column(s) formatted as HH:MM.
+	The index is reset so time becomes a column, and formatted as a single array operation before serialisation.
+	"""
+	df_with_time = df.reset_index()
+	for column in df_with_time.columns:
+		if str(column).lower() in TIME_COLUMNS:
+			df_with_time[column] = formatTimes(df_with_time[column], timezone)
+	return df_with_time.to_dict(orient='records')
+
 # this helper function to get the timezone adjusted time in HH:MM format
 def format_timestamp(timestamp, timezone='Europe/London'):
     """Convert pandas Timestamp to HH:MM format in specific timezone"""
     try:
-        target_tz = pytz.timezone(timezone)  # Use pytz to get the timezone object
+        target_tz = _getTimezone(timezone)  # Cached pytz timezone object
         
         if isinstance(timestamp, pd.Timestamp):  # handles if timestamp is a pandas Timestamp eg: Timestamp('2025-07-28 11:15:00+0000', tz='UTC')
 			# Handle pandas Timestamp - ensure it's UTC first
@@ -705,12 +1123,14 @@ def generate_random_data(num_records: int, start_time: str = "2025-07-28T11:15:0
 
     return data
 
-def getDataSeries(data):
+def getDataSeries(data, timeRange=None):
 	"""
 	Processes a JSON-formatted data type (eg. Hurco -> Data -> Temperature) to extract series names.
+	Runs a schema.tagValues query every time, use helper.series_catalog for the cached series.
 
 	Parameters:
 		data (dict): A dictionary containing the data type specification
+		timeRange (str): How far back to look for series (eg. '3h', '7d'), InfluxDB's default (30d) when None
 			
 	Returns:
 		If there are predicates in the data dict, it will return all the series for that measurement with the predicates applied.
@@ -722,19 +1142,22 @@ def getDataSeries(data):
 	series = []
 	predicateStrings =[]
 
-	for predicate in data["Predicates"].keys():
-		for predicateValue in data["Predicates"][predicate]:
+	# Same filters as the data query: any value of a predicate (regex or exact), all predicates
+	for predicate, predicateValues in data["Predicates"].items():
+		valueStrings = []
+		for predicateValue in (predicateValues if isinstance(predicateValues, list) else [predicateValues]):
 			if(predicateValue[0] == "/" and predicateValue[-1] == "/"):
 				#This is a regex
-				predicateStrings.append(f"r.{predicate} =~ {predicateValue}")
+				valueStrings.append(f"r[\"{predicate}\"] =~ {predicateValue}")
 			else:
-				predicateStrings.append(f"r.{predicate} == \"{predicateValue}\"")
-				predicateString = " or ".join(predicateStrings)
-				influxQuery = f"import \"influxdata/influxdb/schema\"\
-					schema.tagValues(\
-						bucket: \"{data['Bucket']}\", \
-						predicate:  (r) => r._measurement == \"{data['Measurement']}\" and ({predicateString}),\
-    					tag: \"{data['Pivot']}\")"
+				valueStrings.append(f"r[\"{predicate}\"] == \"{predicateValue}\"")
+		predicateStrings.append("(" + " or ".join(valueStrings) + ")")
+	predicateString = "".join(f" and {predicateString}" for predicateString in predicateStrings)
+	startString = f", start: -{timeRange}" if timeRange else ""
+	influxQuery = f"import \"influxdata/influxdb/schema\"\n" \
+		f"schema.tagValues(bucket: \"{data['Bucket']}\", " \
+		f"predicate: (r) => r._measurement == \"{data['Measurement']}\"{predicateString}, " \
+		f"tag: \"{data['Pivot']}\"{startString})"
 	results = _runQuery(influxQuery)
 	
 	for table in results:
@@ -743,7 +1166,19 @@ def getDataSeries(data):
 	return series
 
 
-def getCustomData(data, filePath=None):
+def getCustomData(data, filePath=None, preprocess=True):
+	"""
+	Runs the selected data types of a machine config for a custom date range.
+
+	Parameters:
+		data (dict): machine_name, date_from, date_to, type and the selected data_types
+		filePath (str): Path to the machine JSON config
+		preprocess (bool): When False the result DataFrames are returned as they are (UTC timestamps, full precision)
+			instead of row dictionaries with HH:MM times
+
+	Returns:
+		list: One entry per data type (None where no data), or None on error
+	"""
 	try:
 		# validate data is json and not empty
 		if not data:
@@ -765,28 +1200,28 @@ def getCustomData(data, filePath=None):
 		if not filePath.endswith('.json'):
 			raise ValueError("File path must point to a JSON file")
 		
-		# check if file exists
-		if not os.path.exists(filePath):
-			raise FileNotFoundError(f"File not found at path: {filePath}")
-
-		with open(filePath, 'r', encoding='utf-8') as f:  #utf-8 encoding for python to correctly interpret utf-8 byte sequences or other special characters
-			configFile = f.read()
-
-		jsonConfig = json.loads(configFile)
+		# Parsed config from the shared registry, raises FileNotFoundError when there is no valid file
+		# (the config_load stage is timed by the view's registry lookup)
+		machineConfig = loadMachineConfig(filePath)
 		time_start = perf_counter()
 
 		# Config file structure has Data at root level, not nested under machine name
-		output_result = runJSONQuery(jsonConfig["Data"], jsonQuery)		
+		output_result = runJSONQuery(machineConfig.data, jsonQuery)		
 		#print("Output Result: ", output_result)
 
 		time_end = perf_counter()
 		print(f"Total Execution Time: {time_end - time_start} seconds")
 		
+		if not preprocess:
+			return output_result
+
 		# preprocess the results to make them JSON serializable
 		output_results = preprocessResults(output_result)
 
 		return output_results
 		
+	except QueryBudgetError:
+		raise
 	except Exception as e:
 		print(f"Error in getCustomData: {e}")
 		return None
@@ -805,23 +1240,8 @@ def preprocessResults(results):
 	processed_results = []
 	for df in results:
 		if df is not None:
-			# Reset index to include time as a column before converting to dictionary
-			df_with_time = df.reset_index()
-			# Convert DataFrame to dictionary format
-			df_dict = df_with_time.to_dict(orient='records')
-			
-			# Format timestamps in the data to 'HH:MM' format in GMT/BST timezone
-			formatted_records = []
-			for record in df_dict:
-				formatted_record = {}
-				for key, value in record.items():
-					if key.lower() in ['time', 'timestamp', '_time'] and isinstance(value, (str, pd.Timestamp)):
-						formatted_record[key] = format_timestamp(value, 'Europe/London')
-					else:
-						formatted_record[key] = value
-				formatted_records.append(formatted_record)
-			
-			processed_results.append(formatted_records)
+			# Convert DataFrame to dictionary format, timestamps formatted to 'HH:MM' in GMT/BST timezone
+			processed_results.append(_toFormattedRecords(df, 'Europe/London'))
 		else:
 			processed_results.append(None)
 	return processed_results
@@ -0,0 +1,95 @@
+##################################################
+## File Name: downsample.py
+## File Type: Python Module
+## Package Dependancies: pandas, numpy
+## Description: Largest-Triangle-Three-Buckets (LTTB) visual downsampling of query results
+## Usage: lttbFrame(pivotedFrame, FULL_SCREEN_POINTS)
+##################################################
+
+
+import os
+import numpy as np
+import pandas as pd
+
+# How many more points than the point budget are fetched from InfluxDB before LTTB reduces them
+LTTB_OVERSAMPLE = max(int(os.getenv("LTTB_OVERSAMPLE", 4)), 1)
+
+DOWNSAMPLE_MODES = ("aggregate", "lttb")
+
+
+def lttbIndices(x, y, threshold):
+	"""
+	Picks the points that best keep the visual shape of a series, or of several series sharing x.
+
+	Parameters:
+		x (np.ndarray): Sorted x values (eg. epoch nanoseconds)
+		y (np.ndarray): y values, no NaN. A 2D array (one column per series) picks one set of points
+			for every series, using the sum of the triangle areas of the columns
+		threshold (int): Number of points to keep
+
+	Returns:
+		np.ndarray: Sorted indices of the kept points, always including the first and last point
+	"""
+	n = len(x)
+	if threshold >= n:
+		return np.arange(n)
+	if threshold < 3:
+		return np.array([0, n - 1], dtype=np.int64)[:max(threshold, 0)]
+
+	x = np.asarray(x, dtype=float)
+	y = np.asarray(y, dtype=float)
+	if y.ndim == 1:
+		y = y[:, None]
+
+	# Bucket edges for the n-2 inner points, threshold-2 buckets
+	edges = np.floor(np.linspace(1, n - 1, threshold - 1)).astype(np.int64)
+	starts, stops = edges[:-1], edges[1:]
+
+	# Average point of every bucket, the last bucket being followed by the final point
+	counts = stops - starts
+	averageX = np.append(np.add.reduceat(x[:n - 1], starts) / counts, x[-1])
+	averageY = np.vstack([np.add.reduceat(y[:n - 1], starts, axis=0) / counts[:, None], y[-1]])
+
+	selected = np.empty(threshold, dtype=np.int64)
+	selected[0] = 0
+	selected[-1] = n - 1
+	previous = 0
+	for bucket, (start, stop) in enumerate(zip(starts, stops)):
+		# Triangle area between the previously kept point, each candidate and the next bucket's average
+		ax, ay = x[previous], y[previous]
+		cx, cy = averageX[bucket + 1], averageY[bucket + 1]
+		areas = np.abs((ax - cx) * (y[start:stop] - ay) - (ax - x[start:stop, None]) * (cy - ay)).sum(axis=1)
+		previous = start + int(np.argmax(areas))
+		selected[bucket + 1] = previous
+	return selected
+
+
+def lttbFrame(frame, threshold):
+	"""
+	Downsamples a query result to at most `threshold` rows with LTTB.
+	Every series (column) keeps the same rows: they are picked on all series at once, each scaled to
+	0..1 so a series with large values does not decide for the others, so the payload does not grow
+	with the number of series.
+
+	Parameters:
+		frame (pd.DataFrame): A pivoted result (time index) or an un-pivoted one ('time' and 'value' columns)
+		threshold (int): Rows to keep
+
+	Returns:
+		pd.DataFrame: A new frame in the same layout, the input is left untouched (it may be cached)
+	"""
+	if frame is None or frame.empty or len(frame) <= threshold:
+		return frame
+
+	timeColumn = "time" in frame.columns
+	indexed = frame.set_index("time") if timeColumn else frame
+	x = pd.DatetimeIndex(indexed.index).asi8
+
+	values = indexed.apply(pd.to_numeric, errors="coerce").astype(float)
+	low = values.min()
+	span = (values.max() - low).replace(0, 1)
+	# Gaps take the neighbouring value for the selection only, the kept rows hold the original values
+	scaled = ((values - low) / span).ffill().bfill().fillna(0).to_numpy()
+
+	result = values.iloc[lttbIndices(x, scaled, threshold)]
+	return result.reset_index() if timeColumn else result
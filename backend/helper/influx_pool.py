@@ -0,0 +1,238 @@
+##################################################
+## File Name: influx_pool.py
+## File Type: Python Module
+## Package Dependancies: influxdb-client
+## Description: Process-wide registry of pooled InfluxDB clients shared by every query path
+## Usage: getInfluxClient(url, token, org).query(flux)
+##################################################
+
+
+import os
+import threading
+from time import monotonic, sleep
+from influxdb_client import InfluxDBClient
+from influxdb_client.rest import ApiException
+from urllib3.exceptions import HTTPError
+
+INFLUX_POOL_SIZE = int(os.getenv("INFLUX_POOL_SIZE", 20))
+INFLUX_TIMEOUT_MS = int(os.getenv("INFLUX_TIMEOUT_MS", 30_000))
+INFLUX_MAX_RETRIES = int(os.getenv("INFLUX_MAX_RETRIES", 3))
+INFLUX_RETRY_BACKOFF = float(os.getenv("INFLUX_RETRY_BACKOFF", 0.5))
+INFLUX_HEALTH_INTERVAL = float(os.getenv("INFLUX_HEALTH_INTERVAL", 30))
+INFLUX_BREAKER_THRESHOLD = int(os.getenv("INFLUX_BREAKER_THRESHOLD", 5))
+INFLUX_BREAKER_RESET = float(os.getenv("INFLUX_BREAKER_RESET", 30))
+
+_registry = {}
+_registryLock = threading.Lock()
+_healthThread = None
+_healthStop = threading.Event()
+
+
+class InfluxUnavailableError(RuntimeError):
+	"""Raised when InfluxDB is unreachable or the circuit breaker is open"""
+
+
+class CircuitBreaker:
+	"""
+	Minimal closed/open/half-open circuit breaker.
+
+	After `threshold` consecutive failed calls the breaker opens and rejects calls
+	for `resetTimeout` seconds, then lets a single trial call through (half-open),
+	rejecting the others until that call succeeds or fails.
+	"""
+
+	CLOSED = "closed"
+	OPEN = "open"
+	HALF_OPEN = "half_open"
+
+	def __init__(self, threshold=INFLUX_BREAKER_THRESHOLD, resetTimeout=INFLUX_BREAKER_RESET):
+		self.threshold = threshold
+		self.resetTimeout = resetTimeout
+		self.failures = 0
+		self.openedAt = None
+		self.state = self.CLOSED
+		self.trialInFlight = False
+		self._lock = threading.Lock()
+
+	def allowRequest(self):
+		with self._lock:
+			if self.state == self.OPEN:
+				if monotonic() - self.openedAt < self.resetTimeout:
+					return False
+				self.state = self.HALF_OPEN
+			if self.state == self.HALF_OPEN:
+				if self.trialInFlight:
+					return False
+				self.trialInFlight = True
+			return True
+
+	def recordSuccess(self):
+		with self._lock:
+			self.failures = 0
+			self.openedAt = None
+			self.state = self.CLOSED
+			self.trialInFlight = False
+
+	def recordFailure(self):
+		with self._lock:
+			self.failures += 1
+			self.trialInFlight = False
+			if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+				self.state = self.OPEN
+				self.openedAt = monotonic()
+
+	def trip(self):
+		with self._lock:
+			self.failures = max(self.failures, self.threshold)
+			self.state = self.OPEN
+			self.openedAt = monotonic()
+			self.trialInFlight = False
+
+
+def _isTransient(error):
+	"""Connection problems and 5xx/429 responses are worth retrying, bad Flux (4xx) is not"""
+	if isinstance(error, ApiException):
+		return error.status is None or error.status >= 500 or error.status == 429
+	return isinstance(error, (HTTPError, ConnectionError, TimeoutError))
+
+
+class PooledInfluxClient:
+	"""
+	A single InfluxDBClient with a sized keep-alive HTTP pool, bounded retries and a circuit breaker.
+	Instances are shared between threads, use getInfluxClient() rather than creating them directly.
+	"""
+
+	def __init__(self, url, token, org, timeout=INFLUX_TIMEOUT_MS, poolSize=INFLUX_POOL_SIZE):
+		self.url = url
+		self.org = org
+		self.client = InfluxDBClient(url=url, token=token, org=org, timeout=timeout, connection_pool_maxsize=poolSize)
+		self.queryApi = self.client.query_api()
+		self.breaker = CircuitBreaker()
+		self.lastHealth = None
+
+	def query(self, query, org=None, maxRetries=INFLUX_MAX_RETRIES):
+		"""
+		Runs a Flux query on the pooled connection.
+
+		Parameters:
+			query (str): The Flux query to be executed
+			org (str): Organisation override, defaults to the client's org
+			maxRetries (int): Number of retries for transient failures
+
+		Returns:
+			FluxRecord (List): The returned data from the query
+		"""
+		return self._execute(lambda: self.queryApi.query(org=org or self.org, query=query), maxRetries)
+
+	def queryRaw(self, query, org=None, dialect=None, maxRetries=INFLUX_MAX_RETRIES):
+		"""
+		Runs a Flux query and returns the raw CSV response body, skipping FluxRecord creation.
+
+		Parameters:
+			query (str): The Flux query to be executed
+			org (str): Organisation override, defaults to the client's org
+			dialect (Dialect): CSV dialect, defaults to the client library's annotated CSV
+			maxRetries (int): Number of retries for transient failures
+
+		Returns:
+			bytes: The CSV response body
+		"""
+		kwargs = {"dialect": dialect} if dialect is not None else {}
+		return self._execute(lambda: self.queryApi.query_raw(query, org=org or self.org, **kwargs).data, maxRetries)
+
+	def _execute(self, call, maxRetries):
+		"""
+		Runs call() behind the circuit breaker, retrying transient failures with exponential backoff.
+		The breaker is told once per call: a failure when every attempt failed, a success otherwise.
+		"""
+		if not self.breaker.allowRequest():
+			raise InfluxUnavailableError(f"InfluxDB at {self.url} is unavailable (circuit open)")
+		attempt = 0
+		while True:
+			try:
+				result = call()
+			except Exception as e:
+				if not _isTransient(e):
+					# the server answered, so the connection itself is fine
+					self.breaker.recordSuccess()
+					raise
+				attempt += 1
+				if attempt > maxRetries:
+					self.breaker.recordFailure()
+					raise InfluxUnavailableError(f"InfluxDB query failed after {attempt} attempts: {e}") from e
+				sleep(INFLUX_RETRY_BACKOFF * (2 ** (attempt - 1)))
+				continue
+			self.breaker.recordSuccess()
+			return result
+
+	def health(self):
+		"""Runs a health check and updates the circuit breaker with the outcome"""
+		try:
+			health = self.client.health()
+		except Exception as e:
+			self.breaker.trip()
+			self.lastHealth = None
+			raise InfluxUnavailableError(f"InfluxDB health check failed: {e}") from e
+		self.lastHealth = health
+		if health.status == "pass":
+			self.breaker.recordSuccess()
+		else:
+			self.breaker.trip()
+		return health
+
+	def close(self):
+		self.client.close()
+
+
+def _healthLoop():
+	while not _healthStop.wait(INFLUX_HEALTH_INTERVAL):
+		with _registryLock:
+			clients = list(_registry.values())
+		for pooledClient in clients:
+			try:
+				pooledClient.health()
+			except InfluxUnavailableError as e:
+				print(f"Background health check failed: {e}")
+
+
+def _startHealthThread():
+	global _healthThread
+	if INFLUX_HEALTH_INTERVAL <= 0 or (_healthThread and _healthThread.is_alive()):
+		return
+	_healthStop.clear()
+	_healthThread = threading.Thread(target=_healthLoop, name="influx-health", daemon=True)
+	_healthThread.start()
+
+
+def getInfluxClient(url, token, org):
+	"""
+	Returns the process-wide pooled client for a given InfluxDB server, creating it on first use.
+
+	Parameters:
+		url (str): The InfluxDB URL (eg. http://host:8086)
+		token (str): The API token
+		org (str): The default organisation
+
+	Returns:
+		PooledInfluxClient: The shared client for this url/org/token
+	"""
+	key = (url, org, token)
+	pooledClient = _registry.get(key)
+	if pooledClient is not None:
+		return pooledClient
+	with _registryLock:
+		pooledClient = _registry.get(key)
+		if pooledClient is None:
+			pooledClient = PooledInfluxClient(url, token, org)
+			_registry[key] = pooledClient
+		_startHealthThread()
+	return pooledClient
+
+
+def closeAll():
+	"""Stops the health thread and closes every pooled client (used on shutdown)"""
+	_healthStop.set()
+	with _registryLock:
+		for pooledClient in _registry.values():
+			pooledClient.close()
+		_registry.clear()
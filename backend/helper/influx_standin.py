@@ -0,0 +1,567 @@
+##################################################
+## File Name: influx_standin.py
+## File Type: Python Module
+## Package Dependancies: influxdb-client, pandas, numpy
+## Description: Local stand-ins for InfluxDB: synthetic data following the machine configs, and record/replay of real responses
+## Usage: useInfluxClient(SyntheticInfluxClient(configPath=MACHINE_CONFIG_PATH, seed=1)), or INFLUX_STANDIN=synthetic in .env
+##################################################
+
+
+import os
+import re
+import io
+import json
+import hashlib
+import itertools
+import zlib
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+import pytz
+from influxdb_client.client.flux_table import FluxTable, FluxRecord
+from helper.query_cache import canonicalQuery
+
+INFLUX_STANDIN_SEED = int(os.getenv("INFLUX_STANDIN_SEED", 0))
+# Pivot values generated per data type (S1..Sn), on top of the ones a query asks for
+INFLUX_STANDIN_SERIES = int(os.getenv("INFLUX_STANDIN_SERIES", 4))
+
+_RANGE_PATTERN = re.compile(r"range\(start:\s*([^,)]+?)\s*(?:,\s*stop:\s*([^)]+?)\s*)?\)")
+_EVERY_PATTERN = re.compile(r"aggregateWindow\(every:\s*([0-9.]+(?:ms|s|m|h|d|w))(?:,\s*fn:\s*(\w+))?")
+_SET_PATTERN = re.compile(r'set\(key:\s*"([^"]+)",\s*value:\s*"([^"]+)"\)')
+_BUCKET_PATTERN = re.compile(r'(?:from\(bucket|bucket):\s*"([^"]+)"')
+_MEASUREMENT_PATTERN = re.compile(r'(?:r\["_measurement"\]|r\._measurement)\s*==\s*"([^"]+)"')
+_TAG_VALUES_PATTERN = re.compile(r'tag:\s*"([^"]+)"')
+_BRANCH_PATTERN = re.compile(r"^\s*(\w+)\s*=\s*data\s*$", re.MULTILINE)
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+_TIME_COLUMNS = ("_time", "_start", "_stop")
+_SUMMARISED_FIELDS = ("Mean", "Max", "Min")
+
+
+def _durationSeconds(duration):
+	match = re.fullmatch(r"([0-9.]+)(ms|s|m|h|d|w)", str(duration).strip())
+	return float(match.group(1)) * _DURATION_UNITS[match.group(2)] if match else None
+
+
+def _parseTime(value, now):
+	"""Absolute RFC3339 times and relative ones (-1h) as used by the built queries"""
+	value = value.strip().strip('"')
+	if value.startswith("-"):
+		return now - timedelta(seconds=_durationSeconds(value[1:]))
+	if value == "now()":
+		return now
+	return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _queryRange(query, now):
+	match = _RANGE_PATTERN.search(query)
+	start = _parseTime(match.group(1), now) if match else now - timedelta(hours=1)
+	stop = _parseTime(match.group(2), now) if match and match.group(2) else now
+	return start, stop
+
+
+##################################################
+## Flux filter predicates
+##################################################
+
+_TOKEN_PATTERN = re.compile(r'''\s*(?:
+	(?P<key>r\["[^"]+"\]|r\.\w+)
+	|(?P<op>==|!=|=~|!~)
+	|(?P<string>"(?:[^"\\]|\\.)*")
+	|(?P<regex>/(?:[^/\\]|\\.)*/)
+	|(?P<word>and|or|not|true|false)
+	|(?P<paren>[()])
+)''', re.VERBOSE)
+
+
+def _tokenize(expression):
+	tokens = []
+	position = 0
+	expression = expression.strip()
+	while position < len(expression):
+		match = _TOKEN_PATTERN.match(expression, position)
+		if not match or match.end() == position:
+			raise ValueError(f"Unsupported Flux predicate: {expression}")
+		kind = match.lastgroup
+		value = match.group(kind)
+		if kind == "key":
+			value = value[3:-2] if value.startswith('r["') else value[2:]
+		elif kind == "string":
+			value = value[1:-1].replace('\\"', '"')
+		elif kind == "regex":
+			value = re.compile(value[1:-1].replace("\\/", "/"))
+		tokens.append((kind, value))
+		position = match.end()
+	return tokens
+
+
+def compilePredicate(expression):
+	"""
+	Compiles the body of a Flux filter function (comparisons of r["tag"] with strings or regexes,
+	and/or/not and parentheses) into a Python function of a tag dictionary.
+	An empty body matches everything.
+	"""
+	tokens = _tokenize(expression)
+	if not tokens:
+		return lambda tags: True
+	position = 0
+
+	def peek():
+		return tokens[position] if position < len(tokens) else (None, None)
+
+	def take():
+		nonlocal position
+		position += 1
+		return tokens[position - 1]
+
+	def orExpression():
+		terms = [andExpression()]
+		while peek() == ("word", "or"):
+			take()
+			terms.append(andExpression())
+		return terms[0] if len(terms) == 1 else (lambda tags: any(term(tags) for term in terms))
+
+	def andExpression():
+		terms = [unary()]
+		while peek() == ("word", "and"):
+			take()
+			terms.append(unary())
+		return terms[0] if len(terms) == 1 else (lambda tags: all(term(tags) for term in terms))
+
+	def unary():
+		kind, value = take()
+		if (kind, value) == ("word", "not"):
+			inner = unary()
+			return lambda tags: not inner(tags)
+		if (kind, value) == ("paren", "("):
+			inner = orExpression()
+			if take() != ("paren", ")"):
+				raise ValueError(f"Unbalanced Flux predicate: {expression}")
+			return inner
+		if kind == "word" and value in ("true", "false"):
+			return (lambda tags: True) if value == "true" else (lambda tags: False)
+		if kind != "key":
+			raise ValueError(f"Unsupported Flux predicate: {expression}")
+		opKind, operator = take()
+		_, operand = take()
+		if operator == "==":
+			return lambda tags: tags.get(value) == operand
+		if operator == "!=":
+			return lambda tags: tags.get(value) is not None and tags.get(value) != operand
+		if operator == "=~":
+			return lambda tags: tags.get(value) is not None and operand.search(tags[value]) is not None
+		return lambda tags: tags.get(value) is not None and operand.search(tags[value]) is None
+
+	predicate = orExpression()
+	if position != len(tokens):
+		raise ValueError(f"Unsupported Flux predicate: {expression}")
+	return predicate
+
+
+def _filterBodies(text):
+	"""Bodies of the filter(fn: (r) => ...) calls of a Flux pipeline, regex and string literals skipped while matching parentheses"""
+	bodies = []
+	for match in re.finditer(r"filter\(fn:\s*\(r\)\s*=>", text):
+		depth = 1
+		position = match.end()
+		while position < len(text) and depth:
+			char = text[position]
+			if char == '"':
+				position = text.index('"', position + 1) if '"' in text[position + 1:] else len(text)
+			elif char == "/" and re.search(r"=~\s*$|!~\s*$", text[match.end():position]):
+				end = position + 1
+				while end < len(text) and (text[end] != "/" or text[end - 1] == "\\"):
+					end += 1
+				position = end
+			elif char == "(":
+				depth += 1
+			elif char == ")":
+				depth -= 1
+			position += 1
+		bodies.append(text[match.end():position - 1])
+	return bodies
+
+
+def _sampleMatching(pattern):
+	"""A string matching a config regex like /T[0-9]-HUR/, used as the synthetic tag value"""
+	source = pattern[1:-1]
+	candidate = re.sub(r"\[\^?[^\]]*\]", lambda m: "1" if "0-9" in m.group(0) else (m.group(0)[1] if m.group(0)[1] != "^" else "x"), source)
+	candidate = re.sub(r"\\d", "1", candidate)
+	candidate = re.sub(r"\\w", "a", candidate)
+	candidate = re.sub(r"\.\*|\.\+|[\^$*+?]|\\b", "", candidate).replace("\\", "").replace(".", "x")
+	return candidate
+
+
+##################################################
+## Synthetic data
+##################################################
+
+def _splitmix(values):
+	"""Deterministic pseudo random uint64 per input value (splitmix64), uniform in [0, 1) after scaling"""
+	with np.errstate(over="ignore"):
+		z = values.astype(np.uint64) + np.uint64(0x9E3779B97F4A7C15)
+		z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+		z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+		z = z ^ (z >> np.uint64(31))
+	return (z >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+class _Source:
+	"""The tag sets one bucket/measurement holds, gathered from every data type config reading it"""
+
+	def __init__(self, bucket, measurement):
+		self.bucket = bucket
+		self.measurement = measurement
+		self.tagValues = {}
+		self.sampleInterval = None
+
+	def addConfig(self, config, seriesCount):
+		predicates = config.get("Predicates") or {}
+		for key, value in predicates.items():
+			for item in (value if isinstance(value, list) else [value]):
+				self._addValue(key, _sampleMatching(item) if _isRegex(item) else item)
+		if config.get("Summarised"):
+			for field in _SUMMARISED_FIELDS:
+				self._addValue("_field", field)
+		if "_field" not in self.tagValues:
+			self._addValue("_field", "value")
+		if config.get("Pivot"):
+			for index in range(seriesCount):
+				self._addValue(config["Pivot"], f"S{index + 1}")
+		interval = _durationSeconds(config.get("Sample_Interval"))
+		if interval and (self.sampleInterval is None or interval < self.sampleInterval):
+			self.sampleInterval = interval
+
+	def _addValue(self, key, value):
+		values = self.tagValues.setdefault(key, [])
+		if value not in values:
+			values.append(value)
+
+	def tagSets(self, extraValues=None):
+		"""Every combination of the known tag values (plus values the query names explicitly)"""
+		tagValues = {key: list(values) for key, values in self.tagValues.items()}
+		for key, values in (extraValues or {}).items():
+			if key in tagValues:
+				tagValues[key] += [value for value in values if value not in tagValues[key]]
+		keys = sorted(tagValues)
+		return [dict(zip(keys, combination)) for combination in itertools.product(*(tagValues[key] for key in keys))]
+
+
+def _isRegex(value):
+	return isinstance(value, str) and len(value) > 1 and value[0] == "/" and value[-1] == "/"
+
+
+class SyntheticInfluxClient:
+	"""
+	Answers the Flux built by dashboard.py with generated data, in place of PooledInfluxClient
+	(a vectorised, config aware version of dashboard.generate_random_data).
+
+	With a configPath every data type config declares a bucket/measurement and its tag sets
+	(Predicates, Summarised fields, seriesCount Pivot values S1..Sn plus any the query filters on),
+	raw points follow Sample_Interval, and the query's filter(), aggregateWindow(), set() branches,
+	union() and last() decide which series and rows come back. Queries for unknown measurements fall
+	back to seriesTag/seriesCount/sampleInterval. Values are a function of the seed, the series and the
+	timestamp only, so the same point has the same value whatever range it is queried with.
+	Values are generated in display units: a Scale map() in the query is not applied.
+	"""
+
+	def __init__(self, configPath=None, seriesCount=INFLUX_STANDIN_SERIES, sampleInterval="1s", seriesTag="Axis", seed=INFLUX_STANDIN_SEED, now=None):
+		self.seriesCount = seriesCount
+		self.sampleInterval = _durationSeconds(sampleInterval) or 1.0
+		self.seriesTag = seriesTag
+		self.seed = seed
+		self.now = now
+		self.sources = self._loadSources(configPath) if configPath else {}
+		self.queries = 0
+		self.rows = 0
+
+	def _loadSources(self, configPath):
+		sources = {}
+		for fileName in sorted(os.listdir(configPath)):
+			if not fileName.endswith(".json") or "-" in fileName:
+				continue
+			with open(os.path.join(configPath, fileName), "r", encoding="utf-8") as f:
+				config = json.load(f)
+			for dataType in config.get("Data", {}).values():
+				key = (dataType.get("Bucket"), dataType.get("Measurement"))
+				sources.setdefault(key, _Source(*key)).addConfig(dataType, self.seriesCount)
+		return sources
+
+	def _source(self, query):
+		bucket = _BUCKET_PATTERN.search(query)
+		measurement = _MEASUREMENT_PATTERN.search(query)
+		key = (bucket.group(1) if bucket else None, measurement.group(1) if measurement else None)
+		if key in self.sources:
+			return self.sources[key]
+		source = _Source(*key)
+		source.sampleInterval = self.sampleInterval
+		source._addValue("_field", "value")
+		for index in range(self.seriesCount):
+			source._addValue(self.seriesTag, f"S{index + 1}")
+		return source
+
+	def _branches(self, query):
+		"""(filter bodies, window seconds, window function, set tags) of each output branch of the query"""
+		common = query
+		branchTexts = [query]
+		if "union(tables:" in query:
+			matches = list(_BRANCH_PATTERN.finditer(query))
+			if matches:
+				common = query[:matches[0].start()]
+				ends = [match.start() for match in matches[1:]] + [query.index("union(tables:")]
+				branchTexts = [query[match.end():end] for match, end in zip(matches, ends)]
+		branches = []
+		for text in branchTexts:
+			filters = _filterBodies(common) + (_filterBodies(text) if text is not query else [])
+			every = _EVERY_PATTERN.search(text) or _EVERY_PATTERN.search(common)
+			branches.append((
+				filters,
+				_durationSeconds(every.group(1)) if every else None,
+				every.group(2) if every and every.group(2) else None,
+				dict(_SET_PATTERN.findall(text)),
+			))
+		return branches
+
+	def _values(self, times, tags, function, windowSeconds, sampleInterval):
+		identity = json.dumps([self.seed, sorted(tags.items())])
+		seriesHash = zlib.crc32(identity.encode("utf-8"))
+		base = 10 + (seriesHash % 9000) / 100
+		period = (600 + (seriesHash >> 8) % 6600) * 1e9
+		noise = _splitmix(times ^ np.int64(seriesHash)) - 0.5
+		values = base + base * 0.2 * np.sin(2 * np.pi * times / period) + noise * base * 0.04
+
+		spread = base * 0.05
+		field = tags.get("_field")
+		offsets = {"min": -spread, "max": spread, "Min": -spread, "Max": spread, "last": spread * 0.2}
+		function = tags.get("_stat") or tags.get("_envelope") or function
+		if function == "count":
+			return np.full(len(times), float(max(round((windowSeconds or sampleInterval) / sampleInterval), 1)))
+		return values + offsets.get(field, 0.0) + offsets.get(function, 0.0)
+
+	def _tables(self, query):
+		"""Generated response: a list of (times as int64 ns, values, tags) per output table"""
+		self.queries += 1
+		now = self.now or datetime.now(pytz.UTC)
+		start, stop = _queryRange(query, now)
+		source = self._source(query)
+		sampleInterval = source.sampleInterval or self.sampleInterval
+		startNs, stopNs = pd.Timestamp(start).value, pd.Timestamp(stop).value
+
+		mentioned = {}
+		for key, value in re.findall(r'r\["([^"]+)"\]\s*==\s*"([^"]*)"', query):
+			mentioned.setdefault(key, []).append(value)
+		tagSets = source.tagSets(mentioned)
+
+		tables = []
+		for filters, windowSeconds, function, setTags in self._branches(query):
+			predicates = [compilePredicate(body) for body in filters]
+			stepNs = max(int(round((windowSeconds or sampleInterval) * 1e9)), 1)
+			# aggregateWindow stamps windows with their stop time, raw points sit on the sample grid
+			first = -(-startNs // stepNs) * stepNs
+			times = np.arange(first, stopNs + (stepNs if windowSeconds else 0), stepNs, dtype=np.int64)
+			if windowSeconds:
+				times = np.minimum(times, stopNs)
+				times = times[times > startNs]
+			if "last()" in query:
+				times = times[-1:]
+			if not len(times):
+				continue
+			for tags in tagSets:
+				tags = dict(tags, _measurement=source.measurement)
+				if not all(predicate(tags) for predicate in predicates):
+					continue
+				rowTags = dict(tags, **setTags)
+				tables.append((times, self._values(times, rowTags, function, windowSeconds, sampleInterval), rowTags))
+		self.rows += sum(len(times) for times, _, _ in tables)
+		return tables
+
+	def queryRaw(self, query, org=None, dialect=None, **kwargs):
+		"""
+		Non-annotated CSV, the layout dashboard._csvToFrame reads. Written line by line rather than
+		with DataFrame.to_csv (about twice as fast), timestamps formatted once per branch.
+		"""
+		if "schema.tagValues" in query:
+			values = self._tagValues(query)
+			return ("\r\n".join([",result,table,_value"] + [f",_result,0,{value}" for value in values]) + "\r\n").encode("utf-8")
+		tables = self._tables(query)
+		if not tables:
+			return b""
+		tagKeys = sorted({key for _, _, tags in tables for key in tags})
+		lines = [",result,table,_time,_value," + ",".join(tagKeys)]
+		timeStrings = {}
+		for tableId, (times, values, tags) in enumerate(tables):
+			key = id(times)
+			if key not in timeStrings:
+				timeStrings[key] = np.datetime_as_string(times.astype("datetime64[ns]"), unit="ms", timezone="UTC").tolist()
+			prefix = f",_result,{tableId},"
+			suffix = "," + ",".join(str(tags.get(tagKey, "")) for tagKey in tagKeys)
+			lines.extend([f"{prefix}{time},{value!r}{suffix}" for time, value in zip(timeStrings[key], values.tolist())])
+		return ("\r\n".join(lines) + "\r\n").encode("utf-8")
+
+	def query(self, query, org=None, **kwargs):
+		"""FluxTable list, the layout InfluxDB's query API returns"""
+		if "schema.tagValues" in query:
+			table = FluxTable()
+			table.records = [FluxRecord(table=0, values={"_value": value}) for value in self._tagValues(query)]
+			return [table]
+		fluxTables = []
+		for tableId, (times, values, tags) in enumerate(self._tables(query)):
+			table = FluxTable()
+			for time, value in zip(pd.to_datetime(times, utc=True).to_pydatetime(), values.tolist()):
+				table.records.append(FluxRecord(table=tableId, values=dict(tags, _time=time, _value=value)))
+			fluxTables.append(table)
+		return fluxTables
+
+	def _tagValues(self, query):
+		"""schema.tagValues(): the values of one tag over the tag sets matching the predicate"""
+		tag = _TAG_VALUES_PATTERN.search(query)
+		if not tag:
+			return []
+		predicate = re.search(r"predicate:\s*\(r\)\s*=>(.*?),\s*tag:", query, re.DOTALL)
+		match = compilePredicate(predicate.group(1)) if predicate else (lambda tags: True)
+		source = self._source(query)
+		values = [tags.get(tag.group(1)) for tags in source.tagSets() if match(dict(tags, _measurement=source.measurement))]
+		return sorted({value for value in values if value is not None})
+
+	def health(self):
+		return {"status": "pass", "message": "synthetic stand-in"}
+
+	def close(self):
+		pass
+
+
+##################################################
+## Record / replay
+##################################################
+
+def recordingKey(query):
+	"""Queries are matched on their text without the time bounds, so a recording replays at any time"""
+	return hashlib.sha1(_RANGE_PATTERN.sub("range(...)", canonicalQuery(query)).encode("utf-8")).hexdigest()
+
+
+class RecordingInfluxClient:
+	"""Forwards queries to a real client and stores each response (with its time range) in a directory for replay"""
+
+	def __init__(self, client, directory):
+		self.client = client
+		self.directory = directory
+		os.makedirs(directory, exist_ok=True)
+
+	def _save(self, query, kind, payload):
+		start, stop = _queryRange(query, datetime.now(pytz.UTC))
+		key = recordingKey(query)
+		with open(os.path.join(self.directory, f"{key}.{kind}"), "wb") as f:
+			f.write(payload)
+		with open(os.path.join(self.directory, f"{key}.json"), "w", encoding="utf-8") as f:
+			json.dump({"query": query, "start": start.isoformat(), "stop": stop.isoformat()}, f, indent=1)
+
+	def queryRaw(self, query, org=None, dialect=None, **kwargs):
+		raw = self.client.queryRaw(query, org=org, dialect=dialect, **kwargs)
+		self._save(query, "csv", raw if isinstance(raw, (bytes, bytearray)) else raw.encode("utf-8"))
+		return raw
+
+	def query(self, query, org=None, **kwargs):
+		tables = self.client.query(query, org=org, **kwargs)
+		records = [[{key: value.isoformat() if isinstance(value, datetime) else value for key, value in record.values.items()}
+			for record in table.records] for table in tables]
+		self._save(query, "tables", json.dumps(records).encode("utf-8"))
+		return tables
+
+	def health(self):
+		return self.client.health()
+
+	def close(self):
+		self.client.close()
+
+
+class ReplayInfluxClient:
+	"""
+	Answers queries from a RecordingInfluxClient directory. Timestamps are shifted by the difference
+	between the recorded and the requested range stop, so recordings keep following "now".
+	Queries that were never recorded go to the fallback client (eg. a SyntheticInfluxClient), or fail.
+	"""
+
+	def __init__(self, directory, fallback=None, now=None):
+		self.directory = directory
+		self.fallback = fallback
+		self.now = now
+		self.replayed = 0
+		self.missed = 0
+
+	def _load(self, query, kind):
+		key = recordingKey(query)
+		payloadPath = os.path.join(self.directory, f"{key}.{kind}")
+		if not os.path.exists(payloadPath):
+			self.missed += 1
+			if self.fallback is None:
+				raise LookupError(f"No recorded response for query {key}")
+			print(f"No recorded response for query {key}, using the fallback")
+			return None, None
+		with open(os.path.join(self.directory, f"{key}.json"), "r", encoding="utf-8") as f:
+			recorded = json.load(f)
+		with open(payloadPath, "rb") as f:
+			payload = f.read()
+		_, stop = _queryRange(query, self.now or datetime.now(pytz.UTC))
+		self.replayed += 1
+		return payload, stop - datetime.fromisoformat(recorded["stop"])
+
+	def queryRaw(self, query, org=None, dialect=None, **kwargs):
+		payload, shift = self._load(query, "csv")
+		if payload is None:
+			return self.fallback.queryRaw(query, org=org, dialect=dialect, **kwargs)
+		blocks = []
+		for block in re.split(r"\r?\n[ \t]*\r?\n", payload.decode("utf-8").strip()):
+			if not block.strip():
+				continue
+			frame = pd.read_csv(io.StringIO(block), dtype=str, keep_default_na=False)
+			frame.columns = ["" if str(column).startswith("Unnamed:") else column for column in frame.columns]
+			for column in _TIME_COLUMNS:
+				if column in frame.columns:
+					times = pd.to_datetime(frame[column], utc=True, format="ISO8601") + shift
+					frame[column] = np.datetime_as_string(times.to_numpy(dtype="datetime64[ns]"), unit="ns", timezone="UTC")
+			blocks.append(frame.to_csv(index=False, lineterminator="\r\n"))
+		return "\r\n".join(blocks).encode("utf-8")
+
+	def query(self, query, org=None, **kwargs):
+		payload, shift = self._load(query, "tables")
+		if payload is None:
+			return self.fallback.query(query, org=org, **kwargs)
+		tables = []
+		for tableId, records in enumerate(json.loads(payload)):
+			table = FluxTable()
+			for values in records:
+				for column in _TIME_COLUMNS:
+					if isinstance(values.get(column), str):
+						values[column] = datetime.fromisoformat(values[column]) + shift
+				table.records.append(FluxRecord(table=tableId, values=values))
+			tables.append(table)
+		return tables
+
+	def health(self):
+		return {"status": "pass", "message": f"replaying {self.directory}"}
+
+	def close(self):
+		pass
+
+
+def createStandinClient(mode, configPath=None, directory=None, realClient=None):
+	"""
+	Builds the stand-in selected with INFLUX_STANDIN.
+
+	Parameters:
+		mode (str): 'synthetic', 'record' (real InfluxDB, responses saved to directory) or
+			'replay' (recorded responses, synthetic data for anything not recorded)
+		configPath (str): Machine config folder the synthetic data follows
+		directory (str): Recording folder for record/replay
+		realClient (callable): Returns the real InfluxDB client, for record
+
+	Returns:
+		The client, or None for an unknown mode
+	"""
+	if mode == "synthetic":
+		return SyntheticInfluxClient(configPath=configPath)
+	if mode == "record":
+		return RecordingInfluxClient(realClient(), directory)
+	if mode == "replay":
+		return ReplayInfluxClient(directory, fallback=SyntheticInfluxClient(configPath=configPath))
+	print(f"Unknown INFLUX_STANDIN '{mode}', using InfluxDB")
+	return None
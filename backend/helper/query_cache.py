@@ -0,0 +1,131 @@
+##################################################
+## File Name: query_cache.py
+## File Type: Python Module
+## Package Dependancies: pandas
+## Description: Bounded, thread-safe LRU cache for Flux query results with per-entry TTL
+## Usage: queryCache.get(key) / queryCache.put(key, value, ttl)
+##################################################
+
+
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from time import monotonic
+import pandas as pd
+
+QUERY_CACHE_MAX_BYTES = int(os.getenv("QUERY_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+QUERY_CACHE_MAX_TTL = float(os.getenv("QUERY_CACHE_MAX_TTL", 60))
+
+_EMPTY_ENTRY_BYTES = 64
+
+
+def canonicalQuery(query):
+	"""Collapses whitespace so formatting differences in the built Flux do not change the key"""
+	return " ".join(query.split())
+
+
+def queryCacheKey(query, windowPeriod=None):
+	"""
+	Builds the cache key for a Flux query.
+
+	Parameters:
+		query (str): The built Flux query
+		windowPeriod (str): The aggregateWindow period used (eg. '20s'), or None for raw data
+
+	Returns:
+		str: A short, stable key
+	"""
+	digest = hashlib.sha1(canonicalQuery(query).encode("utf-8")).hexdigest()
+	return f"{digest}|{windowPeriod or 'raw'}"
+
+
+def estimateSize(value):
+	"""Approximate memory footprint of a cached value in bytes"""
+	if value is None:
+		return _EMPTY_ENTRY_BYTES
+	if isinstance(value, pd.DataFrame):
+		return int(value.memory_usage(index=True, deep=True).sum())
+	if isinstance(value, pd.Series):
+		return int(value.memory_usage(index=True, deep=True))
+	return len(repr(value))
+
+
+class QueryCache:
+	"""
+	LRU cache bounded by the estimated size of its entries, each entry expiring after its own TTL.
+	Cached values are shared between requests and must be treated as read only.
+	"""
+
+	def __init__(self, maxBytes=QUERY_CACHE_MAX_BYTES):
+		self.maxBytes = maxBytes
+		self._entries = OrderedDict()  # key -> (value, size, expiresAt)
+		self._bytes = 0
+		self._lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.expirations = 0
+
+	def get(self, key):
+		"""
+		Returns:
+			tuple: (found, value). found is False on a miss or an expired entry
+		"""
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				self.misses += 1
+				return False, None
+			value, size, expiresAt = entry
+			if expiresAt <= monotonic():
+				self._remove(key)
+				self.expirations += 1
+				self.misses += 1
+				return False, None
+			self._entries.move_to_end(key)
+			self.hits += 1
+			return True, value
+
+	def put(self, key, value, ttl, size=None):
+		if ttl <= 0:
+			return
+		size = estimateSize(value) if size is None else size
+		if size > self.maxBytes:
+			return
+		with self._lock:
+			if key in self._entries:
+				self._remove(key)
+			self._entries[key] = (value, size, monotonic() + ttl)
+			self._bytes += size
+			while self._bytes > self.maxBytes and self._entries:
+				oldestKey = next(iter(self._entries))
+				self._remove(oldestKey)
+				self.evictions += 1
+
+	def _remove(self, key):
+		_, size, _ = self._entries.pop(key)
+		self._bytes -= size
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self._bytes = 0
+
+	def stats(self):
+		with self._lock:
+			lookups = self.hits + self.misses
+			return {
+				"hits": self.hits,
+				"misses": self.misses,
+				"hitRatio": (self.hits / lookups) if lookups else 0.0,
+				"evictions": self.evictions,
+				"expirations": self.expirations,
+				"entries": len(self._entries),
+				"bytes": self._bytes,
+				"maxBytes": self.maxBytes,
+			}
+
+
+# Process-wide cache used by the helper/dashboard.py query path
+queryCache = QueryCache()
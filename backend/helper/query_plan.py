@@ -0,0 +1,202 @@
+##################################################
+## File Name: query_plan.py
+## File Type: Python Module
+## Package Dependancies: None
+## Description: Flux query plans compiled once per data type config, bound to the time range, window, aggregate and series of each request
+## Usage: plan = getQueryPlan(config["Data"]["Temperature"]); query = plan.aggregate(plan.source(start, stop, series=["X"]), "20s", "mean")
+##################################################
+
+
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from helper.config_registry import onConfigReload
+
+# Plans kept for configs that do not come from the registry (eg. built by the benchmark), least recently used dropped first
+QUERY_PLAN_CACHE_SIZE = 256
+
+_FILTER = '  |> filter(fn: (r) => {})'
+
+
+def _equals(key, value):
+	return f'r["{key}"] =="{value}"'
+
+
+def _predicate(key, value):
+	"""One predicate value: a regex match when it is written /.../, an equality otherwise"""
+	if value[0] == "/" and value[-1] == "/":
+		return f'r["{key}"] =~ {value}'
+	return _equals(key, value)
+
+
+class QueryPlan:
+	"""
+	The Flux of one data type config, with everything that does not depend on the request
+	(bucket, measurement, Predicates filters, Summarised band filters and Scale map) built once.
+	Each method only adds what a request binds: time bounds, window period, aggregate function and series.
+	"""
+
+	def __init__(self, configJSON):
+		self.bucket = configJSON.get("Bucket")
+		self.measurement = configJSON.get("Measurement")
+		self.pivot = configJSON.get("Pivot")
+		self.summarised = bool(configJSON.get("Summarised"))
+		self.defaultAggregation = configJSON.get("Aggregation", "mean")
+
+		self._head = f'from(bucket: "{self.bucket}")  |> range(start: '
+		self._measurementFilter = f')  |> filter(fn: (r) => r["_measurement"] == "{self.measurement}")  '
+
+		self._predicates = []
+		self._predicateFilters = []
+		for key, value in configJSON.get("Predicates", {}).items():
+			values = value if isinstance(value, list) else [value]
+			self._predicates.append((key, tuple(values), True))
+			self._predicateFilters.append(_FILTER.format(" or ".join(_predicate(key, item) for item in values)))
+
+		scale = configJSON.get("Scale")
+		self._scaling = None
+		self._statsScaling = None
+		if "Scale" in configJSON:
+			self._scaling = f'|> map(fn: (r) => ({{r with _value: float(v: r._value) {scale}}}))'
+			self._statsScaling = f'|> map(fn: (r) => ({{r with _value: if r._stat == "count" then float(v: r._value) else float(v: r._value) {scale}}}))'
+
+		self.key = hashlib.sha1(json.dumps(configJSON, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+	def _fieldFilter(self, aggregation):
+		"""Summarised data types store one field per aggregate (eg. Max), selected instead of aggregating"""
+		return _FILTER.format(_equals("_field", aggregation.capitalize()))
+
+	def source(self, start, stop, aggregation=None, series=None):
+		"""
+		The filtered source of the data type.
+
+		Parameters:
+			start (str): Start of the range (ISO 8601)
+			stop (str): Stop of the range (ISO 8601)
+			aggregation (str): For Summarised data types, the aggregate whose field is read
+			series (list): The Pivot values to keep, None for all
+
+		Returns:
+			str: The Flux source
+		"""
+		filters = []
+		if self.summarised and aggregation is not None:
+			filters.append(self._fieldFilter(aggregation))
+		filters.extend(self._predicateFilters)
+		if series is not None:
+			filters.append(_FILTER.format(" or ".join(_equals(self.pivot, item) for item in series)))
+		return self._head + start + ", stop: " + stop + self._measurementFilter + "\n".join(filters)
+
+	def conditions(self, aggregation=None, series=None):
+		"""
+		The filters source() applies after the measurement, for callers matching rows themselves (eg. a query shared
+		by several data types). The conditions are ANDed, the values of one condition ORed.
+
+		Returns:
+			list: (key, values, regex) tuples, regex telling whether /.../ values are regular expressions
+		"""
+		conditions = []
+		if self.summarised and aggregation is not None:
+			conditions.append(("_field", (aggregation.capitalize(),), False))
+		conditions.extend(self._predicates)
+		if series is not None:
+			conditions.append((self.pivot, tuple(series), False))
+		return conditions
+
+	def filterExpression(self, aggregation=None, series=None):
+		"""The conditions (see conditions) as one Flux predicate, 'true' when there are none"""
+		clauses = []
+		for key, values, regex in self.conditions(aggregation, series):
+			clauses.append("(" + " or ".join(_predicate(key, value) if regex else _equals(key, value) for value in values) + ")")
+		return "(" + " and ".join(clauses) + ")" if clauses else "true"
+
+	def last(self, source):
+		return source + "|> last()"
+
+	def aggregate(self, source, windowPeriod, function):
+		return source + f'  |> aggregateWindow(every: {windowPeriod}, fn: {function}, createEmpty: false)'
+
+	def envelope(self, source, windowPeriod, bands):
+		"""Every band (eg. min and max) in one script, each band tagged with _envelope (Flux reads the source once per band)"""
+		branches = []
+		for band in bands:
+			bandFilter = self._fieldFilter(band) + "\n" if self.summarised else ""
+			bandAggregation = f'  |> aggregateWindow(every: {windowPeriod}, fn: {band}, createEmpty: false)' if windowPeriod else ""
+			branches.append(f'{band}Band = data\n{bandFilter}{bandAggregation}\n  |> set(key: "_envelope", value: "{band}")\n')
+		return "data = " + source + "\n" + "".join(branches) + "union(tables: [" + ", ".join(f"{band}Band" for band in bands) + "])"
+
+	def windowStats(self, source, windowPeriod, stats):
+		"""Every statistic in one script, each tagged with _stat (Flux reads the source once per statistic)"""
+		branches = [f'{stat}Stat = data\n  |> aggregateWindow(every: {windowPeriod}, fn: {stat}, createEmpty: false)\n  |> set(key: "_stat", value: "{stat}")\n' for stat in stats]
+		return "data = " + source + "\n" + "".join(branches) + "union(tables: [" + ", ".join(f"{stat}Stat" for stat in stats) + "])"
+
+	def scale(self, query, stats=False):
+		"""Applies the config Scale, counts are left unscaled in statistics queries"""
+		scaling = self._statsScaling if stats else self._scaling
+		return query + "\n" + scaling if scaling else query
+
+	def explain(self):
+		"""The compiled parts of the plan, for debugging"""
+		return {
+			"key": self.key,
+			"bucket": self.bucket,
+			"measurement": self.measurement,
+			"pivot": self.pivot,
+			"summarised": self.summarised,
+			"defaultAggregation": self.defaultAggregation,
+			"filters": list(self._predicateFilters),
+			"scaling": self._scaling,
+		}
+
+
+_plans = OrderedDict()
+_plansLock = threading.Lock()
+_planStats = {"compiled": 0, "hits": 0, "invalidations": 0}
+
+
+def getQueryPlan(configJSON):
+	"""
+	The compiled plan of a data type config, compiled on first use.
+
+	Plans are kept per config object: the registry hands out the same objects until a file changes,
+	and drops every plan when it reloads (see clearQueryPlans). Configs must not be modified in place.
+
+	Parameters:
+		configJSON (dict): The data type config (eg. Hurco -> Data -> Temperature)
+
+	Returns:
+		QueryPlan
+	"""
+	key = id(configJSON)
+	with _plansLock:
+		entry = _plans.get(key)
+		# The config is held by the entry, so its id cannot be reused while the entry exists
+		if entry is not None and entry[0] is configJSON:
+			_plans.move_to_end(key)
+			_planStats["hits"] += 1
+			return entry[1]
+
+	plan = QueryPlan(configJSON)
+	with _plansLock:
+		_plans[key] = (configJSON, plan)
+		_plans.move_to_end(key)
+		_planStats["compiled"] += 1
+		while len(_plans) > QUERY_PLAN_CACHE_SIZE:
+			_plans.popitem(last=False)
+	return plan
+
+
+def clearQueryPlans(*args):
+	"""Drops every compiled plan"""
+	with _plansLock:
+		_plans.clear()
+		_planStats["invalidations"] += 1
+
+
+def queryPlanStats():
+	with _plansLock:
+		return dict(_planStats, plans=len(_plans))
+
+
+onConfigReload(clearQueryPlans)
@@ -0,0 +1,159 @@
+##################################################
+## File Name: series_catalog.py
+## File Type: Python Module
+## Package Dependancies: influxdb-client
+## Description: Cached series (Pivot tag values) of the data types, refreshed in the background and warmed at startup
+## Usage: seriesCatalog.get(config["Data"]["Temperature"], "7d")
+##################################################
+
+
+import os
+import re
+import json
+import threading
+from time import monotonic
+from helper import dashboard
+from helper.config_registry import getConfigRegistry
+
+# Series older than this (seconds) are still answered, and refreshed in the background
+SERIES_CATALOG_TTL = float(os.getenv("SERIES_CATALOG_TTL", 300))
+# Series older than this (seconds) are refreshed before answering
+SERIES_CATALOG_MAX_AGE = float(os.getenv("SERIES_CATALOG_MAX_AGE", 86400))
+# Range used when a request does not give one (the schema.tagValues default)
+SERIES_CATALOG_RANGE = os.getenv("SERIES_CATALOG_RANGE", "30d")
+# Query the series of every config when the server starts
+SERIES_CATALOG_WARM = os.getenv("SERIES_CATALOG_WARM", "1") == "1"
+# Cached (data type, range) entries, the least recently fetched are dropped first
+SERIES_CATALOG_MAX_ENTRIES = 1024
+
+_RANGE_PATTERN = re.compile(r"^[1-9][0-9]*(s|m|h|d|w)$")
+
+
+def hasSeries(configJSON):
+	"""Whether a data type has a series selection (Predicates and a Pivot)"""
+	return "Predicates" in configJSON and "Pivot" in configJSON
+
+
+class SeriesCatalog:
+	"""
+	Series of each (bucket, measurement, predicates, pivot, range), shared by all requests.
+
+	Entries are keyed on what the query reads rather than the config file, so an edited config only
+	queries again when its series selection changed. Once older than ttl an entry is still answered
+	while a background thread refreshes it; past maxAge the caller waits for the refresh.
+	"""
+
+	def __init__(self, ttl=SERIES_CATALOG_TTL, maxAge=SERIES_CATALOG_MAX_AGE, defaultRange=SERIES_CATALOG_RANGE):
+		self.ttl = ttl
+		self.maxAge = maxAge
+		self.defaultRange = defaultRange
+		self._entries = {}
+		self._refreshing = set()
+		self._lock = threading.Lock()
+		self.hits = 0
+		self.misses = 0
+		self.refreshes = 0
+		self.errors = 0
+
+	def _key(self, configJSON, timeRange):
+		predicates = json.dumps(configJSON.get("Predicates", {}), sort_keys=True)
+		return (configJSON.get("Bucket"), configJSON.get("Measurement"), predicates, configJSON.get("Pivot"), timeRange)
+
+	def _fetch(self, key, configJSON, timeRange):
+		series = dashboard.getDataSeries(configJSON, timeRange) or []
+		with self._lock:
+			self._entries.pop(key, None)
+			self._entries[key] = (series, monotonic())
+			while len(self._entries) > SERIES_CATALOG_MAX_ENTRIES:
+				del self._entries[next(iter(self._entries))]
+		return series
+
+	def _refresh(self, key, configJSON, timeRange):
+		try:
+			self._fetch(key, configJSON, timeRange)
+			with self._lock:
+				self.refreshes += 1
+		except Exception as e:
+			# The stale series stay in place until a refresh succeeds
+			with self._lock:
+				self.errors += 1
+			print(f"Series refresh failed for {key[1]} ({timeRange}): {e}")
+		finally:
+			with self._lock:
+				self._refreshing.discard(key)
+
+	def get(self, configJSON, timeRange=None):
+		"""
+		The series of a data type.
+
+		Parameters:
+			configJSON (dict): The data type config (eg. Hurco -> Data -> Temperature)
+			timeRange (str): How far back to look for series (eg. '3h', '7d'), defaultRange when None
+
+		Returns:
+			list: The series names, False when the data type has no Predicates
+
+		Raises:
+			ValueError: When timeRange is not a range like '3h' or '7d'
+		"""
+		if "Predicates" not in configJSON:
+			return False
+		timeRange = timeRange or self.defaultRange
+		if not _RANGE_PATTERN.match(timeRange):
+			raise ValueError(f"Invalid range: '{timeRange}'. Expected format like '3h', '7d', etc.")
+
+		key = self._key(configJSON, timeRange)
+		with self._lock:
+			entry = self._entries.get(key)
+			age = monotonic() - entry[1] if entry is not None else None
+			if entry is not None and age <= self.maxAge:
+				self.hits += 1
+				if age > self.ttl and key not in self._refreshing:
+					self._refreshing.add(key)
+					threading.Thread(target=self._refresh, args=(key, configJSON, timeRange), name="series-refresh", daemon=True).start()
+				return list(entry[0])
+			self.misses += 1
+		return list(self._fetch(key, configJSON, timeRange))
+
+	def warm(self, configPath=None, timeRange=None):
+		"""Fetches the series of every data type with a series selection, returns how many were fetched"""
+		timeRange = timeRange or self.defaultRange
+		registry = getConfigRegistry(configPath)
+		warmed = 0
+		for name in registry.machineNames():
+			machineConfig = registry.machine(name)
+			if machineConfig is None:
+				continue
+			for dataType in machineConfig.dataTypes:
+				if not hasSeries(dataType.raw):
+					continue
+				try:
+					self._fetch(self._key(dataType.raw, timeRange), dataType.raw, timeRange)
+					warmed += 1
+				except Exception as e:
+					print(f"Series not warmed for {name} -> {dataType.name}: {e}")
+		print(f"Series catalog warmed: {warmed} data types ({timeRange})")
+		return warmed
+
+	def warmInBackground(self, configPath=None, timeRange=None):
+		thread = threading.Thread(target=self.warm, args=(configPath, timeRange), name="series-warm", daemon=True)
+		thread.start()
+		return thread
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+
+	def stats(self):
+		with self._lock:
+			return {
+				"entries": len(self._entries),
+				"hits": self.hits,
+				"misses": self.misses,
+				"refreshes": self.refreshes,
+				"errors": self.errors,
+				"refreshing": len(self._refreshing),
+			}
+
+
+seriesCatalog = SeriesCatalog()
@@ -0,0 +1,125 @@
+##################################################
+## File Name: series_merge.py
+## File Type: Python Module
+## Package Dependancies: pandas, numpy
+## Description: Merges the result frames of several graphs onto one UTC time axis
+## Usage: mergeFrames([(frame, ["X", "Y"]), (frame, ["value"])])
+##################################################
+
+
+import numpy as np
+import pandas as pd
+
+
+def toTimeIndexed(frame):
+	"""
+	Returns a query result frame indexed by its UTC timestamps.
+	Pivoted results are already indexed by time, un-pivoted results carry time as a column.
+	"""
+	if "time" in frame.columns:
+		frame = frame.set_index("time")
+	index = pd.DatetimeIndex(frame.index)
+	index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+	return frame.set_axis(index, axis=0)
+
+
+def _stepNs(index):
+	"""Median spacing of a time index in nanoseconds, None when there are fewer than two points"""
+	if len(index) < 2:
+		return None
+	steps = np.diff(np.sort(index.asi8))
+	steps = steps[steps > 0]
+	return int(np.median(steps)) if len(steps) else None
+
+
+def commonGridStep(indexes):
+	"""
+	Works out whether several time indexes need resampling before they can be merged.
+
+	Parameters:
+		indexes (list): DatetimeIndex per source
+
+	Returns:
+		int: Grid step in nanoseconds (the coarsest source step), or None when the sources already share a grid
+	"""
+	steps = [_stepNs(index) for index in indexes]
+	knownSteps = [step for step in steps if step]
+	if len(indexes) < 2 or not knownSteps:
+		return None
+	gridStep = max(knownSteps)
+	if len(set(knownSteps)) == 1 and all((index.asi8 % gridStep == 0).all() for index in indexes):
+		return None
+	return gridStep
+
+
+def mergeFrames(sources):
+	"""
+	Aligns several graph results on their real UTC timestamps and averages values that land on the
+	same timestamp and series. When sources have different intervals (or are offset from each other)
+	every source is floored onto the coarsest source's grid first.
+
+	Parameters:
+		sources (list): (frame, seriesNames) tuples. frame is a query result (time index or 'time' column),
+			seriesNames the columns to take from it, in output order
+
+	Returns:
+		tuple: (times, seriesNames, values)
+			times (pd.DatetimeIndex): Sorted UTC timestamps
+			seriesNames (list): Series in order of first appearance
+			values (np.ndarray): len(times) x len(seriesNames) floats, NaN where a series has no value
+	"""
+	seriesNames = []
+	seriesCodes = {}
+	parts = []
+	for frame, names in sources:
+		if frame is None or frame.empty:
+			continue
+		frame = toTimeIndexed(frame)
+		names = [name for name in names if name in frame.columns]
+		if not names:
+			continue
+		for name in names:
+			if name not in seriesCodes:
+				seriesCodes[name] = len(seriesNames)
+				seriesNames.append(name)
+		block = frame[names].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+		parts.append((frame.index, np.array([seriesCodes[name] for name in names]), block))
+
+	if not parts:
+		return pd.DatetimeIndex([], tz="UTC", name="time"), [], np.empty((0, 0))
+
+	gridStep = commonGridStep([index for index, _, _ in parts])
+
+	# Long (time, series, value) arrays for every non-empty cell of every source
+	allTimes, allCodes, allValues = [], [], []
+	for index, codes, block in parts:
+		times = index.asi8
+		if gridStep:
+			times = times - np.mod(times, gridStep)
+		present = ~np.isnan(block)
+		rows, columns = np.nonzero(present)
+		allTimes.append(times[rows])
+		allCodes.append(codes[columns])
+		allValues.append(block[present])
+	allTimes = np.concatenate(allTimes)
+	allCodes = np.concatenate(allCodes)
+	allValues = np.concatenate(allValues)
+
+	# Average collisions: sum and count per (time, series) cell
+	uniqueTimes, timeCodes = np.unique(allTimes, return_inverse=True)
+	cells = timeCodes * len(seriesNames) + allCodes
+	size = len(uniqueTimes) * len(seriesNames)
+	sums = np.bincount(cells, weights=allValues, minlength=size)
+	counts = np.bincount(cells, minlength=size)
+	with np.errstate(invalid="ignore", divide="ignore"):
+		values = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan).reshape(len(uniqueTimes), len(seriesNames))
+
+	times = pd.DatetimeIndex(pd.to_datetime(uniqueTimes, utc=True), name="time")
+	return times, seriesNames, values
+
+
+def toNullableList(values):
+	"""Converts a float array to a list with None in place of NaN (JSON null)"""
+	result = values.astype(object)
+	result[np.isnan(values)] = None
+	return result.tolist()
@@ -0,0 +1,193 @@
+##################################################
+## File Name: single_flight.py
+## File Type: Python Module
+## Package Dependancies: None (fcntl for the cross-process variant)
+## Description: Coalesces identical in-flight Flux queries so concurrent callers share one execution
+## Usage: querySingleFlight.do(key, lambda: client.query(query)) / querySingleFlight.do(key, lambda: client.queryRaw(query), decode=parse)
+##################################################
+
+
+import os
+import hashlib
+import tempfile
+import threading
+from time import time, monotonic
+
+try:
+	import fcntl
+except ImportError:
+	# Not available on Windows, only the in-process coalescing is used there
+	fcntl = None
+
+SINGLE_FLIGHT = os.getenv("SINGLE_FLIGHT", "1") == "1"
+# Directory for the cross-process lock/result files, unset to coalesce within the process only
+SINGLE_FLIGHT_LOCK_DIR = os.getenv("SINGLE_FLIGHT_LOCK_DIR", "")
+# Result files older than this (seconds) are removed
+SINGLE_FLIGHT_RESULT_TTL = float(os.getenv("SINGLE_FLIGHT_RESULT_TTL", 60))
+
+# Marks a shared result file that is missing, stale or unreadable
+_MISS = object()
+
+
+class _Call:
+	"""One in-flight execution, the callers waiting on it read its result or error"""
+
+	def __init__(self):
+		self.done = threading.Event()
+		self.result = None
+		self.error = None
+		self.waiters = 0
+
+
+class SingleFlight:
+	"""
+	Runs a function once per key at a time. Callers arriving while an execution for the same key is
+	in flight wait for it and get its result (or its exception) instead of running the function again.
+	Shared results must be treated as read only.
+
+	With a lock directory, calls given a decode function are also serialised across processes with a
+	file lock: the leader writes the raw bytes it fetched next to the lock, and processes that were
+	waiting on the lock decode them instead of querying again. Only data is shared, never objects.
+	"""
+
+	def __init__(self, lockDir=None, resultTTL=SINGLE_FLIGHT_RESULT_TTL):
+		self.lockDir = lockDir if fcntl is not None else None
+		self.resultTTL = resultTTL
+		self._calls = {}
+		self._lock = threading.Lock()
+		self._lastPrune = 0.0
+		self.executions = 0
+		self.coalesced = 0
+		self.sharedAcrossProcesses = 0
+		if self.lockDir:
+			os.makedirs(self.lockDir, mode=0o700, exist_ok=True)
+			try:
+				os.chmod(self.lockDir, 0o700)
+			except OSError as e:
+				print(f"Single-flight lock directory {self.lockDir} permissions not restricted: {e}")
+
+	def do(self, key, function, decode=None):
+		"""
+		Parameters:
+			key (str): Identifies identical work (eg. the canonical query)
+			function (callable): Runs the work, called without arguments
+			decode (callable): Turns the bytes function returns into the result. Only these calls are
+				shared across processes, as the bytes are what the result file holds
+
+		Returns:
+			The function's result, possibly computed for another caller
+		"""
+		with self._lock:
+			call = self._calls.get(key)
+			if call is not None:
+				call.waiters += 1
+				self.coalesced += 1
+				leader = False
+			else:
+				call = self._calls[key] = _Call()
+				leader = True
+
+		if not leader:
+			call.done.wait()
+			if call.error is not None:
+				raise call.error
+			return call.result
+
+		try:
+			if self.lockDir and decode is not None:
+				call.result = self._runLocked(key, function, decode)
+			else:
+				result = self._run(function)
+				call.result = decode(result) if decode is not None else result
+		except BaseException as e:
+			call.error = e
+			raise
+		finally:
+			with self._lock:
+				del self._calls[key]
+			call.done.set()
+		return call.result
+
+	def _run(self, function):
+		with self._lock:
+			self.executions += 1
+		return function()
+
+	def _runLocked(self, key, function, decode):
+		"""Cross-process leader: a result written after this call started waiting is as fresh as running again"""
+		name = hashlib.sha1(key.encode("utf-8")).hexdigest()
+		lockPath = os.path.join(self.lockDir, name + ".lock")
+		resultPath = os.path.join(self.lockDir, name + ".result")
+		startedAt = time()
+
+		with os.fdopen(os.open(lockPath, os.O_RDWR | os.O_CREAT, 0o600), "r+b") as lockFile:
+			fcntl.flock(lockFile, fcntl.LOCK_EX)
+			try:
+				result = self._readResult(resultPath, startedAt, decode)
+				if result is not _MISS:
+					with self._lock:
+						self.sharedAcrossProcesses += 1
+					return result
+
+				raw = self._run(function)
+				self._writeResult(resultPath, raw)
+				return decode(raw)
+			finally:
+				fcntl.flock(lockFile, fcntl.LOCK_UN)
+
+	def _readResult(self, resultPath, startedAt, decode):
+		"""The decoded result another process wrote after startedAt, or _MISS. Anything that fails to read or decode is a miss"""
+		try:
+			if os.path.getmtime(resultPath) < startedAt:
+				return _MISS
+			with open(resultPath, "rb") as f:
+				return decode(f.read())
+		except Exception as e:
+			if not isinstance(e, FileNotFoundError):
+				print(f"Single-flight result {resultPath} ignored: {e}")
+			return _MISS
+
+	def _writeResult(self, resultPath, raw):
+		try:
+			if isinstance(raw, str):
+				raw = raw.encode("utf-8")
+			if not isinstance(raw, (bytes, bytearray)):
+				raise TypeError(f"expected bytes, got {type(raw).__name__}")
+			handle, tmpPath = tempfile.mkstemp(dir=self.lockDir, suffix=".tmp")
+			with os.fdopen(handle, "wb") as f:
+				f.write(raw)
+			os.replace(tmpPath, resultPath)
+		except (OSError, TypeError) as e:
+			print(f"Single-flight result not shared across processes: {e}")
+		self._prune()
+
+	def _prune(self):
+		"""Removes result files nobody can still be waiting for, at most once per resultTTL"""
+		now = monotonic()
+		if now - self._lastPrune < self.resultTTL:
+			return
+		self._lastPrune = now
+		cutoff = time() - self.resultTTL
+		for fileName in os.listdir(self.lockDir):
+			if not fileName.endswith((".result", ".tmp")):
+				continue
+			path = os.path.join(self.lockDir, fileName)
+			try:
+				if os.path.getmtime(path) < cutoff:
+					os.remove(path)
+			except OSError:
+				pass
+
+	def stats(self):
+		with self._lock:
+			return {
+				"executions": self.executions,
+				"coalesced": self.coalesced,
+				"sharedAcrossProcesses": self.sharedAcrossProcesses,
+				"inFlight": len(self._calls),
+				"crossProcess": bool(self.lockDir),
+			}
+
+
+# Process-wide coalescing used by the helper/dashboard.py query path
+querySingleFlight = SingleFlight(SINGLE_FLIGHT_LOCK_DIR or None)
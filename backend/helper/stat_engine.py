@@ -0,0 +1,241 @@
+##################################################
+## File Name: stat_engine.py
+## File Type: Python Module
+## Package Dependancies: influxdb-client, pandas
+## Description: Latest values for many Stat components with one grouped last() query per bucket/measurement
+## Usage: getLatestValues([{"id": "45", "machine_name": "Hurco", "data_type": "Temperature"}], MACHINE_CONFIG_PATH)
+##################################################
+
+
+import os
+import re
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import pytz
+from helper import dashboard
+from helper.query_cache import queryCache, queryCacheKey
+from helper.config_registry import getConfigRegistry
+from helper.query_plan import getQueryPlan
+
+# A value is stale when it is older than this many Sample_Intervals
+STAT_STALE_INTERVALS = float(os.getenv("STAT_STALE_INTERVALS", 5))
+# How far back last() looks when a request does not give a range
+STAT_DEFAULT_RANGE = os.getenv("STAT_DEFAULT_RANGE", "1h")
+
+_RANGE_PATTERN = re.compile(r"^[1-9][0-9]*(s|m|h|d|w)$")
+_SCALE_PATTERN = re.compile(r"^\s*([*/+-])\s*([0-9]*\.?[0-9]+(?:[eE][+-]?[0-9]+)?)\s*$")
+
+
+def loadMachineConfigs(configPath):
+	"""
+	Every machine config of the config folder, from the shared config registry.
+
+	Returns:
+		dict: {machine name: config}, legacy copies (file names with a '-') are skipped like the machine list does
+	"""
+	machines = getConfigRegistry(configPath).machines()
+	return {name: machines[name].raw for name in sorted(machines) if "-" not in name}
+
+
+def _isRegex(value):
+	return isinstance(value, str) and len(value) > 1 and value[0] == "/" and value[-1] == "/"
+
+
+def _resolveDataType(machineConfig, request):
+	"""Finds the data type of a request by name ("data_type") or by 1-based position ("graph", as in generate_data)"""
+	dataTypes = list(machineConfig.get("Data", {}).items())
+	if request.get("data_type"):
+		return next(((name, config) for name, config in dataTypes if name == request["data_type"]), (None, None))
+	try:
+		index = int(request.get("graph")) - 1
+	except (TypeError, ValueError):
+		return None, None
+	return dataTypes[index] if 0 <= index < len(dataTypes) else (None, None)
+
+
+def resolveStatRequests(requests, machineConfigs):
+	"""
+	Turns the requested stat components into query specs, expanding fleet requests
+	({"machine_name": "*"}) into one spec per machine having the data type.
+
+	Parameters:
+		requests (list): [{"id", "machine_name", "data_type" or "graph", "series", "aggregate", "range"}]
+		machineConfigs (dict): As returned by loadMachineConfigs
+
+	Returns:
+		tuple: (specs, errors) where errors maps a request id to a message
+	"""
+	specs = []
+	errors = {}
+	for position, request in enumerate(requests):
+		request = request if isinstance(request, dict) else {}
+		requestId = str(request.get("id", position))
+		machineName = request.get("machine_name")
+		machines = list(machineConfigs) if machineName == "*" else [machineName]
+		timeRange = request.get("range") or STAT_DEFAULT_RANGE
+		if not _RANGE_PATTERN.match(str(timeRange)):
+			errors[requestId] = f"Invalid range '{timeRange}'"
+			continue
+		series = request.get("series") or []
+		series = [series] if isinstance(series, str) else list(series)
+		aggregate = str(request.get("aggregate") or "max").lower()
+
+		found = False
+		for machine in machines:
+			if machine not in machineConfigs:
+				continue
+			dataTypeName, config = _resolveDataType(machineConfigs[machine], request)
+			if config is None:
+				continue
+			found = True
+			specs.append({
+				"id": f"{requestId}/{machine}" if machineName == "*" else requestId,
+				"machine": machine,
+				"dataType": dataTypeName,
+				"config": config,
+				"series": series if config.get("Pivot") else [],
+				# A Stat shows a single value, so an envelope falls back to the max like _buildQueryAndWindow does
+				"aggregate": "max" if aggregate == dashboard.ENVELOPE else aggregate,
+				"range": timeRange,
+			})
+		if not found:
+			errors[requestId] = f"No data type found for machine '{machineName}'"
+	return specs, errors
+
+
+def _conditions(spec):
+	"""The filters of one spec, from the data type's query plan so a Stat selects the rows its graph would"""
+	return getQueryPlan(spec["config"]).conditions(spec["aggregate"], spec["series"] or None)
+
+
+def _componentFilter(spec):
+	"""Flux predicate selecting one spec's series"""
+	return getQueryPlan(spec["config"]).filterExpression(spec["aggregate"], spec["series"] or None)
+
+
+def _buildGroupQuery(bucket, measurement, timeRange, specs):
+	"""One last() query for every spec reading the same bucket, measurement and range"""
+	filters = sorted({_componentFilter(spec) for spec in specs})
+	return (
+		f'from(bucket: "{bucket}")\n'
+		f'  |> range(start: -{timeRange})\n'
+		f'  |> filter(fn: (r) => r["_measurement"] == "{measurement}")\n'
+		f'  |> filter(fn: (r) => {" or ".join(filters)})\n'
+		f'  |> last()'
+	)
+
+
+def _tagColumns(specs):
+	columns = {"_field"}
+	for spec in specs:
+		columns.update((spec["config"].get("Predicates") or {}).keys())
+		if spec["config"].get("Pivot"):
+			columns.add(spec["config"]["Pivot"])
+	return sorted(columns)
+
+
+def _matchMask(frame, spec):
+	"""Rows of a group result belonging to a spec, the local equivalent of _componentFilter"""
+	mask = np.ones(len(frame), dtype=bool)
+	for key, values, regex in _conditions(spec):
+		column = frame[key].astype("string").fillna("")
+		keyMask = np.zeros(len(frame), dtype=bool)
+		for value in values:
+			if regex and _isRegex(value):
+				keyMask |= column.str.contains(value[1:-1], regex=True).to_numpy(dtype=bool)
+			else:
+				keyMask |= (column == value).to_numpy(dtype=bool)
+		mask &= keyMask
+	return mask
+
+
+def _applyScale(value, scale):
+	"""Applies a config Scale (eg. '/10000.0') the way the Flux map() in _buildQueryFromConfig does"""
+	match = _SCALE_PATTERN.match(scale or "")
+	if not match:
+		return value
+	operator, operand = match.group(1), float(match.group(2))
+	return {"*": value * operand, "/": value / operand, "+": value + operand, "-": value - operand}[operator]
+
+
+def _specResult(frame, spec, now):
+	"""The latest value of a spec: per series the newest row, the reported value is the first series with data"""
+	config = spec["config"]
+	pivotKey = config.get("Pivot")
+	rows = frame[_matchMask(frame, spec)] if frame is not None else None
+	if rows is None or rows.empty:
+		return None
+
+	rows = rows.sort_values("time")
+	seriesColumn = rows[pivotKey] if pivotKey else pd.Series("value", index=rows.index)
+	latest = rows.assign(_series=seriesColumn.astype(str)).groupby("_series", sort=True).tail(1).set_index("_series")
+
+	values = {}
+	for seriesName, row in latest.iterrows():
+		value = pd.to_numeric(row["value"], errors="coerce")
+		if pd.isna(value):
+			continue
+		values[seriesName] = {"value": _applyScale(float(value), config.get("Scale")), "time": row["time"]}
+	if not values:
+		return None
+
+	order = [name for name in spec["series"] if name in values] or sorted(values)
+	seriesName = order[0]
+	latestTime = values[seriesName]["time"]
+	staleness = max((now - latestTime).total_seconds(), 0.0)
+	sampleInterval = dashboard._intervalToSeconds(config.get("Sample_Interval"))
+	return {
+		"value": values[seriesName]["value"],
+		"series": seriesName,
+		"time": latestTime.isoformat(),
+		"staleness": staleness,
+		"stale": bool(sampleInterval) and staleness > STAT_STALE_INTERVALS * sampleInterval,
+		"units": config.get("Units", ""),
+		"machine_name": spec["machine"],
+		"data_type": spec["dataType"],
+		"values": {name: {"value": entry["value"], "time": entry["time"].isoformat()} for name, entry in values.items()},
+	}
+
+
+def getLatestValues(requests, configPath, now=None):
+	"""
+	Latest value of many Stat components, with one grouped last() query per bucket/measurement/range.
+
+	Parameters:
+		requests (list): Stat component requests, see resolveStatRequests
+		configPath (str): The machine config folder (MACHINE_CONFIG_PATH)
+		now (datetime): Reference time for the staleness (UTC now by default)
+
+	Returns:
+		tuple: (results, queryCount) where results maps each component id to its value dict
+			(or {"error": message} / None when there is no recent value)
+	"""
+	now = now or datetime.now(pytz.UTC)
+	specs, errors = resolveStatRequests(requests, loadMachineConfigs(configPath))
+	results = {requestId: {"error": message} for requestId, message in errors.items()}
+
+	groups = {}
+	for spec in specs:
+		groups.setdefault((spec["config"]["Bucket"], spec["config"]["Measurement"], spec["range"]), []).append(spec)
+
+	queryCount = 0
+	for (bucket, measurement, timeRange), groupSpecs in groups.items():
+		query = _buildGroupQuery(bucket, measurement, timeRange, groupSpecs)
+		cacheKey = queryCacheKey(query, "last")
+		found, frame = queryCache.get(cacheKey)
+		if not found:
+			queryCount += 1
+			try:
+				frame = dashboard._runQueryFrame(query, _tagColumns(groupSpecs))
+			except Exception as e:
+				# Only this group fails, and the failure is not cached so the next poll retries it
+				print(f"Error in getLatestValues ({bucket}/{measurement}): {e}")
+				for spec in groupSpecs:
+					results[spec["id"]] = {"error": f"Failed to query {spec['machine']} {spec['dataType']}: {e}"}
+				continue
+			ttl = min((dashboard._cacheTTL(spec["config"], None) for spec in groupSpecs), default=0)
+			queryCache.put(cacheKey, frame, ttl)
+		for spec in groupSpecs:
+			results[spec["id"]] = _specResult(frame, spec, now)
+	return results, queryCount
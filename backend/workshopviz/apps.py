@@ -1,6 +1,30 @@
+import os
+import sys
+
 from django.apps import AppConfig
 
 
+def _is_server_process():
+    """False for management commands other than runserver, and for the autoreloader's watcher process"""
+    if len(sys.argv) > 1 and os.path.basename(sys.argv[0]) == 'manage.py':
+        if sys.argv[1] != 'runserver':
+            return False
+        return os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv
+    return True
+
+
 class WorkshopvizConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'workshopviz'
+
+    def ready(self):
+        # Record the helper/dashboard.py pipeline stages in the workshopviz metrics
+        from helper.dashboard import setPipelineObserver
+        from .metrics import pipeline_metrics
+        setPipelineObserver(pipeline_metrics)
+
+        # Fill the series catalog in the background, so the component builder does not wait on InfluxDB
+        from helper.series_catalog import seriesCatalog, SERIES_CATALOG_WARM
+        from backend.settings import MACHINE_CONFIG_PATH
+        if SERIES_CATALOG_WARM and MACHINE_CONFIG_PATH and _is_server_process():
+            seriesCatalog.warmInBackground(MACHINE_CONFIG_PATH)
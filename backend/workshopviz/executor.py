@@ -0,0 +1,37 @@
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+from django.conf import settings
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Get the process-wide executor used to fan out Influx queries"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.QUERY_WORKERS,
+                    thread_name_prefix='query-worker'
+                )
+    return _executor
+
+
+def map_ordered(func, items):
+    """
+    Run func over items on the shared executor and return the results in input order.
+
+    Single items run inline to skip the thread hand-off. The first exception raised
+    (in input order) is re-raised once every task has finished. Each task runs in a copy
+    of the caller's context, so request-scoped metrics follow it onto the worker thread.
+    """
+    items = list(items)
+    if len(items) <= 1:
+        return [func(item) for item in items]
+
+    futures = [get_executor().submit(contextvars.copy_context().run, func, item) for item in items]
+    wait(futures)
+    return [future.result() for future in futures]
@@ -1,18 +1,24 @@
 import logging
-from influxdb_client import InfluxDBClient
 from django.conf import settings
 from datetime import datetime
+from helper.influx_pool import getInfluxClient
 
 logger = logging.getLogger(__name__)
 
 class InfluxDBService:
     def __init__(self):
-        self.client = InfluxDBClient(
-            url=settings.INFLUX_URL,
-            token=settings.INFLUX_TOKEN,
-            org=settings.INFLUX_ORG
+        # Shared per-process client, see helper/influx_pool.py
+        self.pooled_client = getInfluxClient(
+            settings.DB_LINK,
+            settings.INFLUX_TOKEN,
+            settings.DB_ORG
         )
-        self.query_api = self.client.query_api()
+        self.client = self.pooled_client.client
+        self.query_api = self.pooled_client.queryApi
+
+    def health(self):
+        """Run a health check on the shared client"""
+        return self.pooled_client.health()
 
     def test_connection(self):
         """Test the connection to InfluxDB"""
@@ -35,7 +41,7 @@ class InfluxDBService:
     def execute_flux_query(self, query):
         """Execute a Flux query against InfluxDB"""
         try:
-            result = self.query_api.query(query)
+            result = self.pooled_client.query(query)
             data = []
             for table in result:
                 for record in table.records:
@@ -50,6 +56,6 @@ class InfluxDBService:
             return {'status': 'error', 'message': str(e)}
 
     def close(self):
-        """Close the InfluxDB client"""
-        if self.client:
-            self.client.close()
+        """Release the InfluxDB client (the pooled connection stays open for other requests)"""
+        self.client = None
+        self.query_api = None
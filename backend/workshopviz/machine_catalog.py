@@ -0,0 +1,129 @@
+import hashlib
+import json
+import logging
+import threading
+from time import monotonic
+
+from django.conf import settings
+
+from helper.config_registry import getConfigRegistry
+from helper.series_catalog import seriesCatalog, hasSeries
+from .executor import map_ordered
+from .mysql_service import MySQLService
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_cached = None
+
+
+def data_type_entry(data_type):
+    """The component builder's description of a data type (a helper.config_registry.DataTypeConfig)"""
+    return {
+        'id': str(data_type.index),  # Use sequential IDs
+        'title': data_type.name,  # Use the key as title (e.g., 'Acceleration', 'Air Flow', 'Air Pressure')
+        'unit': data_type.units,
+        'bucket': data_type.bucket,
+        'measurement': data_type.measurement,
+        'pivot': data_type.pivot,
+        'scale': data_type.scale or 'linear',
+        'timeRange': '3h',  # Default time range
+        'availableSeries': []  # Will be populated dynamically
+    }
+
+
+def machines_with_config(db_machines, config_names):
+    """Config names that also exist in the database, with their asset id (first DB entry wins on duplicate names)"""
+    db_by_name = {}
+    for machine in db_machines:
+        db_by_name.setdefault(machine['vName'], machine)
+
+    machines = []
+    for config_name in config_names:
+        db_match = db_by_name.get(config_name)
+        if db_match:
+            machines.append({
+                'iAsset_id': db_match['iAsset_id'],
+                'vName': config_name,
+                'hasConfig': True,
+                'inDatabase': True
+            })
+    return machines
+
+
+def _series(raw):
+    """Series of a data type from the series catalog, None when they could not be fetched (the client asks again)"""
+    try:
+        return seriesCatalog.get(raw) or []
+    except Exception as e:
+        logger.warning(f"Series not available for {raw.get('Measurement')}: {e}")
+        return None
+
+
+def build_catalog(config_path):
+    """
+    Every machine and dropdown config with its data types and known series.
+
+    Returns a dict (machines, dropdowns, data_types). machines is None when the machine list
+    could not be read from the database, the configs are still listed.
+    """
+    db_machines = MySQLService().get_machine_assets()
+    if db_machines is None:
+        logger.warning('Machine catalog built without the database machine list')
+
+    registry = getConfigRegistry(config_path)
+    configs = registry.machines()
+    config_names = registry.machineNames()
+
+    data_types = {}
+    with_series = []
+    for name in sorted(set(config_names) | set(registry.dropdownNames())):
+        entries = []
+        for data_type in configs[name].dataTypes:
+            entry = data_type_entry(data_type)
+            entry['hasPivot'] = data_type.hasPivot
+            if hasSeries(data_type.raw):
+                with_series.append((entry, data_type.raw))
+            entries.append(entry)
+        data_types[name] = entries
+
+    # Mostly served from the (warmed) series catalog, anything missing is fetched concurrently
+    for (entry, _), series in zip(with_series, map_ordered(_series, [raw for _, raw in with_series])):
+        entry['availableSeries'] = series
+
+    return {
+        'machines': machines_with_config(db_machines, config_names) if db_machines is not None else None,
+        'dropdowns': registry.dropdownNames(),
+        'data_types': data_types,
+    }
+
+
+def get_catalog(config_path):
+    """
+    The serialised catalog and its ETag, rebuilt when the configs changed or after MACHINE_CATALOG_TTL seconds.
+
+    Returns (body, etag). A catalog without the database machine list is not reused.
+    """
+    global _cached
+    version = getConfigRegistry(config_path).currentVersion()
+    cached = _cached
+    if cached and cached['config_path'] == config_path and cached['version'] == version \
+            and monotonic() - cached['built_at'] < settings.MACHINE_CATALOG_TTL:
+        return cached['body'], cached['etag']
+
+    with _lock:
+        cached = _cached
+        if cached and cached['config_path'] == config_path and cached['version'] == version \
+                and monotonic() - cached['built_at'] < settings.MACHINE_CATALOG_TTL:
+            return cached['body'], cached['etag']
+
+        catalog = build_catalog(config_path)
+        body = json.dumps({
+            'status': 'success',
+            'message': 'Machine catalog retrieved successfully',
+            'data': catalog
+        }).encode('utf-8')
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if catalog['machines'] is not None:
+            _cached = {'config_path': config_path, 'version': version, 'built_at': monotonic(), 'body': body, 'etag': etag}
+        return body, etag
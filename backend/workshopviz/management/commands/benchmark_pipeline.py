@@ -0,0 +1,252 @@
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import tracemalloc
+from datetime import datetime, timezone
+from itertools import product
+from time import perf_counter
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory
+
+from helper import dashboard
+from helper.influx_standin import SyntheticInfluxClient
+from helper.query_cache import queryCache
+from helper.series_merge import mergeFrames
+from workshopviz import metrics, views
+
+BENCH_MACHINE = 'Bench'
+BENCH_PIVOT = 'Axis'
+
+
+def _split(value, cast=str):
+    return [cast(item.strip()) for item in value.split(',') if item.strip()]
+
+
+def _bench_config(graph_count, sample_interval):
+    """A machine config with one pivoted data type per graph, each on its own measurement"""
+    return {
+        'Data': {
+            f'Signal {index + 1}': {
+                'Bucket': 'Bench',
+                'Measurement': f'Signal{index + 1}',
+                'Pivot': BENCH_PIVOT,
+                'Units': '',
+                'Sample_Interval': sample_interval,
+            }
+            for index in range(graph_count)
+        }
+    }
+
+
+def _measure(func, repeat):
+    """
+    Run func repeat times for latency, then once more under tracemalloc.
+
+    tracemalloc only reports net allocations, so 'allocated_blocks' is the number of blocks
+    still allocated after the stage (what it retained), and 'peak_memory_bytes' the peak over its run.
+    """
+    latencies = []
+    for _ in range(repeat):
+        queryCache.clear()
+        gc.collect()
+        start = perf_counter()
+        func()
+        latencies.append(perf_counter() - start)
+
+    queryCache.clear()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    differences = after.compare_to(before, 'filename')
+
+    return {
+        'latency_ms': {
+            'min': min(latencies) * 1000,
+            'median': statistics.median(latencies) * 1000,
+            'mean': statistics.fmean(latencies) * 1000,
+            'max': max(latencies) * 1000,
+        },
+        'peak_memory_bytes': max(peak - baseline, 0),
+        'allocated_blocks': sum(difference.count_diff for difference in differences),
+        'allocated_bytes': sum(difference.size_diff for difference in differences),
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the generate_data pipeline offline against a synthetic InfluxDB stand-in'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--series', default='4,16', help='Series per graph, comma separated')
+        parser.add_argument('--interval', default='1s,0.1s', help='Sample_Interval values, comma separated')
+        parser.add_argument('--range', dest='ranges', default='1h,24h', help='Request ranges, comma separated')
+        parser.add_argument('--graphs', default='1,4', help='Graphs per request, comma separated')
+        parser.add_argument('--aggregate', default='max', help='Aggregate of the request')
+        parser.add_argument('--downsample', default='aggregate', choices=('aggregate', 'lttb'))
+        parser.add_argument('--width', type=int, default=None, help='Plot width in pixels sent with the request')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per stage')
+        parser.add_argument('--seed', type=int, default=0, help='Seed of the synthetic data')
+        parser.add_argument('--output', default=None, help='Where to write the JSON results')
+        parser.add_argument('--compare', default=None, help='Earlier JSON results to compare the medians with')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+
+        datasets = [
+            {'series': series, 'sample_interval': interval, 'range': time_range, 'graphs': graphs}
+            for series, interval, time_range, graphs in product(
+                _split(options['series'], int), _split(options['interval']),
+                _split(options['ranges']), _split(options['graphs'], int))
+        ]
+
+        results = []
+        try:
+            for dataset in datasets:
+                self.stdout.write(f"Dataset {json.dumps(dataset)}")
+                result = self._run_dataset(dataset, options)
+                results.append(result)
+                for stage, stats in result['stages'].items():
+                    self.stdout.write(
+                        f"  {stage:<18} median {stats['latency_ms']['median']:>9.2f} ms"
+                        f"  peak {stats['peak_memory_bytes'] / 1024 / 1024:>8.2f} MiB"
+                        f"  blocks {stats['allocated_blocks']:>8}")
+        finally:
+            dashboard.useInfluxClient(None)
+            queryCache.clear()
+
+        report = {
+            'meta': {
+                'created': datetime.now(timezone.utc).isoformat(),
+                'commit': self._git_commit(),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'options': {key: options[key] for key in ('aggregate', 'downsample', 'width', 'repeat', 'seed')},
+            },
+            'results': results,
+        }
+
+        output = options['output'] or f"benchmark-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+        if options['compare']:
+            self._compare(options['compare'], report)
+
+    def _run_dataset(self, dataset, options):
+        series = [f'S{index + 1}' for index in range(dataset['series'])]
+        graphs = [str(index + 1) for index in range(dataset['graphs'])]
+        body = {
+            'machine_names': [BENCH_MACHINE] * len(graphs),
+            'graphs': graphs,
+            'series': {str(index): series for index in range(len(graphs))},
+            'aggregate': options['aggregate'],
+            'type': 'Line',
+            'range': dataset['range'],
+            'downsample': options['downsample'],
+        }
+        if options['width']:
+            body['width'] = options['width']
+
+        with tempfile.TemporaryDirectory() as config_path:
+            with open(os.path.join(config_path, f'{BENCH_MACHINE}.json'), 'w', encoding='utf-8') as f:
+                json.dump(_bench_config(len(graphs), dataset['sample_interval']), f)
+            # Synthetic data following the bench config: one measurement per graph, series S1..Sn
+            dashboard.useInfluxClient(SyntheticInfluxClient(
+                configPath=config_path, seriesCount=dataset['series'], seed=options['seed']))
+
+            with mock.patch.object(views, 'MACHINE_CONFIG_PATH', config_path):
+                plan, error = views._plan_generate_request(body)
+                if error:
+                    raise CommandError(error['message'])
+                factory = APIRequestFactory()
+                file_path = os.path.join(config_path, f'{BENCH_MACHINE}.json')
+                custom_query = {
+                    'machine_name': BENCH_MACHINE,
+                    'date_from': plan['jobs'][0]['date_from'],
+                    'date_to': plan['jobs'][0]['date_to'],
+                    'data_types': [views._graph_context(plan['jobs'][0])['graphs_info'][0]],
+                    'type': 'Line',
+                }
+
+                # Inputs of the stages measured on their own, fetched once
+                queryCache.clear()
+                frames = [views._fetch_graph_data(job)[0] for job in plan['jobs']]
+                influx_query, _ = dashboard._buildQueryAndWindow(
+                    _bench_config(1, dataset['sample_interval'])['Data']['Signal 1'], custom_query['data_types'][0],
+                    custom_query['date_from'], custom_query['date_to'], 'Line', False)
+                long_frame = dashboard._runQueryFrame(influx_query, [BENCH_PIVOT])
+                merge_sources = [(frame, series) for frame in frames]
+
+                def generate_data():
+                    response = views.generate_data(factory.post('/api/generate-data/', body, format='json'))
+                    if response.status_code != 200:
+                        raise CommandError(f'generate_data answered {response.status_code}: {response.content[:200]}')
+
+                stages = {
+                    'generate_data': _measure(generate_data, options['repeat']),
+                    'getCustomData': _measure(lambda: dashboard.getCustomData(custom_query, file_path, preprocess=False), options['repeat']),
+                    '_pivotData': _measure(lambda: dashboard._pivotData(long_frame, BENCH_PIVOT), options['repeat']),
+                    'preprocessResults': _measure(lambda: dashboard.preprocessResults(frames), options['repeat']),
+                    'merge': _measure(lambda: mergeFrames(merge_sources), options['repeat']),
+                }
+
+                # Split of one end-to-end request by pipeline stage (see workshopviz.metrics)
+                queryCache.clear()
+                with metrics.collect_request_timings() as timings:
+                    generate_data()
+                pipeline = {}
+                for name, seconds in timings:
+                    pipeline[name] = pipeline.get(name, 0.0) + seconds * 1000
+
+        return {
+            'dataset': dataset,
+            'rows': {
+                'long_frame': 0 if long_frame is None else len(long_frame),
+                'per_graph': [0 if frame is None else len(frame) for frame in frames],
+            },
+            'stages': stages,
+            'pipeline_ms': pipeline,
+        }
+
+    def _compare(self, baseline_path, report):
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        previous = {json.dumps(result['dataset'], sort_keys=True): result for result in baseline.get('results', [])}
+
+        self.stdout.write(f'Compared with {baseline_path} (median latency, new / old)')
+        for result in report['results']:
+            old = previous.get(json.dumps(result['dataset'], sort_keys=True))
+            if old is None:
+                continue
+            self.stdout.write(f"Dataset {json.dumps(result['dataset'])}")
+            for stage, stats in result['stages'].items():
+                if stage not in old['stages']:
+                    continue
+                new_ms = stats['latency_ms']['median']
+                old_ms = old['stages'][stage]['latency_ms']['median']
+                ratio = new_ms / old_ms if old_ms else float('inf')
+                self.stdout.write(f'  {stage:<18} {old_ms:>9.2f} -> {new_ms:>9.2f} ms  x{ratio:.2f}')
+
+    def _git_commit(self):
+        try:
+            return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
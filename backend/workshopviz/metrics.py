@@ -0,0 +1,148 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+# Stages of the data pipeline, in the order a generate_data request goes through them
+PIPELINE_STAGES = (
+    'config_load', 'flux_build', 'influx_round_trip', 'pivot',
+    'format_timestamps', 'merge', 'json_serialization',
+)
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROW_BUCKETS = (10, 100, 1_000, 5_000, 10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000)
+
+# Timings of the current request for the Server-Timing header, None outside a request
+_request_timings = ContextVar('request_timings', default=None)
+# Machine/data type labels of the graph being processed
+_current_labels = ContextVar('metric_labels', default={})
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, in the Prometheus exposition model"""
+
+    def __init__(self, name, documentation, label_names, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, '')) for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = sorted(self._series.items())
+        for key, values in series:
+            labels = ','.join(f'{name}="{_escape_label(value)}"' for name, value in zip(self.label_names, key))
+            prefix = labels + ',' if labels else ''
+            for bound, count in zip(self.buckets, values):
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {values[-1]}')
+            lines.append(f'{self.name}_sum{{{labels}}} {values[-2]}')
+            lines.append(f'{self.name}_count{{{labels}}} {values[-1]}')
+        return '\n'.join(lines)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+STAGE_SECONDS = Histogram(
+    'workshopviz_stage_duration_seconds', 'Time spent per data pipeline stage',
+    ('stage', 'machine', 'data_type'), LATENCY_BUCKETS,
+)
+INFLUX_ROWS = Histogram(
+    'workshopviz_influx_rows', 'Rows returned per InfluxDB query',
+    ('machine', 'data_type'), ROW_BUCKETS,
+)
+REGISTRY = (STAGE_SECONDS, INFLUX_ROWS)
+
+
+class PipelineMetrics:
+    """Observer registered with helper.dashboard.setPipelineObserver, also used for the view-level stages"""
+
+    def _labels(self, labels):
+        # Labels given by the stage win, the graph being processed fills in the rest
+        merged = dict(_current_labels.get())
+        merged.update({name: value for name, value in (labels or {}).items() if value})
+        return merged
+
+    def stage(self, name, seconds, labels=None):
+        STAGE_SECONDS.observe(seconds, stage=name, **self._labels(labels))
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((name, seconds))
+
+    def rows(self, count, labels=None):
+        INFLUX_ROWS.observe(count, **self._labels(labels))
+
+
+pipeline_metrics = PipelineMetrics()
+
+
+@contextmanager
+def stage(name, machine='', data_type=''):
+    """Times the enclosed block as one pipeline stage, yields the labels so the block can fill them in"""
+    labels = {'machine': machine, 'data_type': data_type}
+    start = perf_counter()
+    try:
+        yield labels
+    finally:
+        pipeline_metrics.stage(name, perf_counter() - start, labels)
+
+
+@contextmanager
+def metric_labels(machine='', data_type=''):
+    """Labels stages recorded in the enclosed block (and the helpers it calls) with a machine and data type"""
+    token = _current_labels.set({'machine': machine or '', 'data_type': data_type or ''})
+    try:
+        yield
+    finally:
+        _current_labels.reset(token)
+
+
+@contextmanager
+def collect_request_timings():
+    """Collects the stage timings of one request, yields the list of (stage, seconds) tuples"""
+    timings = []
+    token = _request_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _request_timings.reset(token)
+
+
+def server_timing_header(timings, total=None):
+    """Server-Timing header value, durations summed per stage in milliseconds"""
+    durations = {}
+    counts = {}
+    for name, seconds in timings:
+        durations[name] = durations.get(name, 0.0) + seconds
+        counts[name] = counts.get(name, 0) + 1
+    order = [name for name in PIPELINE_STAGES if name in durations] + sorted(set(durations) - set(PIPELINE_STAGES))
+    entries = [f'{name};dur={durations[name] * 1000:.1f};desc="{counts[name]}x"' for name in order]
+    if total is not None:
+        entries.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(entries)
+
+
+def render_prometheus():
+    """All metrics in the Prometheus text exposition format"""
+    return '\n'.join(metric.render() for metric in REGISTRY) + '\n'
@@ -0,0 +1,18 @@
+from time import perf_counter
+from .metrics import collect_request_timings, server_timing_header
+
+
+class ServerTimingMiddleware:
+    """Echoes the pipeline stage timings of each API request in a Server-Timing response header"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = perf_counter()
+        with collect_request_timings() as timings:
+            response = self.get_response(request)
+        response['Server-Timing'] = server_timing_header(timings, perf_counter() - start)
+        # Lets the browser expose the timings to a frontend on another origin
+        response['Timing-Allow-Origin'] = '*'
+        return response
@@ -1,42 +1,210 @@
+import json
 import logging
+import queue
+import threading
+from contextlib import contextmanager
+from time import monotonic
 import mysql.connector
 from django.conf import settings
 from datetime import datetime, date, time
 
 logger = logging.getLogger(__name__)
 
-class MySQLService:
-    def __init__(self):
-        self.config = {
-            'host': settings.MYSQL_HOST,
-            'user': settings.MYSQL_USER,
-            'password': settings.MYSQL_PASSWORD,
-            'database': settings.MYSQL_DB_NAME,
-            'port': settings.MYSQL_PORT
-        }
-        self.connection = None
 
-    def connect(self):
-        """Establish connection to MySQL database"""
+class _PooledConnection:
+    """A pooled connection with the times the pool needs for its health checks"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created_at = monotonic()
+        self.released_at = self.created_at
+
+
+class MySQLConnectionPool:
+    """
+    Process-wide pool of MySQL connections.
+
+    At most `size` connections are open at once, a caller waits up to `timeout` seconds for a free one.
+    Connections idle for longer than `ping_after` seconds are pinged before being handed out, and
+    replaced when the ping fails or when they are older than `recycle` seconds. Any transaction left
+    open is rolled back on release, so the next caller never reads an old snapshot.
+    """
+
+    def __init__(self, config, size, timeout, ping_after, recycle):
+        self.config = config
+        self.size = size
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.recycle = recycle
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+        self.in_use = 0
+
+    def _open(self):
+        pooled = _PooledConnection(mysql.connector.connect(**self.config))
+        with self._lock:
+            self.created += 1
+        return pooled
+
+    def _discard(self, pooled):
+        with self._lock:
+            self.discarded += 1
         try:
-            self.connection = mysql.connector.connect(**self.config)
+            pooled.connection.close()
+        except Exception:
+            pass
+
+    def _healthy(self, pooled):
+        if monotonic() - pooled.created_at > self.recycle:
+            return False
+        if monotonic() - pooled.released_at < self.ping_after:
+            return True
+        try:
+            pooled.connection.ping(reconnect=False)
             return True
-        except mysql.connector.Error as e:
-            logger.error(f"MySQL connection failed: {str(e)}")
+        except mysql.connector.Error:
             return False
 
+    def _checkout(self):
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                return self._open()
+            if self._healthy(pooled):
+                with self._lock:
+                    self.reused += 1
+                return pooled
+            self._discard(pooled)
+
+    def _release(self, pooled, broken):
+        if not broken:
+            try:
+                if pooled.connection.in_transaction:
+                    pooled.connection.rollback()
+            except mysql.connector.Error:
+                broken = True
+        if broken:
+            self._discard(pooled)
+        else:
+            pooled.released_at = monotonic()
+            self._idle.put(pooled)
+
+    @contextmanager
+    def connection(self):
+        """
+        A connection for the duration of the block, returned to the pool afterwards.
+
+        Raises mysql.connector.errors.PoolError when no connection frees up within the timeout.
+        """
+        if not self._slots.acquire(timeout=self.timeout):
+            raise mysql.connector.errors.PoolError(f'No MySQL connection available after {self.timeout}s ({self.size} in use)')
+        pooled = None
+        broken = False
+        try:
+            pooled = self._checkout()
+            with self._lock:
+                self.in_use += 1
+            yield pooled.connection
+        except (mysql.connector.OperationalError, mysql.connector.InterfaceError):
+            # Lost or unusable connection, not handed out again
+            broken = True
+            raise
+        finally:
+            if pooled is not None:
+                with self._lock:
+                    self.in_use -= 1
+                self._release(pooled, broken)
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': self.size,
+                'idle': self._idle.qsize(),
+                'in_use': self.in_use,
+                'created': self.created,
+                'reused': self.reused,
+                'discarded': self.discarded,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """The process-wide MySQL connection pool, created on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = MySQLConnectionPool(
+                    {
+                        'host': settings.MYSQL_HOST,
+                        'user': settings.MYSQL_USER,
+                        'password': settings.MYSQL_PASSWORD,
+                        'database': settings.MYSQL_DB_NAME,
+                        'port': settings.MYSQL_PORT
+                    },
+                    size=settings.MYSQL_POOL_SIZE,
+                    timeout=settings.MYSQL_POOL_TIMEOUT,
+                    ping_after=settings.MYSQL_POOL_PING_AFTER,
+                    recycle=settings.MYSQL_POOL_RECYCLE,
+                )
+    return _pool
+
+
+class MySQLService:
+    def __init__(self):
+        # Set while a session() is open, every method then runs on this connection
+        self.connection = None
+
+    @contextmanager
+    def acquire(self):
+        """A pooled connection for one operation, or the session's connection inside session()"""
+        if self.connection is not None:
+            yield self.connection
+            return
+        with get_pool().connection() as connection:
+            yield connection
+
+    @contextmanager
+    def session(self):
+        """
+        Runs every method called within the block on one pooled connection, for multi-step operations:
+
+            with MySQLService().session() as mysql_service:
+                asset_id = mysql_service.get_asset_id_by_name(name)
+                dashboard_id = mysql_service.create_dashboard(title, asset_id, user_id, category)
+        """
+        if self.connection is not None:
+            yield self
+            return
+        with get_pool().connection() as connection:
+            self.connection = connection
+            try:
+                yield self
+            finally:
+                self.connection = None
+
     def test_connection(self):
         """Test the connection to MySQL database"""
         try:
-            if self.connect():
-                cursor = self.connection.cursor()
+            with self.acquire() as connection:
+                cursor = connection.cursor()
                 cursor.execute("SELECT 1")
                 result = cursor.fetchone()
                 cursor.close()
                 return {
                     'status': 'success',
                     'message': 'Connected to MySQL successfully',
-                    'server_info': self.connection.get_server_info()
+                    'server_info': connection.get_server_info(),
+                    'pool': get_pool().stats()
                 }
         except Exception as e:
             logger.error(f"MySQL connection test failed: {str(e)}")
@@ -44,45 +212,37 @@ class MySQLService:
                 'status': 'error',
                 'message': f'Failed to connect to MySQL: {str(e)}'
             }
-        finally:
-            self.close()
 
     def get_machine_id(self, machine_name):
         """Get current machine ID for a machine"""
         try:
-            if not self.connect():
-                return None
+            with self.acquire() as connection:
+                cursor = connection.cursor(dictionary=True)
 
-            cursor = self.connection.cursor(dictionary=True)
+                query = "SELECT iAsset_id FROM assets WHERE vName = %s"
+                cursor.execute(query, (machine_name,))
+                result = cursor.fetchone()
+                cursor.close()
+
+                return result
 
-            query = "SELECT iAsset_id FROM assets WHERE vName = %s"
-            cursor.execute(query, (machine_name,))
-            result = cursor.fetchone()
-            cursor.close()
-            
-            return result
-            
         except Exception as e:
             logger.error(f"Error getting current asset id: {str(e)}")
             return None
-        finally:
-            self.close()
 
     def get_machine_related_bookings(self, machine_id):
         """Get all the bookings related to the machine"""
-        try: 
-            if not self.connect():
-                return None
-            
-            cursor = self.connection.cursor(dictionary=True)
-
-            query = "SELECT a.iBooking_id FROM booking_asset a LEFT JOIN booking b ON a.iBooking_id = b.iBooking_id WHERE a.iAsset_id = %s ORDER BY b.dStart DESC"
-            cursor.execute(query, (machine_id,))
-            results = cursor.fetchall()
-            cursor.close()
+        try:
+            with self.acquire() as connection:
+                cursor = connection.cursor(dictionary=True)
+
+                query = "SELECT a.iBooking_id FROM booking_asset a LEFT JOIN booking b ON a.iBooking_id = b.iBooking_id WHERE a.iAsset_id = %s ORDER BY b.dStart DESC"
+                cursor.execute(query, (machine_id,))
+                results = cursor.fetchall()
+                cursor.close()
+
+                return results
 
-            return results
-        
         except Exception as e:
             logger.error(f"Error getting machine related bookings: {str(e)}")
             return None
@@ -90,18 +250,17 @@ class MySQLService:
     def get_booking_list(self, condition=""):
         """Get booking list based on the condition"""
         try:
-            if not self.connect():
-                return None
-            
-            cursor = self.connection.cursor(dictionary=True)
-            b_arr = self.get_bookings(cursor, condition)
-
-            return b_arr
-        
+            with self.acquire() as connection:
+                cursor = connection.cursor(dictionary=True)
+                b_arr = self.get_bookings(cursor, condition)
+                cursor.close()
+
+                return b_arr
+
         except Exception as e:
             logger.error(f"Error getting booking list: {str(e)}")
             return None
-    
+
     def get_bookings(self, cursor, condition):
         """Get bookings based on the condition"""
         try:
@@ -113,342 +272,290 @@ class MySQLService:
         except Exception as e:
             logger.error(f"Error getting bookings: {str(e)}")
             return None
-        
+
     def get_booked_by_user(self, user_id):
         """Get the user who booked the machine"""
         try:
-            if not self.connect():
-                return None
-            
-            cursor = self.connection.cursor(dictionary=True)
-
-            query = "SELECT vName FROM users WHERE iUser_id = %s"
-            cursor.execute(query, (user_id,))
-            result = cursor.fetchone()
-            cursor.close()
-
-            return result['vName'] if result else None
-            
+            with self.acquire() as connection:
+                cursor = connection.cursor(dictionary=True)
+
+                query = "SELECT vName FROM users WHERE iUser_id = %s"
+                cursor.execute(query, (user_id,))
+                result = cursor.fetchone()
+                cursor.close()
+
+                return result['vName'] if result else None
+
         except Exception as e:
             logger.error(f"Error getting booked by user: {str(e)}")
             return None
-        
+
     def get_user_list(self):
         """Get the list of users"""
         try:
-            if not self.connect():
-                return None
-            cursor = self.connection.cursor(dictionary=True)
-            query = "SELECT iUser_id, vName FROM users WHERE iUser_id > 2"
-            cursor.execute(query)
-            results = cursor.fetchall()
-            cursor.close()
-            return results
+            with self.acquire() as connection:
+                cursor = connection.cursor(dictionary=True)
+                query = "SELECT iUser_id, vName FROM users WHERE iUser_id > 2"
+                cursor.execute(query)
+                results = cursor.fetchall()
+                cursor.close()
+                return results
         except Exception as e:
             logger.error(f"Error getting user list: {str(e)}")
             return None
-        finally:
-            self.close()
 
     def get_asset_id_by_name(self, asset_name):
         """Get asset ID by asset name"""
         try:
-            if not self.connect():
-                return None
-            cursor = self.connection.cursor(dictionary=True)
-            query = "SELECT iAsset_id FROM assets WHERE vName = %s"
-            cursor.execute(query, (asset_name,))
-            result = cursor.fetchone()
-            cursor.close()
-            return result['iAsset_id'] if result else None
+            with self.acquire() as connection:
+                cursor = connection.cursor(dictionary=True)
+                query = "SELECT iAsset_id FROM assets WHERE vName = %s"
+                cursor.execute(query, (asset_name,))
+                result = cursor.fetchone()
+                cursor.close()
+                return result['iAsset_id'] if result else None
         except Exception as e:
             logger.error(f"Error getting asset ID by name: {str(e)}")
             return None
-        finally:
-            self.close()
 
     def add_notes(self, dashboardId, asset_id, asset_name, description, category, startDate, startTime, endDate, endTime, user_id ):
         """Add note to a booking"""
         try:
-            if not self.connect():
-                return False
-            cursor = self.connection.cursor()
-            query = "INSERT INTO visualisation_notes (iAsset_id, iDashboard_id, vAsset_name, vDesc, vCategory, dStart, tStart, dEnd, tEnd, iUser_id) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
-            cursor.execute(query, (asset_id, dashboardId, asset_name, description, category, startDate, startTime, endDate, endTime, user_id))
-            self.connection.commit()
-            cursor.close()
-            return True
+            with self.acquire() as connection:
+                cursor = connection.cursor()
+                query = "INSERT INTO visualisation_notes (iAsset_id, iDashboard_id, vAsset_name, vDesc, vCategory, dStart, tStart, dEnd, tEnd, iUser_id) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+                cursor.execute(query, (asset_id, dashboardId, asset_name, description, category, startDate, startTime, endDate, endTime, user_id))
+                connection.commit()
+                cursor.close()
+                return True
         except Exception as e:
             logger.error(f"Error adding note to booking: {str(e)}")
             return False
-        finally:
-            self.close()
 
     def get_machine_assets(self):
         """Get all machine assets from the database that have asset type 'Machine'"""
         try:
-            if not self.connect():
-                return None
-            
-            cursor = self.connection.cursor(dictionary=True)
-            
-            # Query to get all assets of type 'Machine'
-            query = """
-                SELECT DISTINCT a.iAsset_id, a.vName
-                FROM assets a
-                INNER JOIN asset_type_assoc asta ON a.iAsset_id = asta.iAsset_id
-                INNER JOIN asset_type ast ON asta.iAsset_type_id = ast.iAst_type_id
-                WHERE ast.vName = 'Machine' AND a.cStatus = 'A'
-                ORDER BY a.vName
-            """
-            
-            cursor.execute(query)
-            results = cursor.fetchall()
-            cursor.close()
-            
-            return results
-            
+            with self.acquire() as connection:
+                cursor = connection.cursor(dictionary=True)
+
+                # Query to get all assets of type 'Machine'
+                query = """
+                    SELECT DISTINCT a.iAsset_id, a.vName
+                    FROM assets a
+                    INNER JOIN asset_type_assoc asta ON a.iAsset_id = asta.iAsset_id
+                    INNER JOIN asset_type ast ON asta.iAsset_type_id = ast.iAst_type_id
+                    WHERE ast.vName = 'Machine' AND a.cStatus = 'A'
+                    ORDER BY a.vName
+                """
+
+                cursor.execute(query)
+                results = cursor.fetchall()
+                cursor.close()
+
+                return results
+
         except Exception as e:
             logger.error(f"Error getting machine assets: {str(e)}")
             return None
-        finally:
-            self.close()
 
     def create_dashboard(self, title, asset_id, user_id, category):
         """Create a new dashboard entry in visualisation_dashboards table"""
         try:
-            if not self.connect():
-                return None
-            
-            cursor = self.connection.cursor(dictionary=True)
-            
-            # Insert query
-            query = """
-                INSERT INTO visualisation_dashboards 
-                (vTitle, iAsset_id, iUser_id, cCategory) 
-                VALUES (%s, %s, %s, %s)
-            """
-            
-            cursor.execute(query, (title, asset_id, user_id, category))
-            self.connection.commit()
-            
-            # Get the inserted dashboard ID
-            dashboard_id = cursor.lastrowid
-            cursor.close()
-            
-            return dashboard_id
-            
+            with self.acquire() as connection:
+                cursor = connection.cursor(dictionary=True)
+
+                # Insert query
+                query = """
+                    INSERT INTO visualisation_dashboards
+                    (vTitle, iAsset_id, iUser_id, cCategory)
+                    VALUES (%s, %s, %s, %s)
+                """
+
+                cursor.execute(query, (title, asset_id, user_id, category))
+                connection.commit()
+
+                # Get the inserted dashboard ID
+                dashboard_id = cursor.lastrowid
+                cursor.close()
+
+                return dashboard_id
+
         except Exception as e:
             logger.error(f"Error creating dashboard: {str(e)}")
             return None
-        finally:
-            self.close()
 
     def get_all_dashboards(self):
         """Get all dashboards from visualisation_dashboards table"""
         try:
-            if not self.connect():
-                return None
-            
-            cursor = self.connection.cursor(dictionary=True)
-            
-            query = """
-                SELECT iDashboard_id, vTitle, iAsset_id, iUser_id, dtCreated, dtModified, cCategory
-                FROM visualisation_dashboards
-                ORDER BY dtModified DESC
-            """
-            cursor.execute(query)
-            results = cursor.fetchall()
-            cursor.close()
-            
-            return results
-            
+            with self.acquire() as connection:
+                cursor = connection.cursor(dictionary=True)
+
+                query = """
+                    SELECT iDashboard_id, vTitle, iAsset_id, iUser_id, dtCreated, dtModified, cCategory
+                    FROM visualisation_dashboards
+                    ORDER BY dtModified DESC
+                """
+                cursor.execute(query)
+                results = cursor.fetchall()
+                cursor.close()
+
+                return results
+
         except Exception as e:
             logger.error(f"Error fetching dashboards: {str(e)}")
             return None
-        finally:
-            self.close()
 
     def create_component(self, dashboard_id, v_title, v_description, i_position, v_query):
         """Create a new component in visualisation_component_data table"""
         try:
-            if not self.connect():
-                return None
-            
-            cursor = self.connection.cursor(dictionary=True)
-            
-            # Convert vQuery dict to JSON string
-            import json
-            v_query_json = json.dumps(v_query)
-            
-            query = """
-                INSERT INTO visualisation_component_data 
-                (iDashboard_id, vTitle, vDescription, iPosition, vQuery, cAddToDashboard, dtCreated, dtModified)
-                VALUES (%s, %s, %s, %s, %s, 'Y', NOW(), NOW())
-            """
-            cursor.execute(query, (dashboard_id, v_title, v_description, i_position, v_query_json))
-            self.connection.commit()
-            
-            component_id = cursor.lastrowid
-            
-            # Fetch the created component
-            cursor.execute("""
-                SELECT icomponent_id, iDashboard_id, vTitle, vDescription, iPosition, vQuery, 
-                       cAddToDashboard, dtCreated, dtModified
-                FROM visualisation_component_data
-                WHERE icomponent_id = %s
-            """, (component_id,))
-            result = cursor.fetchone()
-            cursor.close()
-            
-            # Parse vQuery JSON back to dict
-            if result and result['vQuery']:
-                result['vQuery'] = json.loads(result['vQuery'])
-            
-            return result
-            
+            with self.acquire() as connection:
+                cursor = connection.cursor(dictionary=True)
+
+                # Convert vQuery dict to JSON string
+                v_query_json = json.dumps(v_query)
+
+                query = """
+                    INSERT INTO visualisation_component_data
+                    (iDashboard_id, vTitle, vDescription, iPosition, vQuery, cAddToDashboard, dtCreated, dtModified)
+                    VALUES (%s, %s, %s, %s, %s, 'Y', NOW(), NOW())
+                """
+                cursor.execute(query, (dashboard_id, v_title, v_description, i_position, v_query_json))
+                connection.commit()
+
+                component_id = cursor.lastrowid
+
+                # Fetch the created component (same connection as the insert)
+                cursor.execute("""
+                    SELECT icomponent_id, iDashboard_id, vTitle, vDescription, iPosition, vQuery,
+                           cAddToDashboard, dtCreated, dtModified
+                    FROM visualisation_component_data
+                    WHERE icomponent_id = %s
+                """, (component_id,))
+                result = cursor.fetchone()
+                cursor.close()
+
+                # Parse vQuery JSON back to dict
+                if result and result['vQuery']:
+                    result['vQuery'] = json.loads(result['vQuery'])
+
+                return result
+
         except Exception as e:
             logger.error(f"Error creating component: {str(e)}")
             return None
-        finally:
-            self.close()
 
     def get_components_by_dashboard(self, dashboard_id):
         """Get all components for a specific dashboard"""
         try:
-            if not self.connect():
-                return None
-            
-            cursor = self.connection.cursor(dictionary=True)
-            
-            query = """
-                SELECT icomponent_id, iDashboard_id, vTitle, vDescription, iPosition, vQuery,
-                       cAddToDashboard, dtCreated, dtModified
-                FROM visualisation_component_data
-                WHERE iDashboard_id = %s AND cAddToDashboard = 'Y'
-                ORDER BY iPosition, dtCreated
-            """
-            cursor.execute(query, (dashboard_id,))
-            results = cursor.fetchall()
-            cursor.close()
-            
+            with self.acquire() as connection:
+                cursor = connection.cursor(dictionary=True)
+
+                query = """
+                    SELECT icomponent_id, iDashboard_id, vTitle, vDescription, iPosition, vQuery,
+                           cAddToDashboard, dtCreated, dtModified
+                    FROM visualisation_component_data
+                    WHERE iDashboard_id = %s AND cAddToDashboard = 'Y'
+                    ORDER BY iPosition, dtCreated
+                """
+                cursor.execute(query, (dashboard_id,))
+                results = cursor.fetchall()
+                cursor.close()
+
             # Parse vQuery JSON for each component
-            import json
             for result in results:
                 if result['vQuery']:
                     result['vQuery'] = json.loads(result['vQuery'])
-            
+
             return results
-            
+
         except Exception as e:
             logger.error(f"Error fetching components for dashboard {dashboard_id}: {str(e)}")
             return None
-        finally:
-            self.close()
 
     def get_component_by_id(self, component_id):
         """Get a single component by ID"""
         try:
-            if not self.connect():
-                return None
-            
-            cursor = self.connection.cursor(dictionary=True)
-            
-            query = """
-                SELECT icomponent_id, iDashboard_id, vTitle, vDescription, iPosition, vQuery,
-                       cAddToDashboard, dtCreated, dtModified
-                FROM visualisation_component_data
-                WHERE icomponent_id = %s
-            """
-            cursor.execute(query, (component_id,))
-            result = cursor.fetchone()
-            cursor.close()
-            
+            with self.acquire() as connection:
+                cursor = connection.cursor(dictionary=True)
+
+                query = """
+                    SELECT icomponent_id, iDashboard_id, vTitle, vDescription, iPosition, vQuery,
+                           cAddToDashboard, dtCreated, dtModified
+                    FROM visualisation_component_data
+                    WHERE icomponent_id = %s
+                """
+                cursor.execute(query, (component_id,))
+                result = cursor.fetchone()
+                cursor.close()
+
             # Parse vQuery JSON
-            import json
             if result and result['vQuery']:
                 result['vQuery'] = json.loads(result['vQuery'])
-            
+
             return result
-            
+
         except Exception as e:
             logger.error(f"Error fetching component {component_id}: {str(e)}")
             return None
-        finally:
-            self.close()
 
     def update_component(self, component_id, v_title, v_description, i_position, v_query):
         """Update an existing component"""
         try:
-            if not self.connect():
-                return None
-            
-            cursor = self.connection.cursor(dictionary=True)
-            
-            # Convert vQuery dict to JSON string
-            import json
-            v_query_json = json.dumps(v_query)
-            
-            query = """
-                UPDATE visualisation_component_data
-                SET vTitle = %s, vDescription = %s, iPosition = %s, vQuery = %s, dtModified = NOW()
-                WHERE icomponent_id = %s
-            """
-            cursor.execute(query, (v_title, v_description, i_position, v_query_json, component_id))
-            self.connection.commit()
-            
-            rows_affected = cursor.rowcount
-            
-            if rows_affected > 0:
-                # Fetch the updated component
-                cursor.execute("""
-                    SELECT icomponent_id, iDashboard_id, vTitle, vDescription, iPosition, vQuery,
-                           cAddToDashboard, dtCreated, dtModified
-                    FROM visualisation_component_data
+            with self.acquire() as connection:
+                cursor = connection.cursor(dictionary=True)
+
+                # Convert vQuery dict to JSON string
+                v_query_json = json.dumps(v_query)
+
+                query = """
+                    UPDATE visualisation_component_data
+                    SET vTitle = %s, vDescription = %s, iPosition = %s, vQuery = %s, dtModified = NOW()
                     WHERE icomponent_id = %s
-                """, (component_id,))
-                result = cursor.fetchone()
-                cursor.close()
-                
-                # Parse vQuery JSON
-                if result and result['vQuery']:
-                    result['vQuery'] = json.loads(result['vQuery'])
-                
-                return result
-            else:
-                cursor.close()
-                return None
-            
+                """
+                cursor.execute(query, (v_title, v_description, i_position, v_query_json, component_id))
+                connection.commit()
+
+                rows_affected = cursor.rowcount
+
+                if rows_affected > 0:
+                    # Fetch the updated component (same connection as the update)
+                    cursor.execute("""
+                        SELECT icomponent_id, iDashboard_id, vTitle, vDescription, iPosition, vQuery,
+                               cAddToDashboard, dtCreated, dtModified
+                        FROM visualisation_component_data
+                        WHERE icomponent_id = %s
+                    """, (component_id,))
+                    result = cursor.fetchone()
+                    cursor.close()
+
+                    # Parse vQuery JSON
+                    if result and result['vQuery']:
+                        result['vQuery'] = json.loads(result['vQuery'])
+
+                    return result
+                else:
+                    cursor.close()
+                    return None
+
         except Exception as e:
             logger.error(f"Error updating component {component_id}: {str(e)}")
             return None
-        finally:
-            self.close()
 
     def delete_component(self, component_id):
         """Delete a component by ID"""
         try:
-            if not self.connect():
-                return None
-            
-            cursor = self.connection.cursor()
-            
-            query = "DELETE FROM visualisation_component_data WHERE icomponent_id = %s"
-            cursor.execute(query, (component_id,))
-            self.connection.commit()
-            
-            rows_affected = cursor.rowcount
-            cursor.close()
-            
-            return rows_affected > 0
-            
+            with self.acquire() as connection:
+                cursor = connection.cursor()
+
+                query = "DELETE FROM visualisation_component_data WHERE icomponent_id = %s"
+                cursor.execute(query, (component_id,))
+                connection.commit()
+
+                rows_affected = cursor.rowcount
+                cursor.close()
+
+                return rows_affected > 0
+
         except Exception as e:
             logger.error(f"Error deleting component {component_id}: {str(e)}")
             return None
-        finally:
-            self.close()
-
-    def close(self):
-        """Close the MySQL connection"""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
\ No newline at end of file
@@ -1,3 +1,376 @@
-from django.test import TestCase
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+import mysql.connector
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from helper.aggregates import reaggregate
+from helper.config_registry import ConfigRegistry
+from helper.downsample import lttbFrame
+from helper.influx_pool import CircuitBreaker, InfluxUnavailableError, PooledInfluxClient
+from helper.query_cache import QueryCache
+from helper.query_plan import getQueryPlan, queryPlanStats
+from helper.single_flight import SingleFlight
+from helper.stat_engine import getLatestValues
+from workshopviz.mysql_service import MySQLConnectionPool
+from workshopviz.views import _fit_jobs_to_budget
+
+CONFIG_PATH = os.path.join(settings.BASE_DIR, 'config')
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def test_half_open_lets_one_trial_through(self):
+        breaker = CircuitBreaker(threshold=1, resetTimeout=0)
+        breaker.recordFailure()
+
+        self.assertTrue(breaker.allowRequest())
+        self.assertFalse(breaker.allowRequest())
+
+        breaker.recordSuccess()
+        self.assertTrue(breaker.allowRequest())
+        self.assertTrue(breaker.allowRequest())
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker(threshold=1, resetTimeout=60)
+        breaker.recordFailure()
+        breaker.openedAt -= 60
+
+        self.assertTrue(breaker.allowRequest())
+        breaker.recordFailure()
+        self.assertFalse(breaker.allowRequest())
+
+    def test_retries_count_as_one_failure(self):
+        client = PooledInfluxClient.__new__(PooledInfluxClient)
+        client.url = 'http://influx'
+        client.breaker = CircuitBreaker(threshold=5)
+
+        def call():
+            raise ConnectionError('refused')
+
+        with mock.patch('helper.influx_pool.sleep'):
+            with self.assertRaises(InfluxUnavailableError):
+                client._execute(call, maxRetries=3)
+
+        self.assertEqual(client.breaker.failures, 1)
+        self.assertEqual(client.breaker.state, CircuitBreaker.CLOSED)
+
+
+class LttbFrameTests(SimpleTestCase):
+    def frame(self, series_count, rows=5000):
+        times = pd.date_range('2026-01-01', periods=rows, freq='s', tz='UTC', name='time')
+        rng = np.random.default_rng(0)
+        return pd.DataFrame({f'S{i}': rng.normal(size=rows).cumsum() * 10 ** i for i in range(series_count)}, index=times)
+
+    def test_multi_series_result_fits_the_threshold(self):
+        for series_count in (1, 2, 5):
+            frame = self.frame(series_count)
+            frame.iloc[100:300, 0] = np.nan
+            result = lttbFrame(frame, 500)
+
+            self.assertLessEqual(len(result), 500)
+            self.assertEqual(list(result.columns), list(frame.columns))
+            self.assertEqual(result.index[0], frame.index[0])
+            self.assertEqual(result.index[-1], frame.index[-1])
+
+    def test_time_column_layout_is_kept(self):
+        frame = self.frame(2).reset_index()
+        result = lttbFrame(frame, 300)
+
+        self.assertLessEqual(len(result), 300)
+        self.assertEqual(list(result.columns), ['time', 'S0', 'S1'])
+
+
+@mock.patch('workshopviz.views.MACHINE_CONFIG_PATH', CONFIG_PATH)
+class GenerateDataDeltaTests(SimpleTestCase):
+    def delta_request(self):
+        cursor = (datetime.now(timezone.utc) - timedelta(minutes=5)).isoformat()
+        return self.client.post('/api/generate-data/', {
+            'machine_name': 'Hurco',
+            'graphs': [4],
+            'range': '3h',
+            'aggregate': 'max',
+            'type': 'Line',
+            'cursors': [cursor],
+        }, content_type='application/json')
+
+    def test_empty_delta_is_an_empty_result(self):
+        with mock.patch('workshopviz.views.getCustomData', return_value=[None]):
+            response = self.delta_request()
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()['data']
+        self.assertEqual(data['chartData'], [])
+        self.assertTrue(data['delta'])
+        self.assertIsNotNone(data['cursors'][0])
+
+    def test_failed_delta_is_an_error(self):
+        with mock.patch('workshopviz.views.getCustomData', return_value=None):
+            response = self.delta_request()
+
+        self.assertNotEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['status'], 'error')
+        self.assertNotIn('cursors', body['data'])
+
+
+class DashboardBudgetTests(SimpleTestCase):
+    def job(self, rows):
+        return {'context': {}, 'window': {'cost': {'rows': rows, 'minRows': rows}}}
+
+    def test_only_jobs_that_cannot_fit_are_rejected(self):
+        rejected = _fit_jobs_to_budget([self.job(1), self.job(8), self.job(1)], 3)
+
+        self.assertEqual(list(rejected), [1])
+        self.assertEqual(rejected[1]['status'], 'error')
+
+
+class QueryCacheTests(SimpleTestCase):
+    def test_evicts_least_recently_used_by_bytes(self):
+        cache = QueryCache(maxBytes=100)
+        cache.put('a', 'a', 60, size=40)
+        cache.put('b', 'b', 60, size=40)
+        self.assertTrue(cache.get('a')[0])
+
+        cache.put('c', 'c', 60, size=40)
+
+        self.assertEqual(cache.get('b'), (False, None))
+        self.assertEqual(cache.get('a'), (True, 'a'))
+        self.assertEqual(cache.get('c'), (True, 'c'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(cache.stats()['bytes'], 80)
+
+    def test_oversized_entry_is_not_stored(self):
+        cache = QueryCache(maxBytes=100)
+        cache.put('a', 'a', 60, size=101)
+
+        self.assertEqual(cache.get('a'), (False, None))
+        self.assertEqual(cache.stats()['bytes'], 0)
+
+    def test_entry_expires_after_its_ttl(self):
+        cache = QueryCache(maxBytes=100)
+        with mock.patch('helper.query_cache.monotonic', return_value=1000.0):
+            cache.put('a', 'a', 5, size=10)
+        with mock.patch('helper.query_cache.monotonic', return_value=1004.0):
+            self.assertEqual(cache.get('a'), (True, 'a'))
+        with mock.patch('helper.query_cache.monotonic', return_value=1005.0):
+            self.assertEqual(cache.get('a'), (False, None))
+
+        self.assertEqual(cache.stats()['expirations'], 1)
+        self.assertEqual(cache.stats()['entries'], 0)
+
+
+class ReaggregateTests(SimpleTestCase):
+    def points(self):
+        rng = np.random.default_rng(1)
+        times = pd.Timestamp('2026-01-01', tz='UTC') + pd.to_timedelta(np.sort(rng.choice(600, 200, replace=False)), unit='s')
+        return pd.DataFrame({'time': times, 'value': rng.normal(size=len(times))})
+
+    def window_stops(self, times, seconds):
+        # aggregateWindow stamps each [start, stop) window with its stop
+        return times.dt.floor(f'{seconds}s') + pd.Timedelta(seconds=seconds)
+
+    def window_stats(self, points, seconds):
+        grouped = points.groupby(self.window_stops(points['time'], seconds))['value']
+        stats = grouped.agg(['mean', 'count', 'min', 'max', 'last'])
+        stats.index.name = 'time'
+        return stats.reset_index().melt(id_vars='time', var_name='_stat', value_name='value')
+
+    def test_matches_a_direct_aggregate(self):
+        points = self.points()
+        stats = self.window_stats(points, 10)
+        direct = points.groupby(self.window_stops(points['time'], 60))['value']
+
+        for aggregation in ('max', 'min', 'mean', 'count', 'last'):
+            result = reaggregate(stats, aggregation, 60).set_index('time')['value']
+            expected = getattr(direct, aggregation)()
+
+            self.assertEqual(list(result.index), list(expected.index))
+            np.testing.assert_allclose(result.to_numpy(dtype=float), expected.to_numpy(dtype=float))
+
+    def test_rejects_unknown_aggregation(self):
+        with self.assertRaises(ValueError):
+            reaggregate(self.window_stats(self.points(), 10), 'median', 60)
+
+
+class StatValuesTests(SimpleTestCase):
+    def test_failed_query_is_an_error_and_not_cached(self):
+        requests = [{'id': 'a', 'machine_name': 'Hurco', 'graph': 4}]
+        with mock.patch('helper.dashboard._runQueryFrame', side_effect=RuntimeError('down')) as run, \
+                mock.patch('helper.stat_engine.queryCache', QueryCache()):
+            results, query_count = getLatestValues(requests, CONFIG_PATH)
+            self.assertIn('error', results['a'])
+            self.assertEqual(query_count, 1)
+
+            getLatestValues(requests, CONFIG_PATH)
+            self.assertEqual(run.call_count, 2)
+
+
+class SingleFlightTests(SimpleTestCase):
+    def test_concurrent_callers_share_one_execution(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        runs = []
+
+        def work():
+            runs.append(1)
+            release.wait(5)
+            return 'result'
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [pool.submit(flight.do, 'query', work) for _ in range(5)]
+            deadline = time.monotonic() + 5
+            while flight.stats()['coalesced'] < 4 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            release.set()
+            results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(results, ['result'] * 5)
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(flight.stats()['executions'], 1)
+        self.assertEqual(flight.stats()['coalesced'], 4)
+
+    def test_raw_result_is_shared_across_processes(self):
+        with tempfile.TemporaryDirectory() as root:
+            lock_dir = os.path.join(root, 'flight')
+            SingleFlight(lock_dir).do('query', lambda: b'shared', bytes.decode)
+            self.assertEqual(os.stat(lock_dir).st_mode & 0o777, 0o700)
+
+            other = SingleFlight(lock_dir)
+            with mock.patch('helper.single_flight.time', return_value=0):
+                result = other.do('query', lambda: self.fail('queried again'), bytes.decode)
+
+            self.assertEqual(result, 'shared')
+            self.assertEqual(other.stats()['sharedAcrossProcesses'], 1)
+
+    def test_unreadable_result_is_a_miss(self):
+        with tempfile.TemporaryDirectory() as lock_dir:
+            SingleFlight(lock_dir).do('query', lambda: b'shared', bytes.decode)
+            for name in os.listdir(lock_dir):
+                if name.endswith('.result'):
+                    with open(os.path.join(lock_dir, name), 'wb') as f:
+                        f.write(b'\xff\xfe')
+
+            other = SingleFlight(lock_dir)
+            with mock.patch('helper.single_flight.time', return_value=0):
+                result = other.do('query', lambda: b'fresh', bytes.decode)
+
+            self.assertEqual(result, 'fresh')
+            self.assertEqual(other.stats()['sharedAcrossProcesses'], 0)
+
+
+@mock.patch('helper.config_registry.Observer', None)
+class ConfigRegistryTests(SimpleTestCase):
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.folder = folder.name
+        self.path = os.path.join(self.folder, 'Hurco.json')
+        shutil.copy(os.path.join(CONFIG_PATH, 'Hurco.json'), self.path)
+
+    def rewrite(self, text):
+        mtime = os.stat(self.path).st_mtime
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.utime(self.path, (mtime + 10, mtime + 10))
+
+    def set_units(self, units):
+        with open(self.path, encoding='utf-8') as f:
+            raw = json.load(f)
+        raw['Data']['Acceleration']['Units'] = units
+        self.rewrite(json.dumps(raw))
+
+    def test_file_is_parsed_again_when_its_mtime_changes(self):
+        registry = ConfigRegistry(self.folder, reloadInterval=0)
+        first = registry.machine('Hurco')
+        version = registry.version
+        self.assertIs(registry.machine('Hurco'), first)
+        self.assertEqual(registry.loads, 1)
+
+        self.set_units('m/s2')
+        second = registry.machine('Hurco')
+
+        self.assertIsNot(second, first)
+        self.assertEqual(second.dataTypes[0].units, 'm/s2')
+        self.assertEqual(registry.version, version + 1)
+        self.assertEqual(registry.loads, 2)
+
+    def test_reload_drops_compiled_query_plans(self):
+        registry = ConfigRegistry(self.folder, reloadInterval=0)
+        config = registry.machine('Hurco').dataTypes[0].raw
+        plan = getQueryPlan(config)
+        self.assertIs(getQueryPlan(config), plan)
+        invalidations = queryPlanStats()['invalidations']
+
+        self.set_units('m/s2')
+        registry.machine('Hurco')
+
+        self.assertEqual(queryPlanStats()['invalidations'], invalidations + 1)
+        self.assertIsNot(getQueryPlan(config), plan)
+
+    def test_invalid_edit_keeps_the_last_valid_version(self):
+        registry = ConfigRegistry(self.folder, reloadInterval=0)
+        first = registry.machine('Hurco')
+
+        self.rewrite('{')
+
+        self.assertIs(registry.machine('Hurco'), first)
+        self.assertIn('Hurco', registry.errors)
+
+
+@mock.patch('workshopviz.mysql_service.mysql.connector.connect')
+class MySQLConnectionPoolTests(SimpleTestCase):
+    def pool(self, size=2):
+        return MySQLConnectionPool({}, size=size, timeout=0, ping_after=60, recycle=3600)
+
+    def test_released_connection_is_rolled_back_and_reused(self, connect):
+        connect.side_effect = lambda **config: mock.Mock(in_transaction=True)
+        pool = self.pool()
+
+        with pool.connection() as first:
+            self.assertEqual(pool.stats()['in_use'], 1)
+        first.rollback.assert_called_once()
+        with pool.connection() as second:
+            pass
+
+        self.assertIs(second, first)
+        self.assertEqual(connect.call_count, 1)
+        self.assertEqual(pool.stats(), {'size': 2, 'idle': 1, 'in_use': 0, 'created': 1, 'reused': 1, 'discarded': 0})
+
+    def test_exhausted_pool_raises_until_a_connection_is_released(self, connect):
+        connect.side_effect = lambda **config: mock.Mock(in_transaction=False)
+        pool = self.pool(size=1)
+
+        with pool.connection():
+            with self.assertRaises(mysql.connector.errors.PoolError):
+                with pool.connection():
+                    pass
+        with pool.connection():
+            pass
+
+        self.assertEqual(pool.stats()['created'], 1)
+        self.assertEqual(pool.stats()['in_use'], 0)
+
+    def test_lost_connection_is_discarded(self, connect):
+        connect.side_effect = lambda **config: mock.Mock(in_transaction=False)
+        pool = self.pool()
+
+        with self.assertRaises(mysql.connector.OperationalError):
+            with pool.connection() as connection:
+                raise mysql.connector.OperationalError('gone away')
+        connection.close.assert_called_once()
+        with pool.connection() as replacement:
+            pass
+
+        self.assertIsNot(replacement, connection)
+        self.assertEqual(pool.stats()['discarded'], 1)
+        self.assertEqual(pool.stats()['created'], 2)
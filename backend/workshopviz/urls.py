@@ -4,6 +4,8 @@ from . import views
 urlpatterns = [
     path('test-influx-connection/', views.test_influx_connection, name='test_influx_connection'),
     path('test-mysql-connection/', views.test_mysql_connection, name='test_mysql_connection'),
+    path('query-cache-stats/', views.get_query_cache_stats, name='get_query_cache_stats'),
+    path('metrics/', views.get_metrics, name='get_metrics'),
     # path('dashboard-config/', views.get_dashboard_config, name='get_dashboard_config'),
 
     path('current-booking/', views.get_current_booking, name='get_current_booking'),
@@ -12,11 +14,14 @@ urlpatterns = [
 
     path('machines-with-config/', views.get_machines_with_config, name='get_machines_with_config'),
     path('dropdowns-from-config/', views.get_dropdowns_from_config, name='get_dropdowns_from_config'),
+    path('machine-catalog/', views.get_machine_catalog, name='get_machine_catalog'),
     path('create-dashboard/', views.create_dashboard, name='create_dashboard'),
 
     path('data-types/', views.get_data_types, name='get_data_types'),
     path('available-series/', views.get_available_series, name='get_available_series'),
     path('generate-data/', views.generate_data, name='generate_data'),
+    path('render-dashboard/', views.render_dashboard, name='render_dashboard'),
+    path('stat-values/', views.stat_values, name='stat_values'),
     
     # Dashboard endpoints
     path('dashboards/', views.list_dashboards, name='list_dashboards'),
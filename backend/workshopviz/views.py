@@ -4,7 +4,8 @@ from reactivex import catch
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-from django.http import JsonResponse
+from django.http import JsonResponse, HttpResponse
+from django.views.decorators.http import require_GET
 from .influx_service import InfluxDBService
 from .mysql_service import MySQLService
 import json
@@ -12,9 +13,17 @@ from datetime import datetime, timedelta, timezone
 import logging
 from django.conf import settings
 import os
-from influxdb_client import InfluxDBClient
-from backend.settings import DB_LINK, INFLUX_TOKEN, DB_ORG, MACHINE_CONFIG_PATH
-from helper.dashboard import getCustomData, getInfluxData, getDataSeries
+from backend.settings import MACHINE_CONFIG_PATH
+from helper.dashboard import (getCustomData, getInfluxData, getQueryCacheStats, resolveQueryWindow, formatTimes,
+                              envelopeSeries, ENVELOPE, ENVELOPE_BANDS, QueryBudgetError, QUERY_MAX_ROWS, DASHBOARD_MAX_ROWS)
+from helper.series_merge import mergeFrames, toNullableList
+from helper.downsample import DOWNSAMPLE_MODES
+from helper.stat_engine import getLatestValues
+from helper.config_registry import getConfigRegistry
+from helper.series_catalog import seriesCatalog
+from .executor import map_ordered
+from .machine_catalog import data_type_entry, machines_with_config, get_catalog
+from . import metrics
 import pprint
 import pandas as pd
 
@@ -49,6 +58,12 @@ def test_mysql_connection(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 logger = logging.getLogger(__name__)
+
+# chartData layouts for generate_data: 'rows' (default) is a list of {"time": ..., series: value} dicts,
+# 'columnar' is one shared time array and one value array per series
+RESPONSE_FORMATS = ('rows', 'columnar')
+
+
 def format_timestamp_for_display(timestamp):
     """Convert pandas Timestamp or ISO string to HH:MM format"""
     try:
@@ -88,53 +103,54 @@ def get_current_booking(request):
     try:
         machine_name = request.GET.get('machine_name')
 
-        mysql_service = MySQLService()
-        asset_id = mysql_service.get_machine_id(machine_name)
-
-        if asset_id:
-            machine_related_booking_ids = mysql_service.get_machine_related_bookings(asset_id['iAsset_id'])
-
-            if machine_related_booking_ids:
-                booking_ids_str = ",".join(str(booking['iBooking_id']) for booking in machine_related_booking_ids)
-                today_date = datetime.now().strftime('%Y-%m-%d')
-                current_bookings = mysql_service.get_booking_list(
-                    f" AND iBooking_id IN ({booking_ids_str}) AND ('{today_date}' >= dStart AND '{today_date}' <= dEnd) AND cStatus IN('A', 'CO', 'IP') ORDER BY dStart DESC LIMIT 5"
-                )
-
-                # process the current booking to replace the iUser_id_req to the user 
-                for booking in current_bookings:
-                    if booking['iUser_id_req']:
-                        booking['vbooked_by'] = mysql_service.get_booked_by_user(booking['iUser_id_req'])
+        # Every lookup below (machine, bookings, one user per booking) on one pooled connection
+        with MySQLService().session() as mysql_service:
+            asset_id = mysql_service.get_machine_id(machine_name)
+
+            if asset_id:
+                machine_related_booking_ids = mysql_service.get_machine_related_bookings(asset_id['iAsset_id'])
+
+                if machine_related_booking_ids:
+                    booking_ids_str = ",".join(str(booking['iBooking_id']) for booking in machine_related_booking_ids)
+                    today_date = datetime.now().strftime('%Y-%m-%d')
+                    current_bookings = mysql_service.get_booking_list(
+                        f" AND iBooking_id IN ({booking_ids_str}) AND ('{today_date}' >= dStart AND '{today_date}' <= dEnd) AND cStatus IN('A', 'CO', 'IP') ORDER BY dStart DESC LIMIT 5"
+                    )
+
+                    # process the current booking to replace the iUser_id_req to the user 
+                    for booking in current_bookings:
+                        if booking['iUser_id_req']:
+                            booking['vbooked_by'] = mysql_service.get_booked_by_user(booking['iUser_id_req'])
                     
-                    if booking['tStart']:
-                        booking['tStart'] = format_timestamp_for_display(booking['tStart'])
+                        if booking['tStart']:
+                            booking['tStart'] = format_timestamp_for_display(booking['tStart'])
 
-                    if booking['tEnd']:
-                        booking['tEnd'] = format_timestamp_for_display(booking['tEnd'])
-                if current_bookings:
-                    return JsonResponse({
-                        'status': 'success',
-                        'message': 'Booking list retrieved successfully',
-                        'data': current_bookings
-                    }, status=status.HTTP_200_OK)
+                        if booking['tEnd']:
+                            booking['tEnd'] = format_timestamp_for_display(booking['tEnd'])
+                    if current_bookings:
+                        return JsonResponse({
+                            'status': 'success',
+                            'message': 'Booking list retrieved successfully',
+                            'data': current_bookings
+                        }, status=status.HTTP_200_OK)
+                    else: 
+                        return JsonResponse({
+                            'status': 'error',
+                            'message': 'No booking list found for the specified machine',
+                            'data': {}
+                        }, status=status.HTTP_200_OK)
                 else: 
                     return JsonResponse({
                         'status': 'error',
-                        'message': 'No booking list found for the specified machine',
+                        'message': 'No machine related bookings found for the specified machine',
                         'data': {}
                     }, status=status.HTTP_200_OK)
-            else: 
+            else:
                 return JsonResponse({
                     'status': 'error',
-                    'message': 'No machine related bookings found for the specified machine',
+                    'message': 'Machine id not found in the database',
                     'data': {}
                 }, status=status.HTTP_200_OK)
-        else:
-            return JsonResponse({
-                'status': 'error',
-                'message': 'Machine id not found in the database',
-                'data': {}
-            }, status=status.HTTP_200_OK)
     
     except Exception as e:
         logger.error(f"Error retrieving current booking: {str(e)}")
@@ -287,8 +303,7 @@ def add_notes(request):
 def test_influx_connection(request):
     """Test API endpoint to check InfluxDB connection"""
     try:
-        client = InfluxDBClient(url=DB_LINK, token=INFLUX_TOKEN, org=DB_ORG, timeout=10_000)
-        health = client.health()
+        health = InfluxDBService().health()
 
         if health.status == "pass":
             return Response({
@@ -296,8 +311,7 @@ def test_influx_connection(request):
                 'message': 'Connection Successful',
                 'data': {
                     'influxdb_version': health.version,
-                    'server_time': datetime.now(datetime.timezone.utc).isoformat()
-                    #'server_time': datetime.now(timezone.utc).isoformat()  # uncomment incase of connection fails 
+                    'server_time': datetime.now(timezone.utc).isoformat()
                 }
             }, status=status.HTTP_200_OK)
         else:
@@ -317,6 +331,23 @@ def test_influx_connection(request):
             'message': f'Internal server error: {str(e)}'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@api_view(['GET'])
+def get_query_cache_stats(request):
+    """Hit/miss/eviction counters of the Influx query result cache"""
+    try:
+        return JsonResponse({
+            'status': 'success',
+            'message': 'Query cache stats retrieved successfully',
+            'data': dict(getQueryCacheStats(), seriesCatalog=seriesCatalog.stats())
+        }, status=status.HTTP_200_OK)
+    except Exception as e:
+        logger.error(f"Error retrieving query cache stats: {str(e)}")
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Internal server error: {str(e)}',
+            'data': {}
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 @api_view(['GET']) # TO-DO: not used now, need to take the date range logic from here
 def get_dashboard_config(request):
     try:
@@ -452,36 +483,21 @@ def get_machines_with_config(request):
                 'data': []
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Get all JSON config files (excluding files with '-')
-        json_files = [f for f in os.listdir(config_dir) if f.endswith('.json') and '-' not in f]
-        config_machine_names = [os.path.splitext(f)[0] for f in json_files]
+        # Get all machine configs (excluding files with '-')
+        config_machine_names = getConfigRegistry(config_dir).machineNames()
         
         # print("Machines from DB:", [m['vName'] for m in db_machines])
         # print("Machines from config:", config_machine_names)
         
-        # Filter machines: Only include if BOTH in DB AND has config file
-        machines_with_config = []
+        # Filter machines: Only include if BOTH in DB AND has config file (DB entries looked up by name)
+        matched_machines = machines_with_config(db_machines, config_machine_names)
         
-        # Add only machines that have config files AND exist in database
-        for config_name in config_machine_names:
-            # Find matching DB entry
-            db_match = next((m for m in db_machines if m['vName'] == config_name), None)
-            
-            # Only add if machine exists in database
-            if db_match:
-                machines_with_config.append({
-                    'iAsset_id': db_match['iAsset_id'],
-                    'vName': config_name,
-                    'hasConfig': True,
-                    'inDatabase': True
-                })
-        
-        #print("Machines with config (DB only):", machines_with_config)
+        #print("Machines with config (DB only):", matched_machines)
         
         return JsonResponse({
             'status': 'success',
             'message': 'Machines with config retrieved successfully',
-            'data': machines_with_config
+            'data': matched_machines
         }, status=status.HTTP_200_OK)
     
     except Exception as e:
@@ -505,14 +521,7 @@ def get_dropdowns_from_config(request):
                 'data': []
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Get all JSON files in config directory
-        json_files = [f for f in os.listdir(config_dir) if f.endswith('.json')]
-
-        dropdown_names = []
-        
-        for file_name in json_files:
-            if 'Dropdown' in file_name:
-                dropdown_names.append(os.path.splitext(file_name)[0])
+        dropdown_names = getConfigRegistry(config_dir).dropdownNames()
 
         # print("Dropdowns from config:", dropdown_names)
 
@@ -617,42 +626,20 @@ def get_data_types(request):
     """Get available data types from config file"""
     try:
         machine_name = request.GET.get('machine_name')
-        file_path = os.path.join(MACHINE_CONFIG_PATH, f"{machine_name}.json")
+        machine_config = getConfigRegistry(MACHINE_CONFIG_PATH).machine(machine_name)
         
-        if not os.path.exists(file_path):
+        if machine_config is None:
             return JsonResponse({
                 'status': 'error',
                 'message': f'Configuration file not found for machine: {machine_name}',
                 'data': []
             }, status=status.HTTP_404_NOT_FOUND)
         
-        with open(file_path, 'r', encoding='utf-8') as f:
-            machine_config = json.load(f)
-        
         # Extract graph configurations from the 'Data' section
         graph_configs = []
         
-        if 'Data' in machine_config and isinstance(machine_config['Data'], dict):
-            for idx, (title, config) in enumerate(machine_config['Data'].items(), start=1):
-                # Extract unit and pivot information
-                bucket = config.get('Bucket', '')
-                measurement = config.get('Measurement', '')
-                unit = config.get('Units', '')
-                pivot = config.get('Pivot', None)
-                scale = config.get('Scale', 'linear')
-                
-            
-                graph_configs.append({
-                    'id': str(idx),  # Use sequential IDs
-                    'title': title,  # Use the key as title (e.g., 'Acceleration', 'Air Flow', 'Air Pressure')
-                    'unit': unit,
-                    'bucket': bucket,
-                    'measurement': measurement,
-                    'pivot': pivot,
-                    'scale': scale,
-                    'timeRange': '3h',  # Default time range
-                    'availableSeries': []  # Will be populated dynamically
-                })
+        for data_type in machine_config.dataTypes:
+            graph_configs.append(data_type_entry(data_type))
         
         logger.info(f"Generated {len(graph_configs)} graph configurations with titles: {[g['title'] for g in graph_configs]}")
 
@@ -675,7 +662,8 @@ def get_available_series(request):
     try:
         machine_name = request.GET.get('machine_name')
         graph_id = request.GET.get('graph_id')
-        time_range = request.GET.get('range', '3h')
+        # Explicit range only (the component builder sends 'time_range'), otherwise the catalog default
+        time_range = request.GET.get('range') or request.GET.get('time_range')
 
         print(f"*** Getting available series for machine: {machine_name}, graph_id: {graph_id}, range: {time_range}")
         
@@ -686,52 +674,47 @@ def get_available_series(request):
                 'data': []
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        # Load the configuration file
-        file_path = os.path.join(MACHINE_CONFIG_PATH, f"{machine_name}.json")
+        # Parsed configuration from the shared registry
+        machine_config = getConfigRegistry(MACHINE_CONFIG_PATH).machine(machine_name)
         
-        if not os.path.exists(file_path):
+        if machine_config is None:
             return JsonResponse({
                 'status': 'error',
                 'message': f'Configuration file not found for machine: {machine_name}',
                 'data': []
             }, status=status.HTTP_404_NOT_FOUND)
         
-        # Load the JSON configuration
-        with open(file_path, 'r', encoding='utf-8') as f:
-            machine_config = json.load(f)
-        
-        if 'Data' not in machine_config or not isinstance(machine_config['Data'], dict):
-            return JsonResponse({
-                'status': 'error',
-                'message': 'Invalid configuration structure',
-                'data': []
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        
         # Get the data type configuration based on graph_id, graph_id corresponds to the index in the Data dictionary (1-indexed)
-        data_types = list(machine_config['Data'].items())
-        graph_index = int(graph_id) - 1
+        data_type = machine_config.dataType(graph_id)
         
-        if graph_index < 0 or graph_index >= len(data_types):
+        if data_type is None:
             return JsonResponse({
                 'status': 'error',
                 'message': f'Invalid graph ID: {graph_id}',
                 'data': []
             }, status=status.HTTP_400_BAD_REQUEST)
         
-        data_type_name, data_type_config = data_types[graph_index]
+        data_type_name, data_type_config = data_type.name, data_type.raw
 
         available_series = []
-        has_pivot = 'Pivot' in data_type_config
+        has_pivot = data_type.hasPivot
         
-        # Check if this data type has Predicates AND Pivot - if yes, use getDataSeries
+        # Check if this data type has Predicates AND Pivot - if yes, use the cached series catalog
         if 'Predicates' in data_type_config and has_pivot:
-            available_series = getDataSeries(data_type_config)
-            print("****** Available series from getDataSeries:", available_series)
+            try:
+                available_series = seriesCatalog.get(data_type_config, time_range)
+            except ValueError as e:
+                return JsonResponse({
+                    'status': 'error',
+                    'message': str(e),
+                    'data': []
+                }, status=status.HTTP_400_BAD_REQUEST)
+            print("****** Available series from the series catalog:", available_series)
 
             if available_series is None:
                 available_series = []
             
-            # getDataSeries returns False if Predicates not found (shouldn't happen here)
+            # The catalog returns False if Predicates not found (shouldn't happen here)
             if available_series is False:
                 available_series = []
         else:
@@ -757,316 +740,818 @@ def get_available_series(request):
             'message': f'Internal server error: {str(e)}',
             'data': []
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@require_GET  # Plain Django view, answers conditional requests itself
+def get_machine_catalog(request):
+    """
+    Every machine and dropdown with its data types and known series, in one response for the component builder.
+    Cached and sent with an ETag, a matching If-None-Match gets a 304.
+    """
+    try:
+        body, etag = get_catalog(MACHINE_CONFIG_PATH)
+        if_none_match = request.headers.get('If-None-Match', '')
+        if etag in [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        # Always revalidated, so config and series changes show up on the next load
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+    except Exception as e:
+        logger.error(f"Error retrieving machine catalog: {str(e)}")
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Internal server error: {str(e)}',
+            'data': {}
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
     
-@api_view(['POST'])
-def generate_data(request):
-    """Get custom graph data based on selected graphs and series"""
+def _graph_entry(per_graph, idx):
+    """Get the entry of graph idx from a per-graph request field (series, cursors) in either format"""
+    if isinstance(per_graph, dict):
+        # Dictionary format: {"0": {"series": [...], "originalId": "..."}} or {"0": [...]}
+        return per_graph.get(str(idx))
+    if isinstance(per_graph, list) and idx < len(per_graph):
+        # List format: [{"series": [...], "originalId": "..."}, ...] or [[...], ...]
+        return per_graph[idx]
+    return None
+
+
+def _plan_generate_request(data, now=None):
+    """
+    Validate a generate_data request body (or a saved vQuery) and split it into one query job per graph.
+
+    Returns a (plan, error) tuple; error is a JSON body for a 400 response when the request is invalid.
+    """
+    machine_name = data.get('machine_name')  # For backward compatibility
+    machine_names = data.get('machine_names', [])  # New: array of machine names per graph
+    selected_type = data.get('type', None)
+    selected_aggregate = data.get('aggregate', 'max')
+    selected_graphs = data.get('graphs', [])
+    selected_series = data.get('series', {})
+    time_range = data.get('range', '3h')
+    cursors = data.get('cursors', {})  # Optional: last "cursor" returned per graph, for a delta refresh
+    response_format = data.get('format', 'rows')  # Optional: 'columnar' for one time array and one value array per series
+    downsample = data.get('downsample', 'aggregate')  # Optional: 'lttb' keeps the visual shape instead of one aggregate per window
+    maximised = bool(data.get('maximised', False))  # Optional: full screen view, bigger point budget
+    plot_width = data.get('width')  # Optional: plot width in pixels, the point budget is derived from it
+    multi_aggregate = bool(data.get('multi_aggregate', False))  # Optional: fetch every window statistic, so switching aggregates hits the cache
+
+    # Backward compatibility: if machine_names not provided, use machine_name for all graphs
+    if not machine_names:
+        machine_names = [machine_name] * len(selected_graphs)
+
+    if not selected_graphs:
+        return None, {
+            'status': 'error',
+            'message': 'No graphs selected',
+            'data': {}
+        }
+
+    if len(machine_names) != len(selected_graphs):
+        return None, {
+            'status': 'error',
+            'message': 'Number of machine names must match number of selected graphs',
+            'data': {}
+        }
+
+    if response_format not in RESPONSE_FORMATS:
+        return None, {
+            'status': 'error',
+            'message': f"Invalid format '{response_format}', expected one of: {', '.join(RESPONSE_FORMATS)}",
+            'data': {}
+        }
+
+    if downsample not in DOWNSAMPLE_MODES:
+        return None, {
+            'status': 'error',
+            'message': f"Invalid downsample '{downsample}', expected one of: {', '.join(DOWNSAMPLE_MODES)}",
+            'data': {}
+        }
+
+    if plot_width is not None and (isinstance(plot_width, bool) or not isinstance(plot_width, (int, float)) or plot_width <= 0):
+        return None, {
+            'status': 'error',
+            'message': 'width must be a positive number of pixels',
+            'data': {}
+        }
+
+    # Calculate time range
+    now = now or datetime.now()
+    delta = parse_range_to_timedelta(time_range)
+    custom_date_from = (now - delta).strftime("%Y-%m-%dT%H:%M:%SZ")
+    custom_date_to = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+    jobs = []
+    original_ids = []
+    for idx, (graph_id, machine_name_for_graph) in enumerate(zip(selected_graphs, machine_names)):
+        series_entry = _graph_entry(selected_series, idx)
+        series_for_graph = []
+        original_id = ''
+        if isinstance(series_entry, dict):
+            series_for_graph = series_entry.get('series', [])
+            original_id = series_entry.get('originalId', '')
+        elif isinstance(series_entry, list):
+            # Direct list of series names
+            series_for_graph = series_entry
+
+        # Stat queries only fetch the last value, a delta would not make them cheaper
+        cursor = _graph_entry(cursors, idx) if selected_type != 'Stat' else None
+
+        jobs.append({
+            'graph_id': graph_id,
+            'machine_name': machine_name_for_graph,
+            'series': series_for_graph,
+            'aggregate': selected_aggregate,
+            'type': selected_type,
+            'date_from': custom_date_from,
+            'date_to': custom_date_to,
+            'since': cursor if isinstance(cursor, str) else None,
+            'downsample': downsample,
+            'maximised': maximised,
+            'width': plot_width,
+            'multi_aggregate': multi_aggregate,
+        })
+        original_ids.append(original_id)
+
+    plan = {
+        'machine_names': machine_names,
+        'type': selected_type,
+        'aggregate': selected_aggregate,
+        'graphs': selected_graphs,
+        'series': selected_series,
+        'range': time_range,
+        'jobs': jobs,
+        'original_ids': original_ids,
+        'format': response_format,
+        'downsample': downsample,
+    }
+    return plan, None
+
+
+# Set on a graph job after planning (row budget, loaded config, resolved window), not part of its identity
+_RESOLVED_JOB_FIELDS = ('max_rows', 'context', 'window')
+
+
+def _graph_job_key(job):
+    """Identity of a graph job, equal for sub-queries that would return the same data before any row budget"""
+    return json.dumps({field: value for field, value in job.items() if field not in _RESOLVED_JOB_FIELDS},
+                      sort_keys=True, default=str)
+
+
+def _graph_context(job):
+    """
+    Load the machine config of a planned graph job and build the graphs_info getCustomData expects.
+
+    Returns a dict (file_path, data_type_name, data_type_config, has_pivot, graphs_info), or None when
+    the config file or the graph does not exist.
+    """
+    graph_id = job['graph_id']
+    machine_name_for_graph = job['machine_name']
+    series_for_graph = job['series']
+    selected_aggregate = job['aggregate']
+
+    # Parsed config from the shared registry, the file is only read again when it changes
+    with metrics.stage('config_load') as labels:
+        machine_config = getConfigRegistry(MACHINE_CONFIG_PATH).machine(machine_name_for_graph)
+        # Only configured machines become label values, so arbitrary request names cannot add series
+        labels['machine'] = machine_name_for_graph if machine_config is not None else 'unknown'
+
+    if machine_config is None:
+        logger.warning(f'Configuration file not found for: {machine_name_for_graph}')
+        return None
+    file_path = machine_config.path
+
+    # Build graph info for this specific graph
+    data_type = machine_config.dataType(graph_id)
+    if data_type is None:
+        return None
+
+    data_type_name, data_type_config = data_type.name, data_type.raw
+    has_pivot = data_type.hasPivot
+
+    # Build graphs_info based on whether Pivot exists
+    if has_pivot:
+        # With Pivot: include series from selected_series
+        graphs_info = [{
+            'id': int(graph_id),
+            'name': data_type_name,
+            'aggregation': selected_aggregate,
+            'series': series_for_graph
+        }]
+    else:
+        # No Pivot: omit 'series' key entirely - will query all data
+        graphs_info = [{
+            'id': int(graph_id),
+            'name': data_type_name,
+            'aggregation': selected_aggregate,
+        }]
+        logger.info(f"No Pivot for graph {graph_id} ({data_type_name}) - querying all data without series filtering")
+
+    if job.get('since'):
+        graphs_info[0]['since'] = job['since']
+    if job.get('downsample') == 'lttb':
+        graphs_info[0]['downsample'] = 'lttb'
+    if job.get('width'):
+        graphs_info[0]['width'] = job['width']
+    if job.get('max_rows'):
+        graphs_info[0]['max_rows'] = job['max_rows']
+    if job.get('multi_aggregate'):
+        graphs_info[0]['multi_aggregate'] = True
+
+    return {
+        'file_path': file_path,
+        'data_type_name': data_type_name,
+        'data_type_config': data_type_config,
+        'has_pivot': has_pivot,
+        'graphs_info': graphs_info,
+    }
+
+
+def _share_aggregate_fetches(jobs):
+    """Jobs only differing by their aggregate fetch the window statistics once, each aggregate is computed from them"""
+    groups = {}
+    for job in jobs:
+        groups.setdefault(_graph_job_key(dict(job, aggregate=None)), []).append(job)
+    for group in groups.values():
+        if len({job['aggregate'] for job in group}) > 1:
+            for job in group:
+                job['multi_aggregate'] = True
+
+
+def _resolve_job_window(job, context):
+    """The window (range, aggregation period, cost estimate) the query of a graph job is built with"""
+    return resolveQueryWindow(context['data_type_config'], job['date_from'], job['date_to'], job['type'], job.get('maximised', False),
+                              job.get('since'), job.get('downsample'), job.get('width'), context['graphs_info'][0])
+
+
+def _resolve_job(job):
+    """
+    Load the context and resolve the window of a graph job once, they are kept on the job as
+    'context' and 'window' (both None when the config or the graph does not exist).
+
+    Raises QueryBudgetError when the job is over its row budget even at the coarsest window.
+    """
+    if 'window' not in job:
+        context = _graph_context(job)
+        window = _resolve_job_window(job, context) if context else None
+        job['context'], job['window'] = context, window
+    return job
+
+
+def _limit_job_rows(job, max_rows):
+    """Lower the row budget of a resolved graph job and coarsen its window to fit (a budget is never raised)"""
+    if job['context'] is None or (job.get('max_rows') and job['max_rows'] <= max_rows):
+        return
+    job['max_rows'] = max_rows
+    job['context']['graphs_info'][0]['max_rows'] = max_rows
+    job['window'] = _resolve_job_window(job, job['context'])
+
+
+def _apply_query_budget(jobs, max_rows):
+    """
+    Share a row budget between graph jobs before anything is sent to InfluxDB.
+
+    When the estimated rows of all jobs exceed max_rows, each job gets a proportional "max_rows"
+    share and its window is coarsened to fit. Returns an error body when the jobs cannot fit
+    even at the coarsest window, otherwise None.
+    """
+    costs = []
+    for job in jobs:
+        try:
+            window = _resolve_job(job)['window']
+        except QueryBudgetError as e:
+            return {'status': 'error', 'message': str(e), 'data': {}}
+        costs.append(window['cost'] if window else None)
+
+    total_rows = sum(cost['rows'] for cost in costs if cost)
+    if total_rows <= max_rows:
+        return None
+
+    minimum_rows = sum(cost['minRows'] for cost in costs if cost)
+    if minimum_rows > max_rows:
+        return {
+            'status': 'error',
+            'message': f'This request would read about {total_rows} rows from InfluxDB, over the limit of {max_rows}. Select fewer graphs or series.',
+            'data': {}
+        }
+
+    logger.info(f"Estimated {total_rows} rows is over the budget of {max_rows}, coarsening {len(jobs)} graphs")
+    for job, cost in zip(jobs, costs):
+        if cost:
+            _limit_job_rows(job, max(int(max_rows * cost['rows'] / total_rows), cost['minRows']))
+    return None
+
+
+def _fit_jobs_to_budget(jobs, max_rows):
+    """
+    _apply_query_budget for the jobs of several components: when the jobs cannot fit max_rows even at
+    the coarsest window, the jobs with the highest minimum cost are left out until the others fit,
+    instead of failing them all. Returns {position in jobs: error body} for the jobs left out.
+    """
+    rejected = {}
+    costs = {}
+    for position, job in enumerate(jobs):
+        try:
+            window = _resolve_job(job)['window']
+        except QueryBudgetError as e:
+            rejected[position] = {'status': 'error', 'message': str(e), 'data': {}}
+            continue
+        if window:
+            costs[position] = window['cost']
+
+    minimum_rows = sum(cost['minRows'] for cost in costs.values())
+    for position in sorted(costs, key=lambda position: costs[position]['minRows'], reverse=True):
+        if minimum_rows <= max_rows:
+            break
+        minimum_rows -= costs[position]['minRows']
+        rejected[position] = {
+            'status': 'error',
+            'message': f"This component would read at least {costs[position]['minRows']} rows from InfluxDB, over what is left of the dashboard limit of {max_rows}. Select fewer graphs or series.",
+            'data': {}
+        }
+
+    # Cannot fail any more: what is left fits at the coarsest window
+    _apply_query_budget([job for position, job in enumerate(jobs) if position not in rejected], max_rows)
+    return rejected
+
+
+def _fetch_graph_data(job):
+    """
+    Resolve config, build and run the query for a single planned graph job.
+    Runs on the shared query executor, so it must not mutate anything shared with other graphs.
+
+    Returns a (data, metadata) tuple, both None when no data could be generated.
+    data is the graph's result DataFrame (shared through the query cache, so read only).
+    """
+    graph_id = job['graph_id']
+    machine_name_for_graph = job['machine_name']
+    selected_type = job['type']
+
+    # Normally resolved while the row budget was applied
+    context = _resolve_job(job)['context']
+    if context is None:
+        return None, None
+    window = job['window']
+
+    file_path = context['file_path']
+    data_type_name = context['data_type_name']
+    data_type_config = context['data_type_config']
+    has_pivot = context['has_pivot']
+    graphs_info = context['graphs_info']
+
+    customised_config_data = {
+        'date_from': job['date_from'],
+        'date_to': job['date_to'],
+        'data_types': [dict(graphs_info[0], window=window)],  # The query is built with the window resolved for the job
+        'machine_name': machine_name_for_graph,
+        "type": selected_type,
+        'maximised': job.get('maximised', False)
+    }
+    # Get data for this machine/dropdown, as a DataFrame on full precision UTC timestamps (formatted after the merge)
+    with metrics.metric_labels(machine_name_for_graph, data_type_name):
+        machine_data = getCustomData(customised_config_data, file_path, preprocess=False)
+
+    if machine_data is None:
+        # The query failed: not an empty delta, the client keeps its cursor and asks again
+        return None, None
+    graph_data = machine_data[0] if machine_data else None  # Only one graph is queried at a time
+    if graph_data is None:
+        if not window['delta']:
+            return None, None
+        graph_data = pd.DataFrame()  # Nothing new since the cursor
+
+    metadata = {
+        'graph_id': str(graph_id),
+        'machine_name': machine_name_for_graph,
+        'data_type_name': data_type_name,
+        'units': data_type_config.get('Units', ''),
+        'series': graphs_info[0].get('series', []),  # Store series used for this graph
+        'has_pivot': has_pivot,  # Store per-graph
+        'window': {
+            'start': window['start'].isoformat(),
+            'stop': window['stop'].isoformat(),
+            'every': window['every'],
+            'points': window['points']
+        },
+        'cost': window['cost'],
+        'downsample': job.get('downsample', 'aggregate'),
+        'delta': window['delta'],
+        # Send back as cursors[idx] on the next refresh to only receive new and replaced points
+        'cursor': window['stop'].isoformat()
+    }
+    return graph_data, metadata
+
+
+def _fetch_graph_data_or_none(job):
+    """_fetch_graph_data for batch rendering, where one bad graph must not fail every component"""
     try:
-        data = request.data
-        machine_name = data.get('machine_name')  # For backward compatibility
-        machine_names = data.get('machine_names', [])  # New: array of machine names per graph
-        selected_type = data.get('type', None)
-        selected_aggregate = data.get('aggregate', 'max')
-        selected_graphs = data.get('graphs', [])
-        selected_series = data.get('series', {})
-        time_range = data.get('range', '3h')
-        
-        # Backward compatibility: if machine_names not provided, use machine_name for all graphs
-        if not machine_names:
-            machine_names = [machine_name] * len(selected_graphs)
-        
-        if not selected_graphs:
-            return JsonResponse({
-                'status': 'error',
-                'message': 'No graphs selected',
-                'data': {}
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        if len(machine_names) != len(selected_graphs):
-            return JsonResponse({
-                'status': 'error',
-                'message': 'Number of machine names must match number of selected graphs',
-                'data': {}
-            }, status=status.HTTP_400_BAD_REQUEST)
-        
-        # Calculate time range
-        delta = parse_range_to_timedelta(time_range)
-        custom_date_from = (datetime.now() - delta).strftime("%Y-%m-%dT%H:%M:%SZ")
-        custom_date_to = datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ")
-        
-        # Process each graph with its corresponding machine/dropdown
-        all_machine_data = []
-        machine_metadata = []  # Store metadata about each graph's source
-        
-        for idx, (graph_id, machine_name_for_graph) in enumerate(zip(selected_graphs, machine_names)):
-            file_path = os.path.join(MACHINE_CONFIG_PATH, f"{machine_name_for_graph}.json")
-            
-            if not os.path.exists(file_path):
-                logger.warning(f'Configuration file not found for: {machine_name_for_graph}')
-                all_machine_data.append(None)
-                machine_metadata.append(None)
+        return _fetch_graph_data(job)
+    except Exception as e:
+        logger.error(f"Error fetching graph {job.get('graph_id')} for {job.get('machine_name')}: {str(e)}")
+        return None, None
+
+
+def _assemble_generate_response(plan, graph_results):
+    """
+    Merge the per-graph results of a planned generate_data request into the response body.
+
+    graph_results holds one (data, metadata) tuple per planned job, in job order.
+    Returns a (body, http_status) tuple.
+    """
+    machine_names = plan['machine_names']
+    selected_type = plan['type']
+    selected_aggregate = plan['aggregate']
+    selected_graphs = plan['graphs']
+    selected_series = plan['series']
+    time_range = plan['range']
+
+    all_machine_data = [graph_data for graph_data, _ in graph_results]
+    machine_metadata = []  # Store metadata about each graph's source
+    for (_, metadata), original_id in zip(graph_results, plan['original_ids']):
+        # Copy, as identical sub-queries may be shared between components
+        machine_metadata.append(dict(metadata, original_id=original_id) if metadata else None)
+
+    logger.info(f"Processed {len(all_machine_data)} machines/dropdowns")
+
+    # Check if all_machine_data is empty or ANY entry is None
+    if not all_machine_data or any(data is None for data in all_machine_data):
+        # Check for individual None entries and collect which series failed
+        failed_series = []
+        for idx, data in enumerate(all_machine_data):
+            if data is None and idx < len(machine_metadata) and machine_metadata[idx] is not None:
+                metadata = machine_metadata[idx]
+                failed_series.append({
+                    'graph_id': metadata.get('graph_id'),
+                    'machine_name': metadata.get('machine_name'),
+                    'data_type': metadata.get('data_type_name'),
+                    'series_name': metadata.get('series', [])
+                })
+
+        # return this info to frontend
+        error_messages = []
+        for failed in failed_series:
+            data_type = failed.get('data_type', 'Unknown')
+            series_names = failed.get('series_name', [])
+            series_str = ', '.join(series_names) if series_names else 'None'
+            error_messages.append(f"selected Graph: {data_type} and its Series: {series_str}")
+
+        combined_message = "No data could be generated for " + "; ".join(error_messages)
+
+        return {
+            'status': 'error',
+            'message': combined_message,
+            'data': {}
+        }, status.HTTP_404_NOT_FOUND
+
+    else:
+        # Merge data from multiple machines/dropdowns
+        combined_data = {
+            'chartData': [],
+            'series': [],
+            'format': plan.get('format', 'rows'),
+            'machineMetadata': machine_metadata  # Include metadata for frontend
+        }
+
+        merge_sources = []
+
+        # Process each machine's data
+        for idx, graph_frame in enumerate(all_machine_data):
+            if not isinstance(graph_frame, pd.DataFrame):
                 continue
-            
-            # Load the config file to get graph names
-            with open(file_path, 'r', encoding='utf-8') as f:
-                machine_config = json.load(f)
 
-            data_types = list(machine_config.get('Data', {}).items())
-            
-            # Build graph info for this specific graph
-            graph_index = int(graph_id) - 1
-            if graph_index >= 0 and graph_index < len(data_types):
-                data_type_name, data_type_config = data_types[graph_index]
-                has_pivot = 'Pivot' in data_type_config
-                # Extract series for this graph using index instead of graph_id
-                series_for_graph = []
-                
-                # Handle both dict and list formats for selected_series
+            metadata = machine_metadata[idx] if idx < len(machine_metadata) else None
+            if not metadata:
+                continue
+
+            has_pivot = metadata.get('has_pivot', False)
+
+            # check if data type does not have pivot
+            if not has_pivot:
+                # infer available series from the frame columns (exclude the timestamp and index key)
+                graph_series = [str(column) for column in graph_frame.columns if column not in ('time', 'index')]
+                # fallback to ['value'] if nothing else found
+                if not graph_series:
+                    graph_series = ['value']
+                machine_metadata[idx]['series'] = graph_series  # Update metadata with inferred series
+
+                # Update selected_series with inferred series based on format
                 if isinstance(selected_series, dict):
-                    # Dictionary format: {"0": {"series": [...], "originalId": "..."}} or {"0": [...]}
-                    if str(idx) in selected_series:
-                        series_entry = selected_series[str(idx)]
-                        if isinstance(series_entry, dict):
-                            series_for_graph = series_entry.get('series', [])
-                        elif isinstance(series_entry, list):
-                            # Direct list of series names
-                            series_for_graph = series_entry
+                    if str(idx) not in selected_series:
+                        selected_series[str(idx)] = {}
+                    selected_series[str(idx)]['series'] = graph_series
                 elif isinstance(selected_series, list):
-                    # List format: [{"series": [...], "originalId": "..."}, ...] or [[...], ...]
                     if idx < len(selected_series):
-                        series_entry = selected_series[idx]
-                        if isinstance(series_entry, dict):
-                            series_for_graph = series_entry.get('series', [])
-                        elif isinstance(series_entry, list):
-                            series_for_graph = series_entry
-
-                # Build graphs_info based on whether Pivot exists
-                if has_pivot:
-                    # With Pivot: include series from selected_series
-                    graphs_info = [{
-                        'id': int(graph_id),
-                        'name': data_type_name,
-                        'aggregation': selected_aggregate,
-                        'series': series_for_graph
-                    }]
-                else:
-                    # No Pivot: omit 'series' key entirely - will query all data
-                    graphs_info = [{
-                        'id': int(graph_id),
-                        'name': data_type_name,
-                        'aggregation': selected_aggregate,
-                    }]
-                    logger.info(f"No Pivot for graph {graph_id} ({data_type_name}) - querying all data without series filtering")
-                
-                customised_config_data = {
-                    'date_from': custom_date_from,
-                    'date_to': custom_date_to,
-                    'data_types': graphs_info,
-                    'machine_name': machine_name_for_graph,
-                    "type": selected_type
-                }
-                # print("*** Customised Config Data:", customised_config_data)
-                # Get data for this machine/dropdown
-                machine_data = getCustomData(customised_config_data, file_path)
-                # print("Machine Data here")
-                # print("*** Machine Data :", machine_data)
-
-                if machine_data and len(machine_data) > 0:
-                    # print("machine data for graph_id", graph_id, ":", machine_data[0])
-                    all_machine_data.append(machine_data[0])  # Get first element as we only query one graph at a time
-                    
-                    # Extract originalId based on selected_series format
-                    original_id = ''
-                    if isinstance(selected_series, dict):
-                        original_id = selected_series.get(str(idx), {}).get('originalId', '')
-                    elif isinstance(selected_series, list) and idx < len(selected_series):
-                        series_entry = selected_series[idx]
-                        if isinstance(series_entry, dict):
-                            original_id = series_entry.get('originalId', '')
-                    
-                    machine_metadata.append({
-                        'graph_id': str(graph_id),
-                        'machine_name': machine_name_for_graph,
-                        'data_type_name': data_type_name,
-                        'units': data_type_config.get('Units', ''),
-                        'original_id': original_id,
-                        'series': graphs_info[0].get('series', []),  # Store series used for this graph
-                        'has_pivot': has_pivot  # Store per-graph
-                    })
-                else:
-                    all_machine_data.append(None)
-                    machine_metadata.append(None)
+                        if isinstance(selected_series[idx], dict):
+                            selected_series[idx]['series'] = graph_series
+                        else:
+                            selected_series[idx] = {'series': graph_series}
             else:
-                all_machine_data.append(None)
-                machine_metadata.append(None)
-
-        logger.info(f"Processed {len(all_machine_data)} machines/dropdowns")
-        # pprint.pprint("****** All Machine Data  ******:")
-        # pprint.pprint(all_machine_data, indent=2, width=120)
-
-        # Check if all_machine_data is empty or ANY entry is None
-        if not all_machine_data or any(data is None for data in all_machine_data):
-            # Check for individual None entries and collect which series failed
-            failed_series = []
-            for idx, data in enumerate(all_machine_data):
-                if data is None and idx < len(machine_metadata) and machine_metadata[idx] is not None:
-                    metadata = machine_metadata[idx]
-                    failed_series.append({
-                        'graph_id': metadata.get('graph_id'),
-                        'machine_name': metadata.get('machine_name'),
-                        'data_type': metadata.get('data_type_name'),
-                        'series_name': metadata.get('series', [])
-                    })
+                # Use series from metadata, with fallback
+                graph_series = metadata.get('series', [])
+                if selected_aggregate == ENVELOPE and selected_type != 'Stat':
+                    # Envelope queries return a min and a max band per selected series
+                    graph_series = [band_series for series_name in graph_series for band_series in envelopeSeries(series_name)]
 
-            # return this info to frontend
-            error_messages = []
-            for failed in failed_series:
-                data_type = failed.get('data_type', 'Unknown')
-                series_names = failed.get('series_name', [])
-                series_str = ', '.join(series_names) if series_names else 'None'
-                error_messages.append(f"selected Graph: {data_type} and its Series: {series_str}")
-            
-            combined_message = "No data could be generated for " + "; ".join(error_messages)
-            
-            return JsonResponse({
-                'status': 'error',
-                'message': combined_message,
-                'data': {}
-            }, status=status.HTTP_404_NOT_FOUND)
-        
-        else:
-            # Merge data from multiple machines/dropdowns
-            combined_data = {
-                'chartData': [],
-                'series': [],
-                'machineMetadata': machine_metadata  # Include metadata for frontend
+            merge_sources.append((graph_frame, graph_series))
+
+        # Align every graph on its UTC timestamps (resampled to a common grid when intervals differ),
+        # averaging values of the same series at the same timestamp
+        with metrics.stage('merge'):
+            merged_times, merged_series, merged_values = mergeFrames(merge_sources)
+        combined_data['series'] = merged_series
+        sorted_timestamps = formatTimes(merged_times).tolist()
+        series_columns = {
+            series_name: toNullableList(merged_values[:, position])
+            for position, series_name in enumerate(merged_series)
+        }
+        if selected_aggregate == ENVELOPE:
+            # Pair up the band series so the frontend can draw each min/max as one band
+            combined_data['bands'] = []
+            for series_name in merged_series:
+                base_name, _, band = series_name.rpartition('_')
+                if band == ENVELOPE_BANDS[0] and all(band_series in series_columns for band_series in envelopeSeries(base_name)):
+                    lower, upper = envelopeSeries(base_name)
+                    combined_data['bands'].append({'series': base_name, 'min': lower, 'max': upper})
+
+        # Full precision timestamps (epoch milliseconds), as the HH:MM labels repeat on multi-day ranges
+        combined_data['timestamps'] = (merged_times.asi8 // 1_000_000).tolist()
+
+        if combined_data['format'] == 'columnar':
+            # {"time": [...], "values": {"X": [...], ...}}, missing points are null in the series array
+            combined_data['chartData'] = {
+                'time': sorted_timestamps,
+                'values': series_columns
             }
-            
-            all_timestamps = set()
-            series_data_map = {}
-            
-            # Process each machine's data
-            for idx, data_list in enumerate(all_machine_data):
-                if data_list is None or not isinstance(data_list, list):
-                    continue
-                
-                metadata = machine_metadata[idx] if idx < len(machine_metadata) else None
-                if not metadata:
-                    continue
-                
-                has_pivot = metadata.get('has_pivot', False)
-
-                # check if data type does not have pivot
-                if not has_pivot:
-                    # infer available series from data_list (exclude the timestamp and index key)
-                    graph_series = []
-                    for entry in data_list:
-                        if isinstance(entry, dict):
-                            for key in entry.keys():
-                                if (key != 'time' and key != 'index') and key not in graph_series:
-                                    graph_series.append(key)
-                    # fallback to ['value'] if nothing else found 
-                    if not graph_series:
-                        graph_series = ['value']
-                    machine_metadata[idx]['series'] = graph_series  # Update metadata with inferred series
-                    
-                    # Update selected_series with inferred series based on format
-                    if isinstance(selected_series, dict):
-                        if str(idx) not in selected_series:
-                            selected_series[str(idx)] = {}
-                        selected_series[str(idx)]['series'] = graph_series
-                    elif isinstance(selected_series, list):
-                        if idx < len(selected_series):
-                            if isinstance(selected_series[idx], dict):
-                                selected_series[idx]['series'] = graph_series
-                            else:
-                                selected_series[idx] = {'series': graph_series}
-                else:
-                    # Use series from metadata, with fallback
-                    graph_series = metadata.get('series', [])
-
-                # Process each data entry in the list
-                for entry in data_list:
-                    timestamp = entry.get('time')
-                    if timestamp:
-                        all_timestamps.add(timestamp)
-
-                        # Process each series - look for matching series names in the entry
-                        for series_name in graph_series:
-                            if series_name in entry:
-                                if series_name not in series_data_map:
-                                    series_data_map[series_name] = {}
-                                    combined_data['series'].append(series_name)
-                                
-                                # Store or aggregate values for the same timestamp
-                                if timestamp not in series_data_map[series_name]:
-                                    series_data_map[series_name][timestamp] = []
-                                series_data_map[series_name][timestamp].append(entry[series_name])
-            
-            # Build combined chart data - average values for same timestamps
-            sorted_timestamps = sorted(list(all_timestamps))
-            for timestamp in sorted_timestamps:
+        else:
+            columns = list(series_columns.items())
+            for position, timestamp in enumerate(sorted_timestamps):
                 data_point = {'time': timestamp}
-                for series_name in combined_data['series']:
-                    if timestamp in series_data_map[series_name]:
-                        values = series_data_map[series_name][timestamp]
-                        # Average multiple values for the same timestamp
-                        data_point[series_name] = sum(values) / len(values) if values else None
-                    else:
-                        data_point[series_name] = None
+                for series_name, series_values in columns:
+                    data_point[series_name] = series_values[position]
                 combined_data['chartData'].append(data_point)
-            
-            logger.info(f"Generated custom graph data with {len(combined_data['chartData'])} points and {len(combined_data['series'])} series from {len(machine_metadata)} sources")
-            
-            # Add selectedType to the response data
-            combined_data['type'] = selected_type
-            
-            # If type is 'stat'
-            if selected_type and selected_type == 'Stat': # logic will change based on condition to check maximised 
-                stats_values = []
-                for series_name in combined_data['series']:
-                    print(f"Processing stats for series: {series_name}")
-                    # Get the only value for this series
-                    last_value = None
-                    for data_point in combined_data['chartData']:
-                        print(f"Data point: {data_point}")
-                        if data_point.get(series_name) is not None:
-                            last_value = data_point[series_name]
-                            break
-                    
-                    if last_value is not None:
-                        stats_values.append({
-                            'series': series_name,
-                            'value': last_value
-                        })
-                # print("Stats values calculated:", stats_values)
-                if stats_values:
-                    combined_data['statsValue'] = stats_values[0]['value']
-                    print("Final stats value:", combined_data['statsValue'])
-                else:
-                    combined_data['statsValue'] = 'N/A'
-            
-            # Build saveable config for component storage, This allows the frontend to save the exact configuration that generated this data
-            saveable_config = {
-                'type': selected_type,
-                'aggregate': selected_aggregate,
-                'graphs': selected_graphs,
-                'machine_names': machine_names,
-                'series': selected_series,
-                'range': time_range
+
+        logger.info(f"Generated custom graph data with {len(sorted_timestamps)} points and {len(combined_data['series'])} series from {len(machine_metadata)} sources")
+
+        # Add selectedType to the response data
+        combined_data['type'] = selected_type
+
+        # Effective (aligned) window across all graphs
+        graph_windows = [metadata['window'] for metadata in machine_metadata if metadata and metadata.get('window')]
+        if graph_windows:
+            window_periods = {graph_window['every'] for graph_window in graph_windows}
+            combined_data['window'] = {
+                'start': min(graph_window['start'] for graph_window in graph_windows),
+                'stop': max(graph_window['stop'] for graph_window in graph_windows),
+                'every': window_periods.pop() if len(window_periods) == 1 else None
             }
 
-            # print("Combined Data:", combined_data)
-            
+        # Delta responses only hold new points plus the re-fetched tail, merge them into the existing chartData by time
+        combined_data['delta'] = any(metadata.get('delta') for metadata in machine_metadata if metadata)
+        combined_data['cursors'] = [metadata.get('cursor') if metadata else None for metadata in machine_metadata]
+
+        # If type is 'stat'
+        if selected_type and selected_type == 'Stat': # logic will change based on condition to check maximised 
+            stats_values = []
+            for series_name in combined_data['series']:
+                print(f"Processing stats for series: {series_name}")
+                # Get the only value for this series
+                last_value = next((value for value in series_columns[series_name] if value is not None), None)
+
+                if last_value is not None:
+                    stats_values.append({
+                        'series': series_name,
+                        'value': last_value
+                    })
+            # print("Stats values calculated:", stats_values)
+            if stats_values:
+                combined_data['statsValue'] = stats_values[0]['value']
+                print("Final stats value:", combined_data['statsValue'])
+            else:
+                combined_data['statsValue'] = 'N/A'
+
+        # Build saveable config for component storage, This allows the frontend to save the exact configuration that generated this data
+        saveable_config = {
+            'type': selected_type,
+            'aggregate': selected_aggregate,
+            'graphs': selected_graphs,
+            'machine_names': machine_names,
+            'series': selected_series,
+            'range': time_range,
+            'downsample': plan.get('downsample', 'aggregate')
+        }
+
+        # print("Combined Data:", combined_data)
+
+        return {
+            'status': 'success',
+            'message': 'Custom graph data retrieved successfully',
+            'data': combined_data,
+            'saveableConfig': saveable_config  # NEW: Add saveable config for component creation
+        }, status.HTTP_200_OK
+
+
+@api_view(['POST'])
+def generate_data(request):
+    """Get custom graph data based on selected graphs and series"""
+    try:
+        plan, error = _plan_generate_request(request.data)
+        if error:
+            return JsonResponse(error, status=status.HTTP_400_BAD_REQUEST)
+
+        # Estimate the rows every graph would read, coarsen or reject before querying InfluxDB
+        error = _apply_query_budget(plan['jobs'], QUERY_MAX_ROWS)
+        if error:
+            return JsonResponse(error, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        # Process each graph with its corresponding machine/dropdown, concurrently, keeping request order
+        graph_results = map_ordered(_fetch_graph_data, plan['jobs'])
+
+        response_body, response_status = _assemble_generate_response(plan, graph_results)
+        with metrics.stage('json_serialization'):
+            return JsonResponse(response_body, status=response_status)
+
+    except QueryBudgetError as e:
+        return JsonResponse({
+            'status': 'error',
+            'message': str(e),
+            'data': {}
+        }, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    except Exception as e:
+        logger.error(f"Error retrieving custom graph data: {str(e)}")
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Internal server error: {str(e)}',
+            'data': {}
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+def render_dashboard(request):
+    """
+    Generate the data of every component of a dashboard in one call
+
+    POST /api/render-dashboard/
+
+    Request Body (either):
+    {"dashboard_id": 12}
+    {"components": [{"icomponent_id": 45, "vQuery": {...}}, ...]}
+    Optional "format": "columnar" returns every component's chartData in the columnar format.
+
+    All graph queries of all components are planned together, identical
+    sub-queries are run once, and everything runs on the shared query executor.
+
+    Response:
+    {
+        "status": "success",
+        "data": [
+            {"component_id": 45, "status_code": 200, "status": "success", "data": {...}, "saveableConfig": {...}},
+            ...
+        ],
+        "queries": {"planned": 9, "executed": 6}
+    }
+    """
+    try:
+        data = request.data
+        dashboard_id = data.get('dashboard_id')
+        components = data.get('components', [])
+        response_format = data.get('format')  # Optional: applied to every component, see generate_data
+
+        if dashboard_id:
+            mysql_service = MySQLService()
+            components = mysql_service.get_components_by_dashboard(dashboard_id)
+            if components is None:
+                return JsonResponse({
+                    'status': 'error',
+                    'message': 'Failed to fetch components',
+                    'data': []
+                }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        elif not isinstance(components, list) or not components:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'dashboard_id or a list of components is required',
+                'data': []
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Plan every component against the same clock so equal ranges produce equal sub-queries
+        now = datetime.now()
+        planned_components = []
+        for position, component in enumerate(components):
+            component = component if isinstance(component, dict) else {}
+            v_query = component.get('vQuery', component) or {}
+            if response_format:
+                v_query = dict(v_query, format=response_format)
+            component_id = component.get('icomponent_id', position)
+            error_status = status.HTTP_400_BAD_REQUEST
+            try:
+                plan, error = _plan_generate_request(v_query, now)
+            except ValueError as e:
+                plan, error = None, {'status': 'error', 'message': f'Invalid data format: {str(e)}', 'data': {}}
+            planned_components.append((component_id, plan, error, error_status))
+
+        # Components only differing by aggregate share one statistics query (through the query cache)
+        _share_aggregate_fetches([job for _, plan, _, _ in planned_components if plan for job in plan['jobs']])
+
+        # Deduplicate identical sub-queries across components, before any row budget is applied
+        unique_jobs = {}
+        component_job_keys = []
+        for _, plan, _, _ in planned_components:
+            keys = [_graph_job_key(job) for job in plan['jobs']] if plan else []
+            for key, job in zip(keys, plan['jobs'] if plan else []):
+                unique_jobs.setdefault(key, job)
+            component_job_keys.append(keys)
+
+        # Each component gets the budget of a generate_data request, applied to the shared jobs
+        # (a job used by several components keeps the smallest share)
+        for position, ((component_id, plan, error, error_status), keys) in enumerate(zip(planned_components, component_job_keys)):
+            if plan:
+                error = _apply_query_budget([unique_jobs[key] for key in dict.fromkeys(keys)], QUERY_MAX_ROWS)
+                if error:
+                    planned_components[position] = (component_id, None, error, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        # The whole dashboard shares one budget as well (this may coarsen the unique jobs further),
+        # a component with a job that does not fit even at the coarsest window fails on its own
+        job_keys = list(dict.fromkeys(key for (_, plan, _, _), keys in zip(planned_components, component_job_keys) if plan for key in keys))
+        rejected = _fit_jobs_to_budget([unique_jobs[key] for key in job_keys], DASHBOARD_MAX_ROWS)
+        rejected_keys = {job_keys[position]: error for position, error in rejected.items()}
+        for position, ((component_id, plan, _, _), keys) in enumerate(zip(planned_components, component_job_keys)):
+            error = next((rejected_keys[key] for key in keys if key in rejected_keys), None) if plan else None
+            if error:
+                planned_components[position] = (component_id, None, error, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+        planned_keys = [key for (_, plan, _, _), keys in zip(planned_components, component_job_keys) if plan for key in keys]
+        planned_count = len(planned_keys)
+        job_keys = list(dict.fromkeys(planned_keys))
+        job_results = dict(zip(job_keys, map_ordered(_fetch_graph_data_or_none, [unique_jobs[key] for key in job_keys])))
+
+        rendered_components = []
+        for (component_id, plan, error, error_status), keys in zip(planned_components, component_job_keys):
+            if error:
+                rendered_components.append(dict(error, component_id=component_id, status_code=error_status))
+                continue
+            graph_results = [job_results[key] for key in keys]
+            response_body, response_status = _assemble_generate_response(plan, graph_results)
+            rendered_components.append(dict(response_body, component_id=component_id, status_code=response_status))
+
+        logger.info(f"Rendered {len(rendered_components)} components with {len(job_keys)} of {planned_count} planned queries")
+
+        with metrics.stage('json_serialization'):
             return JsonResponse({
                 'status': 'success',
-                'message': 'Custom graph data retrieved successfully',
-                'data': combined_data,
-                'saveableConfig': saveable_config  # NEW: Add saveable config for component creation
+                'message': 'Dashboard data retrieved successfully',
+                'data': rendered_components,
+                'queries': {
+                    'planned': planned_count,
+                    'executed': len(job_keys)
+                }
             }, status=status.HTTP_200_OK)
-    
+
     except Exception as e:
-        logger.error(f"Error retrieving custom graph data: {str(e)}")
+        logger.error(f"Error rendering dashboard: {str(e)}")
+        return JsonResponse({
+            'status': 'error',
+            'message': f'Internal server error: {str(e)}',
+            'data': []
+        }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(['POST'])
+def stat_values(request):
+    """
+    Latest values of many Stat components at once, one grouped last() query per bucket/measurement.
+
+    Body: {"stats": [{"id", "machine_name", "data_type" or "graph", "series", "aggregate", "range"}], "range": "1h"}
+    A machine_name of "*" returns the data type for every configured machine (fleet overview),
+    keyed "<id>/<machine>".
+    """
+    try:
+        stats = request.data.get('stats')
+        if not isinstance(stats, list) or not stats:
+            return JsonResponse({
+                'status': 'error',
+                'message': 'stats must be a non-empty list',
+                'data': {}
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+        default_range = request.data.get('range')
+        stat_requests = [
+            dict(stat, range=stat.get('range') or default_range) if isinstance(stat, dict) else stat
+            for stat in stats
+        ]
+        values, query_count = getLatestValues(stat_requests, MACHINE_CONFIG_PATH)
+
+        return JsonResponse({
+            'status': 'success',
+            'message': 'Stat values retrieved successfully',
+            'data': values,
+            'queries': query_count
+        }, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        logger.error(f"Error retrieving stat values: {str(e)}")
         return JsonResponse({
             'status': 'error',
             'message': f'Internal server error: {str(e)}',
@@ -1074,6 +1559,12 @@ def generate_data(request):
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+@require_GET  # Plain Django view, DRF content negotiation would reject a scraper's text Accept header
+def get_metrics(request):
+    """Per-stage latency and rows returned histograms, in the Prometheus text format"""
+    return HttpResponse(metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 # ============================================================================
 # COMPONENT CRUD API ENDPOINTS
 # ============================================================================
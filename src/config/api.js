@@ -11,6 +11,7 @@ export const API_ENDPOINTS = {
 
   machinesWithConfig: '/api/machines-with-config/',
   dropdownsFromConfig: '/api/dropdowns-from-config/',
+  machineCatalog: '/api/machine-catalog/',
 
   createDashboard: '/api/create-dashboard/',
   getDashboards: '/api/dashboards/',
@@ -18,6 +19,7 @@ export const API_ENDPOINTS = {
   dataTypes: '/api/data-types/',
   availableSeries: '/api/available-series/',
   generateData: '/api/generate-data/',
+  renderDashboard: '/api/render-dashboard/',
 
 };
 
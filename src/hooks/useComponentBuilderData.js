@@ -1,6 +1,20 @@
-import { useState, useEffect, useCallback } from 'react';
+import { useState, useEffect, useCallback, useRef } from 'react';
 import apiService from '../services/apiService';
 
+// Unique IDs (MachineName_OriginalId) for the data types of a machine, remembering the series the catalog sent
+const withUniqueIds = (machine, dataTypes, catalogSeries) => dataTypes.map(dataType => {
+  const uniqueId = `${machine}_${dataType.id}`;
+  if (Array.isArray(dataType.availableSeries) && dataType.hasPivot !== undefined) {
+    catalogSeries[uniqueId] = { series: dataType.availableSeries, hasPivot: dataType.hasPivot };
+  }
+  return {
+    ...dataType,
+    availableSeries: [],
+    originalId: dataType.id, // Store original ID for API calls
+    id: uniqueId // Create unique ID
+  };
+});
+
 export const useComponentBuilderData = (machineName) => {
   const [graphConfigs, setGraphConfigs] = useState([]);
   const [machines, setMachines] = useState([]);
@@ -20,6 +34,8 @@ export const useComponentBuilderData = (machineName) => {
   const [loadingDataTypes, setLoadingDataTypes] = useState({});
   const [generatingGraph, setGeneratingGraph] = useState(false);
   const [error, setError] = useState(null);
+  // Series per unique graph ID from the machine catalog, so selecting a graph needs no request
+  const catalogSeriesRef = useRef({});
 
   // Handle selectedType change - clear extra selections if switching to Stat
   useEffect(() => {
@@ -66,49 +82,35 @@ export const useComponentBuilderData = (machineName) => {
         setLoading(true);
         setError(null);
 
-        // If machineName is passed as a parameter (MACH dashboard), load data for the selected machine
+        // Machines, dropdowns, every data type and their series in one request
+        const catalogResponse = await apiService.getMachineCatalog();
+        if (catalogResponse.status !== 'success') {
+          setError(catalogResponse.message || 'Failed to load machines');
+          return;
+        }
+        const catalog = catalogResponse.data;
+
+        const dataTypesByMachine = {};
+        Object.entries(catalog.data_types).forEach(([configName, dataTypes]) => {
+          dataTypesByMachine[configName] = withUniqueIds(configName, dataTypes, catalogSeriesRef.current);
+        });
+        setMachineDataTypes(dataTypesByMachine);
+        setDropdowns(catalog.dropdowns);
+
+        // If machineName is passed as a parameter (MACH dashboard), use the data for the selected machine
         if (machineName) {
-          const response = await apiService.getDataTypes(machineName);
-          
-          if (response.status === 'success') {
-            // For MACH dashboard, also create unique IDs for consistency
-            const dataTypesWithUniqueIds = response.data.map(dataType => ({
-              ...dataType,
-              originalId: dataType.id, // Store original ID for API calls
-              id: `${machineName}_${dataType.id}` // Create unique ID
-            }));
-            
-            setGraphConfigs(dataTypesWithUniqueIds);
-            setMachines([{ vName: machineName }]);
-            setMachineDataTypes({ [machineName]: dataTypesWithUniqueIds });
+          if (dataTypesByMachine[machineName]) {
+            setGraphConfigs(dataTypesByMachine[machineName]);
           } else {
-            setError(response.message || 'Failed to load data types');
-          }
-          
-          // Fetch all the dropdowns for MACH dashboard
-          const dropdownResponse = await apiService.getDropdownsFromConfig();
-          if (dropdownResponse.status === 'success') {
-            setDropdowns(dropdownResponse.data);
-          } else {
-            setError(dropdownResponse.message || 'Failed to load dropdowns');
+            setError(`Configuration file not found for machine: ${machineName}`);
           }
+          setMachines([{ vName: machineName }]);
         } else {
-          // If no machineName passed as parameter, its (GENR dashboard), get all machines first
-          const machinesResponse = await apiService.getMachinesWithConfig();
-        
-          if (machinesResponse.status === 'success') {
-            setMachines(machinesResponse.data);
-            // Don't load data types yet - will be loaded when accordion is expanded
+          // If no machineName passed as parameter, its (GENR dashboard), machines in the DB with a config
+          if (catalog.machines) {
+            setMachines(catalog.machines);
           } else {
-            setError(machinesResponse.message || 'Failed to load machines');
-          }
-          
-          // Fetch all the dropdowns for GENR dashboard
-          const dropdownResponse = await apiService.getDropdownsFromConfig();
-          if (dropdownResponse.status === 'success') {
-            setDropdowns(dropdownResponse.data);
-          } else {
-            setError(dropdownResponse.message || 'Failed to load dropdowns');
+            setError('Failed to retrieve machines from database');
           }
         }
       } catch (err) {
@@ -134,11 +136,7 @@ export const useComponentBuilderData = (machineName) => {
       
       if (response.status === 'success') {
         // Create unique IDs by prefixing with machine name
-        const dataTypesWithUniqueIds = response.data.map(dataType => ({
-          ...dataType,
-          originalId: dataType.id, // Store original ID for API calls
-          id: `${machine}_${dataType.id}` // Create unique ID
-        }));
+        const dataTypesWithUniqueIds = withUniqueIds(machine, response.data, catalogSeriesRef.current);
         
         setMachineDataTypes(prev => ({
           ...prev,
@@ -159,10 +157,18 @@ export const useComponentBuilderData = (machineName) => {
     try {
       setLoadingSeries(prev => ({ ...prev, [graphId]: true }));
       
+      // Already known from the machine catalog
+      const known = catalogSeriesRef.current[graphId];
+      if (known) {
+        setAvailableSeries(prev => ({ ...prev, [graphId]: known.series }));
+        setHasPivotMap(prev => ({ ...prev, [graphId]: known.hasPivot }));
+        return;
+      }
+
       // Extract original ID from unique ID (format: MachineName_OriginalId)
       const originalId = graphId.includes('_') ? graphId.split('_')[1] : graphId;
       
-      const response = await apiService.getAvailableSeries(originalId, machineNameForGraph, '3h');
+      const response = await apiService.getAvailableSeries(originalId, machineNameForGraph);
       
       if (response.status === 'success') {
         setAvailableSeries(prev => ({
@@ -328,6 +334,7 @@ export const useComponentBuilderData = (machineName) => {
         series: originalSeriesMapping,
         range: timeRange,
         machine_names: machineNamesArray,  // NEW: Send array of machine names
+        multi_aggregate: true,  // Switching the aggregate is then computed from the cached statistics
       }, machineToUse);
       
       if (response.status === 'success') {
@@ -72,7 +72,7 @@ const ComponentBuilder = () => {
   const [editGraphData, setEditGraphData] = useState(null);
   const [loadedComponentData, setLoadedComponentData] = useState(null); // Store loaded component for generating graph
   const custom_types = ['Graph', 'Stat'];
-  const aggregates = ['Max', 'Min', 'Mean'];
+  const aggregates = ['Max', 'Min', 'Mean', 'Count', 'Last'];
 
   // Handle chart click to open modal with ZoomableChart
   const handleChartClick = () => {
@@ -60,10 +60,8 @@ const DashboardSummary = () => {
         const componentsList = response.data || response.components || [];
         setComponents(componentsList);
         
-        // Fetch data for all components and wait for all to complete
-        await Promise.all(
-          componentsList.map(comp => fetchComponentData(comp))
-        );
+        // Fetch data for all components in a single batch request
+        await fetchAllComponentData(componentsList);
       } else {
         setError(response.error || 'Failed to fetch components');
       }
@@ -75,13 +73,53 @@ const DashboardSummary = () => {
     }
   };
 
+  // Approximate plot width of a dashboard block (a quarter of the screen on md and up, half on small screens),
+  // the backend derives each component's point budget from it
+  const withPlotWidth = (vQuery) => ({
+    ...vQuery,
+    width: Math.round(window.innerWidth >= 768 ? window.innerWidth / 4 : window.innerWidth / 2),
+  });
+
+  const fetchAllComponentData = async (componentsList) => {
+    if (componentsList.length === 0) return;
+    try {
+      const response = await apiService.renderDashboard(
+        componentsList.map(comp => ({ ...comp, vQuery: withPlotWidth(comp.vQuery) }))
+      );
+      const responsesById = {};
+      (response.data || []).forEach(item => {
+        responsesById[item.component_id] = item;
+      });
+      await Promise.all(
+        componentsList.map(comp => {
+          const componentResponse = responsesById[comp.icomponent_id];
+          return componentResponse ? applyComponentResponse(comp, componentResponse) : null;
+        })
+      );
+    } catch (err) {
+      console.error('Failed to fetch dashboard data, falling back to per component requests:', err);
+      await Promise.all(
+        componentsList.map(comp => fetchComponentData(comp))
+      );
+    }
+  };
+
   const fetchComponentData = async (component) => {
     try {
       const vQuery = component.vQuery;
       
       // Generate data using the saved vQuery
-      const response = await apiService.generateData(vQuery, vQuery.machine_name);
-      
+      const response = await apiService.generateData(withPlotWidth(vQuery), vQuery.machine_name);
+      await applyComponentResponse(component, response);
+    } catch (err) {
+      console.error(`Failed to fetch data for component ${component.icomponent_id}:`, err);
+    }
+  };
+
+  const applyComponentResponse = async (component, response) => {
+    try {
+      const vQuery = component.vQuery;
+
       if (response.status === 'success') {
         //console.log('DashboardSummary - Response from backend:', response.data);
         //console.log('DashboardSummary - vQuery:', vQuery);
@@ -140,7 +178,7 @@ const DashboardSummary = () => {
         }));
       }
     } catch (err) {
-      console.error(`Failed to fetch data for component ${component.icomponent_id}:`, err);
+      console.error(`Failed to process data for component ${component.icomponent_id}:`, err);
     }
   };
 
@@ -59,6 +59,12 @@ class ApiService {
     return this.fetchWithErrorHandling(url);
   }
 
+  // Machines, dropdowns, their data types and series in one response (revalidated by the browser with its ETag)
+  async getMachineCatalog() {
+    const url = `${API_BASE_URL}${API_ENDPOINTS.machineCatalog}`;
+    return this.fetchWithErrorHandling(url);
+  }
+
   async createDashboard(dashboardData) {
     const url = `${API_BASE_URL}${API_ENDPOINTS.createDashboard}`;
     return this.fetchWithErrorHandling(url, {
@@ -104,6 +110,21 @@ class ApiService {
     });
   }
 
+  /**
+   * Generate data for several saved components in one request
+   * @param {Array} components - Components with icomponent_id and vQuery
+   * @returns {Promise} Response with one generate-data payload per component
+   */
+  async renderDashboard(components) {
+    const url = `${API_BASE_URL}${API_ENDPOINTS.renderDashboard}`;
+    return this.fetchWithErrorHandling(url, {
+      method: 'POST',
+      body: JSON.stringify({
+        components: components.map(({ icomponent_id, vQuery }) => ({ icomponent_id, vQuery })),
+      }),
+    });
+  }
+
   // Dashboard methods
   async getDashboards() {
     const url = `${API_BASE_URL}${API_ENDPOINTS.getDashboards}`;